@@ -1,4 +1,11 @@
+import time
+import numpy as np
 from agent.planning.MCTS import MCTS
+from agent.planning.InstrumentedMCTS import InstrumentedMCTS
+from agent.planning.PlanningStats import PlanningStats
+from agent.planning.PlanCache import PlanCache
+from agent.planning.CompiledMCTS import CompiledMCTS
+from agent.inference.CompiledInference import CompiledInference
 
 
 class BTAI_3MF:
@@ -7,16 +14,39 @@ class BTAI_3MF:
     Multi-Modalities and Multi-Factors.
     """
 
-    def __init__(self, ts, max_planning_steps, exp_const):
+    def __init__(
+            self, ts, max_planning_steps, exp_const, heuristic=None, collect_stats=False,
+            plan_cache_size=0, plan_cache_quantum=1e-6, compile_mode=None, recorder=None
+    ):
         """
         Construct the BTAI_3MF agent.
         :param ts: the temporal slice to be used by the agent.
         :param max_planning_steps: the maximum number of planning iterations.
         :param exp_const: the exploration constant of the Monte-Carlo tree search algorithm.
+        :param heuristic: an optional function estimating the cost to go of the leaf nodes.
+        :param collect_stats: True if the timers and counters of the planner should be recorded
+            in self.stats, False otherwise.
+        :param plan_cache_size: the number of plans cached and reused when the posterior beliefs of the
+            root are repeated, the plan cache is disabled if zero.
+        :param plan_cache_quantum: the resolution used to compare the posterior beliefs of the root.
+        :param compile_mode: the mode used to compile the fused inference kernels of the temporal slice,
+            i.e., "torch.compile", "torchscript" or "eager", or None to use the generic inference.
+        :param recorder: the trajectory recorder notified of each step and update, if any.
         """
+        if compile_mode is not None and collect_stats:
+            raise Exception("The statistics of the planner cannot be collected with compiled kernels.")
         self.ts = ts
-        self.mcts = MCTS(exp_const)
+        self.stats = PlanningStats() if collect_stats else None
+        self.inference = CompiledInference(ts, compile_mode) if compile_mode is not None else None
+        if self.inference is not None:
+            self.mcts = CompiledMCTS(exp_const, self.inference, heuristic)
+        elif self.stats is not None:
+            self.mcts = InstrumentedMCTS(exp_const, self.stats, heuristic)
+        else:
+            self.mcts = MCTS(exp_const, heuristic)
         self.max_planning_steps = max_planning_steps
+        self.plan_cache = PlanCache(plan_cache_size, plan_cache_quantum) if plan_cache_size > 0 else None
+        self.recorder = recorder
 
     def reset(self, obs):
         """
@@ -25,19 +55,56 @@ class BTAI_3MF:
         :return: nothing.
         """
         self.ts.reset()
-        self.ts.i_step(obs)
+        self.i_step(obs)
 
     def step(self):
         """
-        Perform planning and action selection.
+        Perform planning and action selection. If the agent collects statistics, the timers
+        and counters of this planning phase are accumulated in self.stats. If the plan cache is enabled
+        and the posterior beliefs of the root have already been planned for, the cached plan is reused.
         :return: the action to execute in the environment.
         """
+        if self.plan_cache is not None:
+            key = self.plan_cache.key(self.ts)
+            plan = self.plan_cache.get(key)
+            if plan is not None:
+                action = PlanCache.restore(self.ts, plan)
+                self.record_step(action)
+                return action
+
+        start = time.perf_counter() if self.stats is not None else None
         for i in range(0, self.max_planning_steps):
             node = self.mcts.select_node(self.ts)
             e_nodes = self.mcts.expansion(node)
             self.mcts.evaluation(e_nodes)
             self.mcts.propagation(e_nodes)
-        return max(self.ts.children, key=lambda x: x.visits).action
+        if self.stats is not None:
+            self.stats.add("planning", time.perf_counter() - start)
+            self.stats.iterations += self.max_planning_steps
+        action = max(self.ts.children, key=lambda x: x.visits).action
+        if self.plan_cache is not None:
+            self.plan_cache.put(key, self.ts, action)
+        self.record_step(action)
+        return action
+
+    def record_step(self, action):
+        """
+        Notify the trajectory recorder of the action selected, along with the number of visits and
+        the cost of the root's children if the recorder collects planning statistics.
+        :param action: the action selected.
+        :return: nothing.
+        """
+        if self.recorder is None:
+            return
+        if not self.recorder.planning_stats:
+            self.recorder.record("agent_step", action=action)
+            return
+        visits = np.zeros(self.ts.n_actions, dtype=np.int64)
+        costs = np.full(self.ts.n_actions, np.nan)
+        for child in self.ts.children:
+            visits[child.action] = child.visits
+            costs[child.action] = child.cost
+        self.recorder.record("agent_step", action=action, visits=visits, costs=costs)
 
     def update(self, action, obs):
         """
@@ -49,6 +116,25 @@ class BTAI_3MF:
         :return: nothing.
         """
         self.ts = next(filter(lambda x: x.action == action, self.ts.children))
+        self.ts.complete_posteriors()
         self.ts.reset()
         self.ts.use_posteriors_as_empirical_priors()
+        self.i_step(obs)
+        if self.recorder is not None:
+            self.recorder.record("agent_update", action=action, obs=obs)
+
+    def i_step(self, obs):
+        """
+        Perform the I-step of the root temporal slice, and record its duration if needed.
+        :param obs: the observation that was made.
+        :return: nothing.
+        """
+        if self.inference is not None:
+            self.inference.i_step(self.ts, obs)
+            return
+        if self.stats is None:
+            self.ts.i_step(obs)
+            return
+        start = time.perf_counter()
         self.ts.i_step(obs)
+        self.stats.add("i_step", time.perf_counter() - start)
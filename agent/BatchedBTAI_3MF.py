@@ -0,0 +1,79 @@
+from agent.planning.MCTS import MCTS
+from agent.inference.BatchedInference import BatchedInference
+
+
+class BatchedBTAI_3MF:
+    """
+    The class implementing several BTAI_3MF agents acting in lockstep, whose I-steps, P-steps and
+    expected free energy evaluations are batched. Each agent owns its temporal slice, and is identified
+    by the index of this temporal slice.
+    """
+
+    def __init__(self, slices, max_planning_steps, exp_const, heuristic=None):
+        """
+        Construct the batched BTAI_3MF agents.
+        :param slices: the temporal slices of the agents, built by the same temporal slice builder.
+        :param max_planning_steps: the maximum number of planning iterations.
+        :param exp_const: the exploration constant of the Monte-Carlo tree search algorithm.
+        :param heuristic: an optional function estimating the cost to go of the leaf nodes.
+        """
+        self.slices = list(slices)
+        self.inference = BatchedInference(self.slices[0])
+        self.mcts = MCTS(exp_const, heuristic)
+        self.max_planning_steps = max_planning_steps
+
+    def reset(self, indices, obs):
+        """
+        Reset some agents to their pre-planning state.
+        :param indices: the indices of the agents to reset.
+        :param obs: the observation of each agent that must be used in the computation of the posterior.
+        :return: nothing.
+        """
+        for i in indices:
+            self.slices[i].reset()
+        self.inference.i_step([self.slices[i] for i in indices], obs)
+
+    def step(self, indices):
+        """
+        Perform planning and action selection for some agents.
+        :param indices: the indices of the agents that must select an action.
+        :return: the action to execute in the environment by each agent.
+        """
+        roots = [self.slices[i] for i in indices]
+        for _ in range(0, self.max_planning_steps):
+            nodes = [self.mcts.select_node(root) for root in roots]
+            children, states_posterior, obs_posterior = self.inference.p_step(nodes)
+            costs = self.inference.efe(states_posterior, obs_posterior).tolist()
+            for e_nodes, e_costs in zip(children, costs):
+                self.evaluation(e_nodes, e_costs)
+                self.mcts.propagation(e_nodes)
+        return [max(root.children, key=lambda x: x.visits).action for root in roots]
+
+    def evaluation(self, nodes, costs):
+        """
+        Set the cost of the expanded nodes.
+        :param nodes: the nodes that have been expanded.
+        :param costs: the expected free energy of each node.
+        :return: nothing.
+        """
+        for node, cost in zip(nodes, costs):
+            node.cost = cost
+            if self.mcts.heuristic is not None:
+                node.cost += self.mcts.heuristic(node)
+
+    def update(self, indices, actions, obs):
+        """
+        Update some agents so that: (1) their root corresponds to the temporal slice reached
+        when performing their action, (2) their posterior over hidden states takes into account
+        their observation.
+        :param indices: the indices of the agents to update.
+        :param actions: the action executed in the environment by each agent.
+        :param obs: the observation made by each agent.
+        :return: nothing.
+        """
+        for i, action in zip(indices, actions):
+            self.slices[i] = next(filter(lambda x: x.action == action, self.slices[i].children))
+            self.slices[i].complete_posteriors()
+            self.slices[i].reset()
+            self.slices[i].use_posteriors_as_empirical_priors()
+        self.inference.i_step([self.slices[i] for i in indices], obs)
@@ -1,5 +1,6 @@
 from agent.graph.VariableNode import VariableNode
 from agent.graph.FactorNode import FactorNode
+from agent.inference.Backend import Backend
 
 
 class FactorGraph:
@@ -53,7 +54,7 @@ class FactorGraph:
         """
         Set the parameters of the factor representing the evidenc of an observed variable.
         :param obs_name: the observed variable name.
-        :param evidence: factor's parameter encoding the evidence.
+        :param evidence: factor's parameter encoding the evidence, or the index of the observed value.
         :return: nothing.
         """
         # Check if the observation name is valid.
@@ -61,6 +62,14 @@ class FactorGraph:
             print("Warning: e_{} is not in the factor graph's nodes.".format(obs_name))
             return
 
+        # Check if the index of the observed value is valid, a negative index would select a value silently.
+        if Backend.is_index(evidence):
+            n_values = self.nodes["f_" + obs_name].params.shape[0]
+            if not 0 <= evidence < n_values:
+                raise ValueError("Invalid index for {}: {}, expected a value in [0, {}).".format(
+                    obs_name, evidence, n_values
+                ))
+
         # Set the evidence.
         self.nodes["e_" + obs_name].params = evidence
 
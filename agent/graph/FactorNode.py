@@ -1,5 +1,6 @@
 from agent.graph.Node import Node
 from agent.inference.Operators import Operators
+from agent.inference.Backend import Backend
 
 
 class FactorNode(Node):
@@ -30,5 +31,9 @@ class FactorNode(Node):
                 continue
             message = self.in_messages[name]
             i = self.neighbours.index(name)
-            out_msg = Operators.average(out_msg, message, [i])
+            if Backend.is_index(message):
+                # The message is an evidence encoded by an index, so the average is a slice of the parameters.
+                out_msg = Backend.select(out_msg, i, message)
+            else:
+                out_msg = Operators.average(out_msg, message, [i])
         return out_msg
@@ -0,0 +1,149 @@
+import numbers
+import numpy as np
+import torch
+
+
+class Backend:
+    """
+    Class dispatching the tensor operations of the inference to torch or NumPy, depending on the type
+    of their inputs. The backend of a temporal slice is selected when it is built.
+    """
+
+    # The backends available.
+    backends = ["torch", "numpy"]
+
+    @staticmethod
+    def is_numpy(x):
+        """
+        Check if an array is a NumPy array.
+        :param x: the array.
+        :return: True if the array is a NumPy array, False if it is a torch tensor.
+        """
+        return isinstance(x, np.ndarray)
+
+    @staticmethod
+    def is_index(x):
+        """
+        Check if an evidence is the index of the observed value, instead of an array encoding the evidence.
+        :param x: the evidence.
+        :return: True if the evidence is an index, False otherwise.
+        """
+        return isinstance(x, numbers.Integral)
+
+    @staticmethod
+    def select(x, dim, index):
+        """
+        Select a slice of an array along a dimension, without copying the array.
+        :param x: the array.
+        :param dim: the dimension.
+        :param index: the index of the slice.
+        :return: the slice, whose number of dimensions is one less than the array.
+        """
+        return x[(slice(None),) * dim + (index,)]
+
+    @staticmethod
+    def convert(x, backend):
+        """
+        Convert an array to a backend.
+        :param x: the array, i.e., a torch tensor or a NumPy array.
+        :param backend: the backend, i.e., "torch" or "numpy".
+        :return: the converted array.
+        """
+        if backend not in Backend.backends:
+            raise Exception("Unknown backend: {}.".format(backend))
+        if backend == "numpy":
+            return x if Backend.is_numpy(x) else x.detach().cpu().numpy()
+        return torch.from_numpy(x) if Backend.is_numpy(x) else x
+
+    @staticmethod
+    def like(x, reference):
+        """
+        Convert an array to the backend of a reference array. NumPy arrays are also converted to the type
+        of the reference, because NumPy promotes float32 to float64 when they are multiplied by integers.
+        :param x: the array.
+        :param reference: the reference array.
+        :return: the converted array.
+        """
+        if Backend.is_numpy(reference):
+            return Backend.convert(x, "numpy").astype(reference.dtype, copy=False)
+        return Backend.convert(x, "torch")
+
+    @staticmethod
+    def unsqueeze(x, dim):
+        """
+        Insert a dimension of size one.
+        :param x: the array.
+        :param dim: the position of the new dimension.
+        :return: the array with the new dimension.
+        """
+        return np.expand_dims(x, dim) if Backend.is_numpy(x) else torch.unsqueeze(x, dim)
+
+    @staticmethod
+    def repeat(x, repeats):
+        """
+        Repeat the content of an array along each dimension.
+        :param x: the array.
+        :param repeats: the number of repetitions of each dimension.
+        :return: the repeated array.
+        """
+        return np.tile(x, repeats) if Backend.is_numpy(x) else x.repeat(repeats)
+
+    @staticmethod
+    def permute(x, dims):
+        """
+        Permute the dimensions of an array.
+        :param x: the array.
+        :param dims: the new order of the dimensions.
+        :return: the permuted array.
+        """
+        return np.transpose(x, dims) if Backend.is_numpy(x) else x.permute(dims)
+
+    @staticmethod
+    def ones_like(x):
+        """
+        Create an array of ones with the shape and type of another array.
+        :param x: the array.
+        :return: the array of ones.
+        """
+        return np.ones_like(x) if Backend.is_numpy(x) else torch.ones_like(x)
+
+    @staticmethod
+    def clone(x):
+        """
+        Copy an array.
+        :param x: the array.
+        :return: the copy.
+        """
+        return x.copy() if Backend.is_numpy(x) else x.clone()
+
+    @staticmethod
+    def log(x):
+        """
+        Compute the element-wise logarithm of an array.
+        :param x: the array.
+        :return: the logarithm.
+        """
+        return np.log(x) if Backend.is_numpy(x) else x.log()
+
+    @staticmethod
+    def outer(x1, x2):
+        """
+        Compute the outer product of two vectors.
+        :param x1: the first vector.
+        :param x2: the second vector.
+        :return: the outer product.
+        """
+        return np.outer(x1, x2) if Backend.is_numpy(x1) else torch.outer(x1, x2)
+
+    @staticmethod
+    def one_hot(index, n, reference):
+        """
+        Create a one hot encoding in the backend of a reference array.
+        :param index: the index of the one.
+        :param n: the size of the encoding.
+        :param reference: the reference array, whose type is used for NumPy encodings.
+        :return: the one hot encoding.
+        """
+        if Backend.is_numpy(reference):
+            return np.eye(n, dtype=reference.dtype)[index]
+        return torch.squeeze(torch.nn.functional.one_hot(torch.tensor([index]), n))
@@ -0,0 +1,260 @@
+import string
+import torch
+from agent.inference.Backend import Backend
+from agent.graph.FactorNode import FactorNode
+
+
+class BatchedInference:
+    """
+    Class performing the I-step, the P-step and the evaluation of the expected free energy of several
+    temporal slices at once. The temporal slices must share the same model, i.e., they must be built by
+    the same temporal slice builder, but each of them must own its factor graph. The P-step and the expected
+    free energy skip the states and observations that are pruned from planning.
+    """
+
+    # The letters naming the dimensions of the einsum equations, "n" (batch) and "m" (action) are reserved.
+    letters = [letter for letter in string.ascii_letters if letter not in "nm"]
+
+    def __init__(self, ts):
+        """
+        Construct the batched inference from one of the temporal slices sharing the model.
+        :param ts: the temporal slice.
+        """
+        if Backend.is_numpy(next(iter(ts.obs_likelihood.values()))):
+            raise Exception("BatchedInference requires a temporal slice built with the torch backend.")
+        self.n_actions = ts.n_actions
+        self.action_name = ts.action_name
+        self.states_transition = ts.states_transition
+        self.states_parents = ts.states_parents
+        self.obs_likelihood = ts.obs_likelihood
+        self.obs_parents = ts.obs_parents
+        self.dtype = next(iter(ts.obs_likelihood.values())).dtype
+        self.actions = torch.eye(self.n_actions, dtype=self.dtype)
+
+        # The one hot encodings of each observed value, used when the evidence is an index.
+        self.identities = {
+            name: torch.eye(likelihood.shape[0], dtype=self.dtype) for name, likelihood in ts.obs_likelihood.items()
+        }
+
+        # The order in which the messages are sent by the belief propagation algorithm.
+        self.schedule = self.create_schedule(ts.fg)
+        self.state_names = [node.name for node in ts.fg.state_nodes()]
+        self.planned_states = [name for name in self.state_names if name in ts.planned_states]
+        self.planned_obs = [name for name in ts.obs_likelihood.keys() if name in ts.planned_obs]
+
+        # The log prior preferences of each subset of modalities.
+        self.preferences = []
+        processed_modalities = []
+        for obs_name, (rv_names, prior_pref) in ts.obs_prior_pref.items():
+            if obs_name in processed_modalities:
+                continue
+            self.preferences.append((rv_names, ts.log_prior_pref[obs_name]))
+            processed_modalities += rv_names
+
+        # The entropy of each likelihood mapping, i.e., the ambiguity for each value of the parents.
+        self.ambiguities = {name: ts.obs_entropy[name] for name in self.planned_obs}
+
+    @staticmethod
+    def create_schedule(fg):
+        """
+        Compute the order in which the messages are sent by the belief propagation algorithm.
+        The order only depends on the structure of the factor graph, and is the one followed by
+        TemporalSlice.i_step.
+        :param fg: the factor graph.
+        :return: the list of (sender, receiver) pairs.
+        """
+        received = {name: {neighbour: False for neighbour in node.in_messages} for name, node in fg.nodes.items()}
+        queue = [node.name for node in fg.leaf_nodes()]
+        schedule = []
+        while len(queue) != 0:
+            name = queue.pop(0)
+            targets = [
+                neighbour for neighbour in received[name] if not received[neighbour][name] and all(
+                    message for other, message in received[name].items() if other != neighbour
+                )
+            ]
+            for target in targets:
+                schedule.append((name, target))
+                received[target][name] = True
+                if sum(not message for message in received[target].values()) <= 1:
+                    queue.append(target)
+        return schedule
+
+    @staticmethod
+    def equation(inputs, output):
+        """
+        Create an einsum equation.
+        :param inputs: the dimensions of the operands, each dimension is either "n", "m" or an integer
+            identifying a dimension shared by several operands.
+        :param output: the dimensions of the result.
+        :return: the equation.
+        """
+        def to_str(dims):
+            return "".join(dim if isinstance(dim, str) else BatchedInference.letters[dim] for dim in dims)
+        return ",".join(to_str(dims) for dims in inputs) + "->" + to_str(output)
+
+    def i_step(self, slices, obs):
+        """
+        Perform the I-step of several temporal slices, i.e., compute their posterior beliefs using
+        beliefs propagation.
+        :param slices: the temporal slices.
+        :param obs: the observations made by each temporal slice.
+        :return: nothing.
+        """
+        if len(slices) == 0:
+            return
+
+        # Set the evidence of each observation.
+        for ts, ts_obs in zip(slices, obs):
+            for name, evidence in ts_obs.items():
+                ts.fg.set_evidence(name, evidence)
+
+        # Perform the belief propagation algorithm on the whole batch.
+        fg = slices[0].fg
+        messages = {}
+        for sender, receiver in self.schedule:
+            if isinstance(fg[sender], FactorNode):
+                message = self.factor_message(slices, sender, receiver, messages)
+            else:
+                message = self.variable_message(slices, sender, receiver, messages)
+            messages[(sender, receiver)] = message
+            for i, ts in enumerate(slices):
+                ts.fg[receiver].in_messages[sender] = message[i]
+
+        # Compute the posterior over all latent states.
+        for name in self.state_names:
+            posterior = None
+            for neighbour in fg[name].in_messages.keys():
+                message = messages[(neighbour, name)]
+                posterior = message if posterior is None else posterior * message
+            posterior = posterior / posterior.sum(dim=1, keepdim=True)
+            for i, ts in enumerate(slices):
+                ts.states_posterior[name] = posterior[i]
+
+    def factor_message(self, slices, name, dest_name, messages):
+        """
+        Compute the messages sent by a factor node of several factor graphs.
+        :param slices: the temporal slices owning the factor graphs.
+        :param name: the name of the factor node.
+        :param dest_name: the name of the destination node.
+        :param messages: the messages already computed.
+        :return: the messages, i.e., a tensor whose first dimension is the batch dimension.
+        """
+        # The parameters are shared by the factor graphs, except for the evidence.
+        params = [ts.fg[name].params for ts in slices]
+        if any(param is None for param in params):
+            raise Exception("In BatchedInference::factor_message, {}.params is None.".format(name))
+        if name[0:2] == "e_":
+            params = [self.identities[name[2:]][param] if Backend.is_index(param) else param for param in params]
+        batched = any(param is not params[0] for param in params)
+        params = torch.stack(params).to(self.dtype) if batched else params[0].to(self.dtype)
+        neighbours = slices[0].fg[name].neighbours
+        if len(neighbours) == 1:
+            return params if batched else params.unsqueeze(0).expand(len(slices), -1)
+
+        # Average the parameters over the incoming messages.
+        dims = list(range(len(neighbours)))
+        inputs = [["n"] + dims if batched else dims]
+        operands = [params]
+        for i, neighbour in enumerate(neighbours):
+            if neighbour != dest_name:
+                inputs.append(["n", i])
+                operands.append(messages[(neighbour, name)])
+        output = ["n", neighbours.index(dest_name)]
+        return torch.einsum(self.equation(inputs, output), *operands)
+
+    @staticmethod
+    def variable_message(slices, name, dest_name, messages):
+        """
+        Compute the messages sent by a variable node of several factor graphs.
+        :param slices: the temporal slices owning the factor graphs.
+        :param name: the name of the variable node.
+        :param dest_name: the name of the destination node.
+        :param messages: the messages already computed.
+        :return: the messages, i.e., a tensor whose first dimension is the batch dimension.
+        """
+        out_msg = None
+        for neighbour in slices[0].fg[name].in_messages.keys():
+            if neighbour != dest_name:
+                message = messages[(neighbour, name)]
+                out_msg = message if out_msg is None else out_msg * message
+        return out_msg
+
+    def p_step(self, nodes):
+        """
+        Perform the P-step of several temporal slices for all actions, i.e., expand the nodes and
+        compute the posterior beliefs of their children using forward predictions.
+        :param nodes: the temporal slices to expand.
+        :return: the children of each node, as well as the posteriors over the states and the observations
+            of the children, i.e., dictionaries of tensors whose first two dimensions are the batch and
+            action dimensions.
+        """
+        # Compute the posterior over the future states.
+        states_posterior = {}
+        for state_name in self.planned_states:
+            parents = self.states_parents[state_name]
+            inputs = [list(range(len(parents) + 1))]
+            operands = [self.states_transition[state_name]]
+            for i, parent in enumerate(parents):
+                if parent == self.action_name:
+                    inputs.append(["m", i + 1])
+                    operands.append(self.actions)
+                else:
+                    inputs.append(["n", i + 1])
+                    operands.append(torch.stack([node.states_posterior[parent] for node in nodes]))
+            if self.action_name in parents:
+                posterior = torch.einsum(self.equation(inputs, ["n", "m", 0]), *operands)
+            else:
+                posterior = torch.einsum(self.equation(inputs, ["n", 0]), *operands)
+                posterior = posterior.unsqueeze(1).expand(-1, self.n_actions, -1)
+            states_posterior[state_name] = posterior
+
+        # Compute the posterior over the future observations.
+        obs_posterior = {}
+        for obs_name in self.planned_obs:
+            likelihood = self.obs_likelihood[obs_name]
+            parents = self.obs_parents[obs_name]
+            inputs = [list(range(len(parents) + 1))] + [["n", "m", i + 1] for i in range(len(parents))]
+            operands = [likelihood] + [states_posterior[parent] for parent in parents]
+            obs_posterior[obs_name] = torch.einsum(self.equation(inputs, ["n", "m", 0]), *operands)
+
+        # Create the children of each node.
+        children = []
+        for i, node in enumerate(nodes):
+            e_nodes = []
+            for action in range(self.n_actions):
+                next_ts = node.create_child(action)
+                for state_name, posterior in states_posterior.items():
+                    next_ts.states_posterior[state_name] = posterior[i, action]
+                for obs_name, posterior in obs_posterior.items():
+                    next_ts.obs_posterior[obs_name] = posterior[i, action]
+                e_nodes.append(next_ts)
+            children.append(e_nodes)
+        return children, states_posterior, obs_posterior
+
+    def efe(self, states_posterior, obs_posterior):
+        """
+        Compute the expected free energy of the children created by the P-step.
+        :param states_posterior: the posteriors over the states returned by the P-step.
+        :param obs_posterior: the posteriors over the observations returned by the P-step.
+        :return: the expected free energy of each child, i.e., a tensor whose dimensions are the batch
+            and action dimensions.
+        """
+        efe = 0
+
+        # Compute the risk terms of the expected free energy.
+        for rv_names, log_prior_pref in self.preferences:
+            subset_posterior = obs_posterior[rv_names[0]]
+            for rv_name in rv_names[1:]:
+                subset_posterior = subset_posterior.unsqueeze(-1) * obs_posterior[rv_name].unsqueeze(-2)
+                subset_posterior = subset_posterior.flatten(2)
+            efe = efe + (subset_posterior * (subset_posterior.log() - log_prior_pref)).sum(-1)
+
+        # Compute the ambiguity terms of the expected free energy.
+        for obs_name, ambiguity in self.ambiguities.items():
+            parents = self.obs_parents[obs_name]
+            inputs = [list(range(len(parents)))] + [["n", "m", i] for i in range(len(parents))]
+            operands = [ambiguity] + [states_posterior[parent] for parent in parents]
+            efe = efe + torch.einsum(self.equation(inputs, ["n", "m"]), *operands)
+
+        return efe
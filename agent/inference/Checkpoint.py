@@ -0,0 +1,223 @@
+import json
+import struct
+import numpy as np
+import torch
+from agent.inference.TemporalSliceBuilder import TemporalSliceBuilder
+from agent.inference.Backend import Backend
+
+
+class Checkpoint:
+    """
+    Class saving and loading temporal slices (model, factor graph messages, posteriors and optionally
+    the MCTS tree) in a compact binary format. A file contains a magic string, the size of a JSON header,
+    the JSON header, and the raw bytes of the tensors, each aligned on 64 bytes. The tensors are loaded
+    using a memory map, and no pickle is involved.
+    """
+
+    # The magic string starting each checkpoint, and the version of the format.
+    magic = b"BTAI3MF\0"
+    version = 1
+
+    # The alignment of the tensors' bytes in the file.
+    alignment = 64
+
+    @staticmethod
+    def write(path, header, tensors):
+        """
+        Write a checkpoint file.
+        :param path: the path of the file.
+        :param header: a JSON serializable dictionary describing the content of the file.
+        :param tensors: the tensors referenced by index in the header.
+        :return: nothing.
+        """
+        # Compute the position of each tensor in the data section.
+        arrays = [tensor.detach().contiguous().numpy() for tensor in tensors]
+        offset = 0
+        header["tensors"] = []
+        for array in arrays:
+            header["tensors"].append({"offset": offset, "dtype": array.dtype.str, "shape": list(array.shape)})
+            offset += Checkpoint.aligned(array.nbytes)
+        header["version"] = Checkpoint.version
+
+        # Write the magic string, the header and the tensors.
+        encoded = json.dumps(header).encode("utf-8")
+        start = Checkpoint.aligned(len(Checkpoint.magic) + 8 + len(encoded))
+        with open(path, "wb") as file:
+            file.write(Checkpoint.magic)
+            file.write(struct.pack("<Q", len(encoded)))
+            file.write(encoded)
+            file.write(b"\0" * (start - file.tell()))
+            for array, info in zip(arrays, header["tensors"]):
+                file.write(b"\0" * (start + info["offset"] - file.tell()))
+                file.write(array.tobytes())
+
+    @staticmethod
+    def read(path):
+        """
+        Read a checkpoint file.
+        :param path: the path of the file.
+        :return: the header and the tensors, which are memory mapped and copied on write.
+        """
+        with open(path, "rb") as file:
+            if file.read(len(Checkpoint.magic)) != Checkpoint.magic:
+                raise Exception("{} is not a checkpoint file.".format(path))
+            size = struct.unpack("<Q", file.read(8))[0]
+            header = json.loads(file.read(size).decode("utf-8"))
+        if header["version"] != Checkpoint.version:
+            raise Exception("Unsupported checkpoint version: {}.".format(header["version"]))
+        start = Checkpoint.aligned(len(Checkpoint.magic) + 8 + size)
+        memory = np.memmap(path, dtype=np.uint8, mode="c")
+        tensors = []
+        for info in header["tensors"]:
+            array = np.ndarray(info["shape"], np.dtype(info["dtype"]), buffer=memory, offset=start + info["offset"])
+            tensors.append(torch.from_numpy(array))
+        return header, tensors
+
+    @staticmethod
+    def aligned(n_bytes):
+        """
+        Round up a number of bytes to the alignment of the tensors.
+        :param n_bytes: the number of bytes.
+        :return: the aligned number of bytes.
+        """
+        return (n_bytes + Checkpoint.alignment - 1) // Checkpoint.alignment * Checkpoint.alignment
+
+    @staticmethod
+    def save(path, ts, include_tree=False):
+        """
+        Save a temporal slice. The tensors of the NumPy backend are saved as well, but are loaded as torch tensors.
+        :param path: the path of the file.
+        :param ts: the temporal slice.
+        :param include_tree: True if the MCTS tree whose root is the temporal slice should be saved, False otherwise.
+        :return: nothing.
+        """
+        tensors = []
+        indices = {}
+
+        def index(tensor):
+            if tensor is None:
+                return None
+            if Backend.is_index(tensor):
+                # The evidence given as indices is stored in the header.
+                return {"evidence_index": int(tensor)}
+            tensor = Backend.convert(tensor, "torch")
+            key = (tensor.data_ptr(), tensor.dtype, tuple(tensor.shape), tuple(tensor.stride()))
+            if key not in indices:
+                indices[key] = len(tensors)
+                tensors.append(tensor)
+            return indices[key]
+
+        def indices_of(dictionary):
+            return {name: index(tensor) for name, tensor in dictionary.items()}
+
+        # Describe the model.
+        processed_modalities = []
+        preferences = []
+        for obs_name, (rv_names, prior_pref) in ts.obs_prior_pref.items():
+            if obs_name not in processed_modalities:
+                preferences.append({"rv_names": rv_names, "params": index(prior_pref)})
+                processed_modalities += rv_names
+        model = {
+            "action_name": ts.action_name,
+            "n_actions": ts.n_actions,
+            "states_prior": indices_of(ts.initial_states_prior),
+            "states_transition": indices_of(ts.states_transition),
+            "states_parents": ts.states_parents,
+            "obs_likelihood": indices_of(ts.obs_likelihood),
+            "obs_parents": ts.obs_parents,
+            "preferences": preferences,
+            "pruned_states": [name for name in ts.states_prior.keys() if name not in ts.planned_states],
+            "pruned_obs": [name for name in ts.obs_likelihood.keys() if name not in ts.planned_obs]
+        }
+
+        # Describe the derived tensors of the model.
+        derived = {"obs_entropy": indices_of(ts.obs_entropy), "log_prior_pref": indices_of(ts.log_prior_pref)}
+
+        # Describe the factor graph's evidence and messages.
+        graph = {
+            "evidence": {name[2:]: index(node.params) for name, node in ts.fg.nodes.items() if name[0:2] == "e_"},
+            "messages": {name: indices_of(node.in_messages) for name, node in ts.fg.nodes.items()}
+        }
+
+        # Describe the root, and the rest of the tree if requested.
+        nodes = []
+        stack = [(ts, None)]
+        while len(stack) != 0:
+            node, parent = stack.pop()
+            nodes.append({
+                "parent": parent,
+                "action": node.action,
+                "cost": node.cost,
+                "visits": node.visits,
+                "states_prior": indices_of(node.states_prior),
+                "states_posterior": indices_of(node.states_posterior),
+                "obs_posterior": indices_of(node.obs_posterior)
+            })
+            if include_tree:
+                stack.extend((child, len(nodes) - 1) for child in reversed(node.children))
+
+        Checkpoint.write(path, {"model": model, "derived": derived, "graph": graph, "nodes": nodes}, tensors)
+
+    @staticmethod
+    def load_builder(header, tensors):
+        """
+        Create the temporal slice builder of the model stored in a checkpoint.
+        :param header: the header of the checkpoint.
+        :param tensors: the tensors of the checkpoint.
+        :return: the builder.
+        """
+        model = header["model"]
+        builder = TemporalSliceBuilder(model["action_name"], model["n_actions"])
+        for name, i in model["states_prior"].items():
+            builder.add_state(name, tensors[i])
+        for name, i in model["obs_likelihood"].items():
+            builder.add_observation(name, tensors[i], model["obs_parents"][name])
+        for name, i in model["states_transition"].items():
+            builder.add_transition(name, tensors[i], model["states_parents"][name])
+        for preference in model["preferences"]:
+            builder.add_preference(preference["rv_names"], tensors[preference["params"]])
+        return builder
+
+    @staticmethod
+    def load(path, backend="torch"):
+        """
+        Load a temporal slice, and the MCTS tree whose root is this temporal slice if it was saved.
+        :param path: the path of the file.
+        :param backend: the backend used by the inference, i.e., "torch" or "numpy".
+        :return: the temporal slice.
+        """
+        header, tensors = Checkpoint.read(path)
+
+        def tensor_of(i):
+            if isinstance(i, dict):
+                return i["evidence_index"]
+            return None if i is None else Backend.convert(tensors[i], backend)
+
+        def tensors_of(dictionary):
+            return {name: tensor_of(i) for name, i in dictionary.items()}
+
+        # Build the temporal slice, reusing the derived tensors if they were saved, and restore the factor
+        # graph's evidence and messages.
+        derived = None
+        if "derived" in header:
+            derived = {name: tensors_of(dictionary) for name, dictionary in header["derived"].items()}
+        ts = Checkpoint.load_builder(header, tensors).build(backend, derived=derived)
+        ts.prune(header["model"].get("pruned_states", []), header["model"].get("pruned_obs", []))
+        for name, i in header["graph"]["evidence"].items():
+            if i is not None:
+                ts.fg.set_evidence(name, tensor_of(i))
+        for name, messages in header["graph"]["messages"].items():
+            ts.fg[name].in_messages.update(tensors_of(messages))
+
+        # Restore the nodes of the tree.
+        nodes = []
+        for info in header["nodes"]:
+            node = ts if info["parent"] is None else nodes[info["parent"]].create_child(info["action"])
+            node.action = info["action"]
+            node.cost = info["cost"]
+            node.visits = info["visits"]
+            node.states_prior = tensors_of(info["states_prior"])
+            node.states_posterior.update(tensors_of(info["states_posterior"]))
+            node.obs_posterior.update(tensors_of(info["obs_posterior"]))
+            nodes.append(node)
+        return ts
@@ -0,0 +1,290 @@
+import warnings
+import torch
+from agent.inference.Backend import Backend
+from agent.graph.FactorNode import FactorNode
+from agent.inference.BatchedInference import BatchedInference
+
+
+class CompiledInference:
+    """
+    Class generating fused kernels specialised to the structure of a temporal slice: one kernel performs
+    the I-step, and another one performs the P-step and the evaluation of the expected free energy of all
+    the children of a node. The kernels are straight-line functions generated for the structure, which are
+    then compiled by torch.compile or TorchScript, falling back to the generated Python code if the
+    compilation fails. The kernels are cached per structure signature, and take the model's tensors as
+    arguments so that models sharing a structure share the kernels. The P-step kernel only computes the
+    states and observations that are not pruned from planning.
+    """
+
+    # The kernels already generated, indexed by mode and structure signature.
+    cache = {}
+
+    # The modes of compilation.
+    modes = ["torch.compile", "torchscript", "eager"]
+
+    def __init__(self, ts, mode="torchscript"):
+        """
+        Construct the compiled inference of a temporal slice.
+        :param ts: the temporal slice.
+        :param mode: the mode of compilation, i.e., "torch.compile", "torchscript" or "eager".
+        """
+        if mode not in CompiledInference.modes:
+            raise Exception("Unknown compilation mode: {}.".format(mode))
+        if Backend.is_numpy(next(iter(ts.obs_likelihood.values()))):
+            raise Exception("CompiledInference requires a temporal slice built with the torch backend.")
+        self.n_actions = ts.n_actions
+        self.dtype = next(iter(ts.obs_likelihood.values())).dtype
+        self.state_names = list(ts.states_posterior.keys())
+        self.obs_names = list(ts.obs_likelihood.keys())
+        self.planned_states = [name for name in self.state_names if name in ts.planned_states]
+        self.planned_obs = [name for name in self.obs_names if name in ts.planned_obs]
+        self.factor_names = [name for name, node in ts.fg.nodes.items() if isinstance(node, FactorNode)]
+        self.identities = {
+            name: torch.eye(likelihood.shape[0], dtype=self.dtype) for name, likelihood in ts.obs_likelihood.items()
+        }
+        self.preferences = []
+        processed_modalities = []
+        for obs_name, (rv_names, prior_pref) in ts.obs_prior_pref.items():
+            if obs_name not in processed_modalities:
+                self.preferences.append((rv_names, prior_pref))
+                processed_modalities += rv_names
+
+        # The model's tensors passed to the P-step kernel.
+        self.p_step_args = [torch.eye(self.n_actions, dtype=self.dtype)] + \
+            [ts.states_transition[name] for name in self.planned_states] + \
+            [ts.obs_likelihood[name] for name in self.planned_obs] + \
+            [ts.obs_entropy[name] for name in self.planned_obs] + \
+            [ts.log_prior_pref[rv_names[0]] for rv_names, _ in self.preferences]
+
+        # Get the kernels from the cache, or generate them.
+        signature = (mode, self.signature(ts))
+        if signature not in CompiledInference.cache:
+            CompiledInference.cache[signature] = self.create_kernels(ts, mode)
+        self.p_step_kernel, self.i_step_kernel, self.mode = CompiledInference.cache[signature]
+
+    def evidence(self, obs_name, evidence):
+        """
+        Convert an evidence to the input of the I-step kernel.
+        :param obs_name: the name of the observation.
+        :param evidence: the index of the observed value, or a tensor encoding the evidence.
+        :return: the tensor encoding the evidence.
+        """
+        if Backend.is_index(evidence):
+            return self.identities[obs_name][evidence]
+        return evidence.to(self.dtype)
+
+    def signature(self, ts):
+        """
+        Compute the structure signature of a temporal slice.
+        :param ts: the temporal slice.
+        :return: the signature, i.e., a tuple describing the variables, their parents and shapes, the
+            preferences, the factor graph and the variables pruned from planning.
+        """
+        return (
+            ts.action_name, ts.n_actions, str(self.dtype),
+            tuple((name, tuple(ts.states_parents[name]), tuple(ts.states_transition[name].shape))
+                  for name in self.state_names),
+            tuple((name, tuple(ts.obs_parents[name]), tuple(ts.obs_likelihood[name].shape))
+                  for name in self.obs_names),
+            tuple((tuple(rv_names), tuple(prior_pref.shape)) for rv_names, prior_pref in self.preferences),
+            tuple((name, tuple(node.neighbours)) for name, node in ts.fg.nodes.items()),
+            tuple(self.planned_states), tuple(self.planned_obs)
+        )
+
+    def create_kernels(self, ts, mode):
+        """
+        Generate and compile the kernels of a temporal slice.
+        :param ts: the temporal slice.
+        :param mode: the mode of compilation.
+        :return: the P-step kernel, the I-step kernel, and the mode of compilation actually used.
+        """
+        sources = {"p_step_kernel": self.p_step_source(ts), "i_step_kernel": self.i_step_source(ts)}
+        p_step_kernel, i_step_kernel = [self.define(source, name) for name, source in sources.items()]
+        if mode == "eager":
+            return p_step_kernel, i_step_kernel, mode
+
+        # Compile the kernels, and check them against the generated Python code.
+        p_step_inputs = self.p_step_args + [torch.ones_like(ts.states_prior[name]) for name in self.planned_states]
+        i_step_inputs = [
+            torch.ones(ts.obs_likelihood[name[2:]].shape[0], dtype=self.dtype) if name[0:2] == "e_"
+            else ts.fg[name].params for name in self.factor_names
+        ]
+        try:
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore")
+                if mode == "torch.compile":
+                    compiled = [torch.compile(kernel, dynamic=False) for kernel in [p_step_kernel, i_step_kernel]]
+                else:
+                    compiled = [getattr(torch.jit.CompilationUnit(source), name) for name, source in sources.items()]
+                for kernel, compiled_kernel, inputs in zip(
+                        [p_step_kernel, i_step_kernel], compiled, [p_step_inputs, i_step_inputs]
+                ):
+                    for expected, result in zip(kernel(*inputs), compiled_kernel(*inputs)):
+                        if not torch.allclose(expected, result, equal_nan=True):
+                            raise Exception("The compiled kernel does not match the generated code.")
+            return compiled[0], compiled[1], mode
+        except Exception as error:
+            warnings.warn("Compilation with {} failed, using the generated code: {}".format(mode, error))
+            return p_step_kernel, i_step_kernel, "eager"
+
+    @staticmethod
+    def define(source, name):
+        """
+        Define a function from its source code.
+        :param source: the source code.
+        :param name: the name of the function.
+        :return: the function.
+        """
+        namespace = {"torch": torch}
+        exec(compile(source, "<{}>".format(name), "exec"), namespace)
+        return namespace[name]
+
+    def p_step_source(self, ts):
+        """
+        Generate the source code of the P-step kernel, which computes the posteriors and expected free
+        energy of the children of a node for all actions. The arguments are the tensors in self.p_step_args
+        followed by the states posterior of the node, and the results are the states posteriors, the
+        observations posteriors and the expected free energy, whose first dimension is the action. Only the
+        states and observations that are not pruned from planning are computed.
+        :param ts: the temporal slice.
+        :return: the source code.
+        """
+        n_states, n_obs = len(self.planned_states), len(self.planned_obs)
+        args = ["actions"] + ["b{}".format(i) for i in range(n_states)] + ["a{}".format(i) for i in range(n_obs)] + \
+            ["h{}".format(i) for i in range(n_obs)] + ["c{}".format(i) for i in range(len(self.preferences))] + \
+            ["q{}".format(i) for i in range(n_states)]
+        lines = ["def p_step_kernel({}):".format(", ".join(args))]
+
+        # Compute the posterior over the future states.
+        for i, name in enumerate(self.planned_states):
+            parents = ts.states_parents[name]
+            inputs, operands = [list(range(len(parents) + 1))], ["b{}".format(i)]
+            for j, parent in enumerate(parents):
+                inputs.append(["m", j + 1] if parent == ts.action_name else [j + 1])
+                operands.append(
+                    "actions" if parent == ts.action_name else "q{}".format(self.planned_states.index(parent))
+                )
+            if ts.action_name in parents:
+                lines.append("    s{} = torch.einsum('{}', [{}])".format(
+                    i, BatchedInference.equation(inputs, ["m", 0]), ", ".join(operands)
+                ))
+            else:
+                lines.append("    s{} = torch.einsum('{}', [{}]).unsqueeze(0).expand({}, -1)".format(
+                    i, BatchedInference.equation(inputs, [0]), ", ".join(operands), self.n_actions
+                ))
+
+        # Compute the posterior over the future observations.
+        for i, name in enumerate(self.planned_obs):
+            parents = ts.obs_parents[name]
+            inputs = [list(range(len(parents) + 1))] + [["m", j + 1] for j in range(len(parents))]
+            operands = ["a{}".format(i)] + ["s{}".format(self.planned_states.index(parent)) for parent in parents]
+            lines.append("    o{} = torch.einsum('{}', [{}])".format(
+                i, BatchedInference.equation(inputs, ["m", 0]), ", ".join(operands)
+            ))
+
+        # Compute the risk terms of the expected free energy.
+        terms = []
+        for i, (rv_names, _) in enumerate(self.preferences):
+            operands = ["o{}".format(self.planned_obs.index(rv_name)) for rv_name in rv_names]
+            if len(rv_names) == 1:
+                lines.append("    r{} = {}".format(i, operands[0]))
+            else:
+                inputs = [["m", j] for j in range(len(rv_names))]
+                lines.append("    r{} = torch.einsum('{}', [{}]).reshape({}, -1)".format(
+                    i, BatchedInference.equation(inputs, ["m"] + list(range(len(rv_names)))),
+                    ", ".join(operands), self.n_actions
+                ))
+            terms.append("(r{0} * (r{0}.log() - c{0})).sum(-1)".format(i))
+
+        # Compute the ambiguity terms of the expected free energy.
+        for i, name in enumerate(self.planned_obs):
+            parents = ts.obs_parents[name]
+            inputs = [list(range(len(parents)))] + [["m", j] for j in range(len(parents))]
+            operands = ["h{}".format(i)] + ["s{}".format(self.planned_states.index(parent)) for parent in parents]
+            terms.append("torch.einsum('{}', [{}])".format(
+                BatchedInference.equation(inputs, ["m"]), ", ".join(operands)
+            ))
+
+        lines.append("    efe = {}".format(" + ".join(terms)))
+        results = ["s{}".format(i) for i in range(n_states)] + ["o{}".format(i) for i in range(n_obs)] + ["efe"]
+        lines.append("    return {}".format(", ".join(results)))
+        return "\n".join(lines) + "\n"
+
+    def i_step_source(self, ts):
+        """
+        Generate the source code of the I-step kernel, which performs the belief propagation algorithm
+        following the schedule of TemporalSlice.i_step. The arguments are the parameters of the factors
+        in self.factor_names, and the results are the posteriors over the states.
+        :param ts: the temporal slice.
+        :return: the source code.
+        """
+        args = ["f{}".format(i) for i in range(len(self.factor_names))]
+        lines = ["def i_step_kernel({}):".format(", ".join(args))]
+        messages = {}
+        for sender, receiver in BatchedInference.create_schedule(ts.fg):
+            message = "m{}".format(len(messages))
+            node = ts.fg[sender]
+            if isinstance(node, FactorNode) and len(node.neighbours) == 1:
+                lines.append("    {} = f{}".format(message, self.factor_names.index(sender)))
+            elif isinstance(node, FactorNode):
+                inputs = [list(range(len(node.neighbours)))]
+                operands = ["f{}".format(self.factor_names.index(sender))]
+                for i, neighbour in enumerate(node.neighbours):
+                    if neighbour != receiver:
+                        inputs.append([i])
+                        operands.append(messages[(neighbour, sender)])
+                lines.append("    {} = torch.einsum('{}', [{}])".format(
+                    message, BatchedInference.equation(inputs, [node.neighbours.index(receiver)]), ", ".join(operands)
+                ))
+            else:
+                operands = [messages[(neighbour, sender)] for neighbour in node.in_messages if neighbour != receiver]
+                lines.append("    {} = {}".format(message, " * ".join(operands)))
+            messages[(sender, receiver)] = message
+
+        # Compute the posterior over all latent states.
+        for i, name in enumerate(self.state_names):
+            operands = [messages[(neighbour, name)] for neighbour in ts.fg[name].in_messages]
+            lines.append("    p{} = {}".format(i, " * ".join(operands)))
+            lines.append("    p{0} = p{0} / p{0}.sum()".format(i))
+        lines.append("    return {},".format(", ".join("p{}".format(i) for i in range(len(self.state_names)))))
+        return "\n".join(lines) + "\n"
+
+    def p_step(self, node):
+        """
+        Expand a node, i.e., create its children for all actions, and compute their posteriors and
+        expected free energy.
+        :param node: the node to expand.
+        :return: the children, whose cost is their expected free energy.
+        """
+        results = self.p_step_kernel(
+            *self.p_step_args, *[node.states_posterior[name] for name in self.planned_states]
+        )
+        n_states = len(self.planned_states)
+        costs = results[-1].tolist()
+        children = []
+        for action in range(self.n_actions):
+            next_ts = node.create_child(action)
+            for i, name in enumerate(self.planned_states):
+                next_ts.states_posterior[name] = results[i][action]
+            for i, name in enumerate(self.planned_obs):
+                next_ts.obs_posterior[name] = results[n_states + i][action]
+            next_ts.cost = costs[action]
+            children.append(next_ts)
+        return children
+
+    def i_step(self, ts, obs):
+        """
+        Perform the I-step of a temporal slice. Only the posteriors over the states are stored, the
+        messages of the factor graph are not.
+        :param ts: the temporal slice.
+        :param obs: the observations made by the agent.
+        :return: nothing.
+        """
+        for name, evidence in obs.items():
+            ts.fg.set_evidence(name, evidence)
+        posteriors = self.i_step_kernel(*[
+            self.evidence(name[2:], ts.fg[name].params) if name[0:2] == "e_" else ts.fg[name].params
+            for name in self.factor_names
+        ])
+        for name, posterior in zip(self.state_names, posteriors):
+            ts.states_posterior[name] = posterior
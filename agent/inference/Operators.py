@@ -1,4 +1,4 @@
-import torch
+from agent.inference.Backend import Backend
 
 
 class Operators:
@@ -12,8 +12,8 @@ class Operators:
         :param dim: the dimension along with the tensor must be expanded.
         :return: the expanded tensor.
         """
-        result = torch.unsqueeze(x1, dim)
-        return result.repeat([n if i == dim else 1 for i in range(result.dim())])
+        result = Backend.unsqueeze(x1, dim)
+        return Backend.repeat(result, [n if i == dim else 1 for i in range(result.ndim)])
 
     @staticmethod
     def multiplication(x1, x2, ml):
@@ -28,14 +28,14 @@ class Operators:
         """
         # Create the list on non-matching dimensions
         not_ml = []
-        for i in range(x1.dim()):
+        for i in range(x1.ndim):
             if i not in ml:
                 not_ml.append(i)
 
         # Sequence of expansions
         x2_tmp = x2
         for i in not_ml:
-            x2_tmp = Operators.expansion(x2_tmp, x1.shape[i], x2_tmp.dim())
+            x2_tmp = Operators.expansion(x2_tmp, x1.shape[i], x2_tmp.ndim)
 
         # Permutation
         pl = [0] * x1.ndim
@@ -44,7 +44,7 @@ class Operators:
                 pl[i] = ml.index(i)
             except ValueError:
                 pl[i] = len(ml) + not_ml.index(i)
-        x2_tmp = x2_tmp.permute(pl)
+        x2_tmp = Backend.permute(x2_tmp, pl)
 
         # Element-wise multiplication
         return x2_tmp * x1
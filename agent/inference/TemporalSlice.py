@@ -1,8 +1,7 @@
 import math
 import queue
-import torch
-from torch.nn.functional import one_hot
 from agent.inference.Operators import Operators
+from agent.inference.Backend import Backend
 
 
 class TemporalSlice:
@@ -13,7 +12,7 @@ class TemporalSlice:
 
     def __init__(
             self, fg, n_actions, action_name, obs_prior_pref, obs_likelihood,
-            states_prior, states_transition, states_parents, obs_parents
+            states_prior, states_transition, states_parents, obs_parents, obs_entropy=None, log_prior_pref=None
     ):
         """
         Create a temporal slice.
@@ -26,6 +25,9 @@ class TemporalSlice:
         :param states_transition: the transition mappings of hidden states.
         :param states_parents: the parents of each state.
         :param obs_parents: the parents of each observation.
+        :param obs_entropy: the entropy of each likelihood mapping, computed from the likelihood mappings if None.
+        :param log_prior_pref: the logarithm of the prior preferences of each observation, flattened, computed from
+            the prior preferences if None.
         """
         self.n_actions = n_actions
         self.action_name = action_name
@@ -33,25 +35,96 @@ class TemporalSlice:
         self.obs_prior_pref = obs_prior_pref
         self.obs_likelihood = obs_likelihood
         self.obs_parents = obs_parents
-        self.initial_states_prior = {k: v.clone() for k, v in states_prior.items()}
+        self.obs_entropy = obs_entropy if obs_entropy is not None else self.compute_entropies(obs_likelihood)
+        self.log_prior_pref = log_prior_pref if log_prior_pref is not None \
+            else self.compute_log_preferences(obs_prior_pref)
+        self.initial_states_prior = {k: Backend.clone(v) for k, v in states_prior.items()}
         self.states_prior = states_prior
         self.states_transition = states_transition
         self.states_parents = states_parents
-        self.states_posterior = {k: torch.ones_like(v) for k, v in states_prior.items()}
-        self.obs_posterior = {k: torch.ones_like(v) for k, v in obs_likelihood.items()}
+        self.states_posterior = {k: Backend.ones_like(v) for k, v in states_prior.items()}
+        self.obs_posterior = {k: Backend.ones_like(v) for k, v in obs_likelihood.items()}
+        self.planned_states = list(states_prior.keys())
+        self.planned_obs = list(obs_likelihood.keys())
         self.action = -1
         self.cost = 0
         self.visits = 1
         self.parent = None
         self.children = []
 
+    @staticmethod
+    def compute_entropies(obs_likelihood):
+        """
+        Compute the entropy of each likelihood mapping, i.e., the ambiguity for each value of the parents.
+        :param obs_likelihood: the likelihood mapping of the observations.
+        :return: the entropies.
+        """
+        entropies = {}
+        for obs_name, likelihood in obs_likelihood.items():
+            entropy = - Backend.log(likelihood)
+            entropies[obs_name] = Operators.average(
+                entropy, likelihood,
+                [i for i in range(entropy.ndim)],
+                [i for i in range(1, entropy.ndim)]
+            )
+        return entropies
+
+    @staticmethod
+    def compute_log_preferences(obs_prior_pref):
+        """
+        Compute the logarithm of the prior preferences, the modalities sharing their preferences
+        sharing the logarithm too.
+        :param obs_prior_pref: the prior preferences over observations.
+        :return: the flattened logarithm of the prior preferences of each observation.
+        """
+        log_prior_pref = {}
+        for obs_name, (rv_names, prior_pref) in obs_prior_pref.items():
+            if rv_names[0] in log_prior_pref:
+                log_prior_pref[obs_name] = log_prior_pref[rv_names[0]]
+            else:
+                log_prior_pref[obs_name] = Backend.log(prior_pref).reshape(-1)
+        return log_prior_pref
+
+    def prune(self, states, obs):
+        """
+        Prune some states and observations from planning, i.e., the P-step and the expected free energy skip them,
+        while the I-step still computes their posterior beliefs.
+        :param states: the names of the states to prune.
+        :param obs: the names of the observations to prune.
+        :return: nothing.
+        """
+        self.planned_states = [name for name in self.states_prior.keys() if name not in states]
+        self.planned_obs = [name for name in self.obs_likelihood.keys() if name not in obs]
+
+    def complete_posteriors(self):
+        """
+        Compute the posterior beliefs over the states and observations that were pruned from planning, by forward
+        predictions from the posterior beliefs of the parent. This is only done for the child reached in the
+        environment, since the pruned states do not depend on the action and only depend on pruned states.
+        :return: nothing.
+        """
+        if self.parent is None:
+            return
+        for state_name in self.states_prior.keys():
+            if state_name not in self.states_posterior:
+                self.states_posterior[state_name] = self.forward_prediction(
+                    self.states_transition[state_name], None,
+                    self.states_parents[state_name], self.parent.states_posterior
+                )
+        for obs_name in self.obs_likelihood.keys():
+            if obs_name not in self.obs_posterior:
+                self.obs_posterior[obs_name] = self.forward_prediction(
+                    self.obs_likelihood[obs_name], None,
+                    self.obs_parents[obs_name], self.states_posterior
+                )
+
     def reset(self):
         """
         Reset the temporal slice attributes to their initial values.
         :return: nothing.
         """
         self.fg.reset_messages()
-        self.states_prior = {k: v.clone() for k, v in self.initial_states_prior.items()}
+        self.states_prior = {k: Backend.clone(v) for k, v in self.initial_states_prior.items()}
         self.cost = 0
         self.visits = 1
         self.parent = None
@@ -76,11 +149,14 @@ class TemporalSlice:
     def i_step(self, obs):
         """
         Perform the I-step, i.e., compute the posterior beliefs using beliefs propagation.
-        :param obs: the observations made by the agent.
+        :param obs: the observations made by the agent, i.e., the index of each observed value or an array
+            encoding the evidence of each observation.
         :return: nothing.
         """
-        # Set the evidence of each observation.
+        # Set the evidence of each observation, using the backend of the temporal slice.
         for name, evidence in obs.items():
+            if not Backend.is_index(evidence):
+                evidence = Backend.like(evidence, self.obs_likelihood[name])
             self.fg.set_evidence(name, evidence)
 
         # Create a queue containing all the leaf nodes.
@@ -98,7 +174,7 @@ class TemporalSlice:
 
         # Compute the posterior over all latent states.
         for node in self.fg.state_nodes():
-            self.states_posterior[node.name] = torch.ones_like(self.states_posterior[node.name])
+            self.states_posterior[node.name] = Backend.ones_like(self.states_posterior[node.name])
             for _, message in node.in_messages.items():
                 self.states_posterior[node.name] *= message
             self.states_posterior[node.name] /= self.states_posterior[node.name].sum()
@@ -153,27 +229,20 @@ class TemporalSlice:
         :return: nothing.
         """
         # Create a new temporal slice.
-        next_ts = TemporalSlice(
-            self.fg, self.n_actions, self.action_name, self.obs_prior_pref,
-            self.obs_likelihood, self.states_prior, self.states_transition,
-            self.states_parents, self.obs_parents
-        )
-        next_ts.action = action
-        next_ts.parent = self
-        self.children.append(next_ts)
+        next_ts = self.create_child(action)
 
         # Create a one hot encoding of the action.
-        action = torch.squeeze(one_hot(torch.tensor([action]), self.n_actions))
+        action = Backend.one_hot(action, self.n_actions, self.states_posterior[next(iter(self.states_posterior))])
 
         # Compute the posterior over the future states.
-        for state_name in self.states_posterior.keys():
+        for state_name in self.planned_states:
             next_ts.states_posterior[state_name] = self.forward_prediction(
                 self.states_transition[state_name], action,
                 self.states_parents[state_name], self.states_posterior
             )
 
         # Compute the posterior over the future observations.
-        for obs_name in self.obs_posterior.keys():
+        for obs_name in self.planned_obs:
             next_ts.obs_posterior[obs_name] = self.forward_prediction(
                 self.obs_likelihood[obs_name], action,
                 self.obs_parents[obs_name], next_ts.states_posterior
@@ -181,6 +250,39 @@ class TemporalSlice:
 
         return next_ts
 
+    def create_child(self, action):
+        """
+        Create a child of the temporal slice, whose posterior beliefs still need to be computed.
+        The child shares the model of its parent, including the initial prior beliefs that are
+        never modified in place, such that only its posterior beliefs are allocated.
+        :param action: the action leading to the child.
+        :return: the child.
+        """
+        next_ts = object.__new__(TemporalSlice)
+        next_ts.n_actions = self.n_actions
+        next_ts.action_name = self.action_name
+        next_ts.fg = self.fg
+        next_ts.obs_prior_pref = self.obs_prior_pref
+        next_ts.obs_likelihood = self.obs_likelihood
+        next_ts.obs_parents = self.obs_parents
+        next_ts.obs_entropy = self.obs_entropy
+        next_ts.log_prior_pref = self.log_prior_pref
+        next_ts.initial_states_prior = self.initial_states_prior
+        next_ts.states_prior = self.states_prior
+        next_ts.states_transition = self.states_transition
+        next_ts.states_parents = self.states_parents
+        next_ts.planned_states = self.planned_states
+        next_ts.planned_obs = self.planned_obs
+        next_ts.states_posterior = {}
+        next_ts.obs_posterior = {}
+        next_ts.action = action
+        next_ts.cost = 0
+        next_ts.visits = 1
+        next_ts.parent = self
+        next_ts.children = []
+        self.children.append(next_ts)
+        return next_ts
+
     def forward_prediction(self, params, action, parents, posteriors):
         """
         Compute the forward prediction of the posterior over a random variable assuming
@@ -213,7 +315,7 @@ class TemporalSlice:
         processed_modalities = []
 
         # For each modality.
-        for obs_name, (rv_names, prior_pref) in self.obs_prior_pref.items():
+        for obs_name, (rv_names, _) in self.obs_prior_pref.items():
 
             # Check if the risk term of this modality has already been computed.
             if obs_name in processed_modalities:
@@ -226,15 +328,15 @@ class TemporalSlice:
                     subset_posterior = self.obs_posterior[rv_name]
                 else:
                     rv_posterior = self.obs_posterior[rv_name]
-                    subset_posterior = torch.outer(subset_posterior, rv_posterior)
-                    subset_posterior = subset_posterior.view(-1)
+                    subset_posterior = Backend.outer(subset_posterior, rv_posterior)
+                    subset_posterior = subset_posterior.reshape(-1)
 
             # Compute the risk term of the expected free energy.
-            risk = subset_posterior * (subset_posterior.log() - prior_pref.log().view(-1))
+            risk = subset_posterior * (Backend.log(subset_posterior) - self.log_prior_pref[obs_name])
             risk = risk.sum()
 
             # Save risk term.
-            risk_terms.append(risk.item())
+            risk_terms.append(float(risk))
 
             # Add the random variable of the subset to the list of processed modalities.
             processed_modalities += rv_names
@@ -248,20 +350,15 @@ class TemporalSlice:
         """
         ambiguity_terms = []
 
-        # For each modality.
-        for obs_name in self.obs_likelihood.keys():
-            # Compute the ambiguity.
-            ambiguity = - self.obs_likelihood[obs_name].log()
-            ambiguity = Operators.average(
-                ambiguity, self.obs_likelihood[obs_name],
-                [i for i in range(ambiguity.dim())],
-                [i for i in range(1, ambiguity.dim())]
-            )
+        # For each modality that is not pruned from planning.
+        for obs_name in self.planned_obs:
+            # Compute the ambiguity, starting from the entropy of the likelihood mapping.
+            ambiguity = self.obs_entropy[obs_name]
             for parent in reversed(self.obs_parents[obs_name]):
                 i = self.obs_parents[obs_name].index(parent)
                 ambiguity = Operators.average(ambiguity, self.states_posterior[parent], [i])
 
             # Save the ambiguity term.
-            ambiguity_terms.append(ambiguity.item())
+            ambiguity_terms.append(float(ambiguity))
 
         return ambiguity_terms
@@ -1,5 +1,6 @@
 from agent.inference.TemporalSlice import TemporalSlice
 from agent.graph.FactorGraph import FactorGraph
+from agent.inference.Backend import Backend
 
 
 class TemporalSliceBuilder:
@@ -112,19 +113,79 @@ class TemporalSliceBuilder:
             self.obs_prior_pref[rv_name] = (rv_names, prior_pref)
         return self
 
-    def build(self):
+    def prunable_variables(self):
+        """
+        Find the states and observations that cannot change the ranking of the actions during planning. A state is
+        relevant if it depends on the action (directly or through its parents), if it is a parent of an observation
+        with prior preferences, or if it is a parent of a relevant state or of an observation depending on a relevant
+        state or on the action. The other states, and the observations without prior preferences whose parents are
+        not relevant, contribute the same expected free energy to all the siblings of the tree.
+        :return: a tuple containing the names of the prunable states and observations.
+        """
+        # Find the states depending on the action.
+        dependent = set()
+        changed = True
+        while changed:
+            changed = False
+            for state, parents in self.states_parents.items():
+                if state not in dependent and any(p == self.action_name or p in dependent for p in parents):
+                    dependent.add(state)
+                    changed = True
+
+        # Find the relevant states, i.e., the states required to compute the expected free energy terms that
+        # depend on the action.
+        relevant = dependent.union(*[self.obs_parents[obs] for obs in self.obs_prior_pref.keys()])
+        changed = True
+        while changed:
+            required = set()
+            for state in relevant:
+                required.update(self.states_parents[state])
+            for parents in self.obs_parents.values():
+                if any(p == self.action_name or p in relevant for p in parents):
+                    required.update(parents)
+            required.discard(self.action_name)
+            changed = not required.issubset(relevant)
+            relevant.update(required)
+
+        # Return the states that are not relevant, and the observations without preferences depending only on them.
+        states = [state for state in self.states_prior.keys() if state not in relevant]
+        obs = [
+            obs for obs, parents in self.obs_parents.items()
+            if obs not in self.obs_prior_pref and all(p in states for p in parents)
+        ]
+        return states, obs
+
+    def build(self, backend="torch", derived=None, prune=False):
         """
         Build the temporal slice.
+        :param backend: the backend used by the inference, i.e., "torch" or "numpy".
+        :param derived: the derived tensors of the model, i.e., a dictionary containing the entries "obs_entropy"
+            and "log_prior_pref", or None to compute them.
+        :param prune: True if the states and observations that cannot change the ranking of the actions should be
+            pruned from planning, False otherwise.
         :return: the created temporal slice.
         """
+        # Convert the parameters to the backend.
+        def convert(dictionary):
+            return {name: Backend.convert(params, backend) for name, params in dictionary.items()}
+        states_prior = convert(self.states_prior)
+        states_transition = convert(self.states_transition)
+        obs_likelihood = convert(self.obs_likelihood)
+        obs_prior_pref = {}
+        for obs, (rv_names, prior_pref) in self.obs_prior_pref.items():
+            if rv_names[0] in obs_prior_pref:
+                obs_prior_pref[obs] = obs_prior_pref[rv_names[0]]
+            else:
+                obs_prior_pref[obs] = (rv_names, Backend.convert(prior_pref, backend))
+
         # Create the factor graph of the temporal slice.
         fg = FactorGraph()
-        for state, params in self.states_prior.items():
+        for state, params in states_prior.items():
             fg.add_variable(state)
             fg.add_factor("f_" + state, [state], params)
-        for obs in self.obs_likelihood.keys():
+        for obs in obs_likelihood.keys():
             fg.add_variable(obs)
-            fg.add_factor("f_" + obs, [obs] + self.obs_parents[obs], self.obs_likelihood[obs])
+            fg.add_factor("f_" + obs, [obs] + self.obs_parents[obs], obs_likelihood[obs])
             fg.add_evidence_placeholder(obs)
 
         # Create the temporal slice.
@@ -134,8 +195,15 @@ class TemporalSliceBuilder:
             raise Exception("No state has been added to the temporal slice.")
         if len(self.states_prior) != len(self.states_transition):
             raise Exception("The number of transitions must equal the number of states.")
-        return TemporalSlice(
-            fg, self.n_actions, self.action_name, self.obs_prior_pref,
-            self.obs_likelihood, self.states_prior, self.states_transition,
-            self.states_parents, self.obs_parents
+        if derived is not None:
+            derived = {name: convert(dictionary) for name, dictionary in derived.items()}
+        ts = TemporalSlice(
+            fg, self.n_actions, self.action_name, obs_prior_pref,
+            obs_likelihood, states_prior, states_transition,
+            self.states_parents, self.obs_parents, **(derived or {})
         )
+
+        # Prune the variables irrelevant to planning, if requested.
+        if prune:
+            ts.prune(*self.prunable_variables())
+        return ts
@@ -0,0 +1,34 @@
+from agent.planning.MCTS import MCTS
+
+
+class CompiledMCTS(MCTS):
+    """
+    Class implementing the Monte-Carlo tree search algorithm, whose expansion and evaluation are
+    performed by the fused kernels of a compiled inference.
+    """
+
+    def __init__(self, exp_const, inference, heuristic=None):
+        """
+        Construct the MCTS algorithm.
+        :param exp_const: the exploration constant of the MCTS algorithm.
+        :param inference: the compiled inference of the temporal slices.
+        :param heuristic: an optional function estimating the cost to go of a leaf node.
+        """
+        super().__init__(exp_const, heuristic)
+        self.inference = inference
+
+    def expansion(self, node):
+        """
+        Expand the node passed as parameters, the cost of its children is their expected free energy.
+        :param node: the node to be expanded.
+        """
+        return self.inference.p_step(node)
+
+    def evaluation(self, nodes):
+        """
+        Evaluate the input nodes, whose expected free energy has been computed during the expansion.
+        :param nodes: the nodes to be evaluated.
+        """
+        if self.heuristic is not None:
+            for node in nodes:
+                node.cost += self.heuristic(node)
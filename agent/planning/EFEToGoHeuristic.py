@@ -0,0 +1,107 @@
+import os
+import numpy as np
+import torch
+from agent.inference.Backend import Backend
+
+
+class EFEToGoHeuristic:
+    """
+    Class implementing a leaf heuristic for the dSprites environment. The heuristic is a table
+    containing the discounted expected free energy to go of each (pos_x, pos_y, shape) state,
+    which is pre-computed offline using value iteration.
+    """
+
+    def __init__(self, table, gamma, weight=1.0, state_names=None):
+        """
+        Construct the heuristic.
+        :param table: the expected free energy to go of each (pos_x, pos_y, shape) state.
+        :param gamma: the discount factor used to compute the table.
+        :param weight: the weight of the heuristic in the cost of the leaf nodes.
+        :param state_names: the names of the states indexing the table's dimensions.
+        """
+        self.table = table
+        self.gamma = gamma
+        self.weight = weight
+        self.state_names = state_names if state_names is not None else ["S_pos_x", "S_pos_y", "S_shape"]
+
+    def __call__(self, node):
+        """
+        Compute the expected free energy to go of a node.
+        :param node: the node whose expected free energy to go must be computed.
+        :return: the expected free energy to go under the node's posterior beliefs.
+        """
+        posteriors = [node.states_posterior[state_name] for state_name in self.state_names]
+        if Backend.is_numpy(posteriors[0]):
+            value = np.einsum("x,y,k,xyk->", *posteriors, Backend.like(self.table, posteriors[0]))
+        else:
+            value = torch.einsum("x,y,k,xyk->", *posteriors, self.table)
+        return self.weight * self.gamma * float(value)
+
+    @staticmethod
+    def compute_table(env, gamma=0.9, noise=0.001, tolerance=1e-6, max_iterations=1000):
+        """
+        Compute the expected free energy to go of each (pos_x, pos_y, shape) state using value iteration.
+        :param env: the dSprites environment wrapped by the dSpritesPreProcessingWrapper.
+        :param gamma: the discount factor.
+        :param noise: the amount of noise in the likelihood and transition mappings.
+        :param tolerance: the maximum change in the table for value iteration to be considered converged.
+        :param max_iterations: the maximum number of value iterations.
+        :return: the table.
+        """
+        # Get the generative model of the environment.
+        a = env.a(noise=noise)
+        b = env.b(noise=noise)
+        c = env.c()
+        a_x, a_y, a_shape = a["O_pos_x"], a["O_pos_y"], a["O_shape"]
+        b_x, b_y, b_shape = b["S_pos_x"], b["S_pos_y"], b["S_shape"]
+        log_pref = c["O_shape_pos_x_y"].log()
+
+        # Compute the expected free energy of being in each state, i.e., the risk plus the ambiguity
+        # of a posterior over states that is a Dirac delta distribution.
+        entropies = [- (likelihood * likelihood.log()).sum(0) for likelihood in [a_x, a_y, a_shape]]
+        entropy = entropies[0].view(-1, 1, 1) + entropies[1].view(1, -1, 1) + entropies[2].view(1, 1, -1)
+        risk = - entropy - torch.einsum("ix,jy,ks,ijk->xys", a_x, a_y, a_shape, log_pref)
+        cost = risk + entropy
+
+        # Perform value iteration.
+        table = torch.zeros_like(cost)
+        for _ in range(max_iterations):
+            values = torch.einsum("wk,uvw->uvk", b_shape, cost + gamma * table)
+            values = torch.einsum("vya,uvk->uyka", b_y, values)
+            values = torch.einsum("uxa,uyka->xyka", b_x, values)
+            new_table = values.min(dim=3).values
+            delta = (new_table - table).abs().max().item()
+            table = new_table
+            if delta < tolerance:
+                break
+        return table
+
+    @staticmethod
+    def load_or_compute(env, cache_dir="./data/cache", gamma=0.9, noise=0.001, weight=1.0):
+        """
+        Load the heuristic from the cache directory, or compute it and store it in the cache directory. The table
+        is written to a temporary file which is then renamed, such that an interrupted run or a concurrent process
+        never leaves a truncated table, and a table that cannot be loaded is recomputed.
+        :param env: the dSprites environment wrapped by the dSpritesPreProcessingWrapper.
+        :param cache_dir: the directory in which the tables are cached.
+        :param gamma: the discount factor.
+        :param noise: the amount of noise in the likelihood and transition mappings.
+        :param weight: the weight of the heuristic in the cost of the leaf nodes.
+        :return: the heuristic.
+        """
+        file_name = "efe_to_go_g{}_r{}_n{}_d{}.pt".format(env.env.granularity, env.env.repeat, noise, gamma)
+        file_name = os.path.join(cache_dir, file_name)
+        table = None
+        if os.path.exists(file_name):
+            try:
+                table = torch.load(file_name)
+            except Exception:
+                # The table is corrupted, e.g., it was written by an older version of the code.
+                table = None
+        if table is None:
+            table = EFEToGoHeuristic.compute_table(env, gamma=gamma, noise=noise)
+            os.makedirs(cache_dir, exist_ok=True)
+            temporary = "{}.{}.tmp".format(file_name, os.getpid())
+            torch.save(table, temporary)
+            os.replace(temporary, file_name)
+        return EFEToGoHeuristic(table, gamma, weight=weight)
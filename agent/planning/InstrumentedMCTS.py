@@ -0,0 +1,79 @@
+import time
+from agent.planning.MCTS import MCTS
+
+
+class InstrumentedMCTS(MCTS):
+    """
+    Class implementing the Monte-Carlo tree search algorithm, while recording the time spent in
+    each phase of the algorithm. This class is only used when statistics are requested, so that
+    the plain MCTS class does not pay for the instrumentation.
+    """
+
+    def __init__(self, exp_const, stats, heuristic=None):
+        """
+        Construct the instrumented MCTS algorithm.
+        :param exp_const: the exploration constant of the MCTS algorithm.
+        :param stats: the statistics in which timers and counters are recorded.
+        :param heuristic: an optional function estimating the cost to go of a leaf node.
+        """
+        super().__init__(exp_const, heuristic)
+        self.stats = stats
+
+    def select_node(self, root):
+        """
+        Select the node to be expanded.
+        :param root: the root of the tree.
+        """
+        start = time.perf_counter()
+        node = super().select_node(root)
+        self.stats.add("select", time.perf_counter() - start)
+
+        # Update the maximum depth of the tree.
+        depth = 1
+        current = node
+        while current is not root:
+            depth += 1
+            current = current.parent
+        self.stats.max_depth = max(self.stats.max_depth, depth)
+        return node
+
+    def expansion(self, node):
+        """
+        Expand the node passed as parameters.
+        :param node: the node to be expanded.
+        """
+        nodes = []
+        for action in range(0, node.n_actions):
+            start = time.perf_counter()
+            nodes.append(node.p_step(action))
+            self.stats.add("p_step", time.perf_counter() - start)
+        self.stats.n_nodes += len(nodes)
+        return nodes
+
+    def evaluation(self, nodes):
+        """
+        Evaluate the input nodes.
+        :param nodes: the nodes to be evaluated.
+        """
+        for node in nodes:
+            start = time.perf_counter()
+            risk = sum(node.compute_risk_terms())
+            risk_end = time.perf_counter()
+            ambiguity = sum(node.compute_ambiguity_terms())
+            ambiguity_end = time.perf_counter()
+            node.cost = risk + ambiguity
+            self.stats.add("risk", risk_end - start)
+            self.stats.add("ambiguity", ambiguity_end - risk_end)
+            self.stats.add("efe", ambiguity_end - start)
+            if self.heuristic is not None:
+                node.cost += self.heuristic(node)
+                self.stats.add("heuristic", time.perf_counter() - ambiguity_end)
+
+    def propagation(self, nodes):
+        """
+        Propagate the cost in the tree and update the number of visits.
+        :param nodes: the nodes that have been expanded.
+        """
+        start = time.perf_counter()
+        super().propagation(nodes)
+        self.stats.add("propagation", time.perf_counter() - start)
@@ -3,12 +3,14 @@ class MCTS:
     Class implementing the Monte-Carlo tree search algorithm.
     """
 
-    def __init__(self, exp_const):
+    def __init__(self, exp_const, heuristic=None):
         """
         Construct the MCTS algorithm.
         :param exp_const: the exploration constant of the MCTS algorithm.
+        :param heuristic: an optional function estimating the cost to go of a leaf node.
         """
         self.exp_const = exp_const
+        self.heuristic = heuristic
 
     def select_node(self, root):
         """
@@ -31,14 +33,15 @@ class MCTS:
             nodes.append(node.p_step(action))
         return nodes
 
-    @staticmethod
-    def evaluation(nodes):
+    def evaluation(self, nodes):
         """
         Evaluate the input nodes.
         :param nodes: the nodes to be evaluated.
         """
         for node in nodes:
             node.cost = node.efe()
+            if self.heuristic is not None:
+                node.cost += self.heuristic(node)
 
     @staticmethod
     def propagation(nodes):
@@ -46,7 +49,7 @@ class MCTS:
         Propagate the cost in the tree and update the number of visits.
         :param nodes: the nodes that have been expanded.
         """
-        best_child = min(nodes, key=lambda x: x.efe())
+        best_child = min(nodes, key=lambda x: x.cost)
         cost = best_child.cost
         current = best_child.parent
         while current is not None:
@@ -0,0 +1,83 @@
+import collections
+import numpy as np
+from agent.inference.Backend import Backend
+
+
+class PlanCache:
+    """
+    Class implementing a least recently used cache of plans, whose keys are the quantised posterior
+    beliefs over the states of the root temporal slice, and whose values are the statistics of the
+    root's children after planning.
+    """
+
+    def __init__(self, max_size=1024, quantum=1e-6):
+        """
+        Construct the plan cache.
+        :param max_size: the maximum number of plans stored, the least recently used plan being evicted.
+        :param quantum: the resolution used to quantise the posterior beliefs.
+        """
+        self.max_size = max_size
+        self.quantum = quantum
+        self.plans = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, ts):
+        """
+        Compute the key of a root temporal slice.
+        :param ts: the root temporal slice.
+        :return: the key, i.e., the bytes of the quantised posterior beliefs over the states.
+        """
+        return b"".join(
+            np.round(Backend.convert(ts.states_posterior[name], "numpy") / self.quantum).astype(np.int64).tobytes()
+            for name in sorted(ts.states_posterior.keys())
+        )
+
+    def get(self, key):
+        """
+        Get the plan associated with a key, and mark it as the most recently used plan.
+        :param key: the key.
+        :return: the plan, or None if the key is not in the cache.
+        """
+        plan = self.plans.get(key)
+        if plan is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.plans.move_to_end(key)
+        return plan
+
+    def put(self, key, ts, action):
+        """
+        Store the plan of a root temporal slice, and evict the least recently used plan if needed.
+        :param key: the key of the root temporal slice.
+        :param ts: the root temporal slice, after planning.
+        :param action: the action selected.
+        :return: nothing.
+        """
+        self.plans[key] = {
+            "action": action,
+            "cost": ts.cost,
+            "visits": ts.visits,
+            "children": [(child.action, child.cost, child.visits) for child in ts.children]
+        }
+        self.plans.move_to_end(key)
+        if len(self.plans) > self.max_size:
+            self.plans.popitem(last=False)
+
+    @staticmethod
+    def restore(ts, plan):
+        """
+        Restore a plan, i.e., expand the root temporal slice once and set the statistics of the root
+        and its children, such that the agent can be updated as if it had planned.
+        :param ts: the root temporal slice.
+        :param plan: the plan.
+        :return: the action selected.
+        """
+        ts.cost = plan["cost"]
+        ts.visits = plan["visits"]
+        for action, cost, visits in plan["children"]:
+            child = ts.p_step(action)
+            child.cost = cost
+            child.visits = visits
+        return plan["action"]
@@ -0,0 +1,72 @@
+class PlanningStats:
+    """
+    Class storing the timers and counters of the planner, i.e., the cumulative time and
+    number of calls of each phase of the action-perception cycle, as well as information
+    about the size of the tree.
+    """
+
+    def __init__(self):
+        """
+        Construct empty statistics.
+        """
+        self.times = {}
+        self.calls = {}
+        self.n_nodes = 0
+        self.max_depth = 0
+        self.iterations = 0
+
+    def reset(self):
+        """
+        Reset all timers and counters.
+        :return: nothing.
+        """
+        self.__init__()
+
+    def add(self, phase, duration, n_calls=1):
+        """
+        Record the time spent in a phase.
+        :param phase: the name of the phase, e.g., "select" or "i_step".
+        :param duration: the time spent in the phase (in seconds).
+        :param n_calls: the number of calls performed during this time.
+        :return: nothing.
+        """
+        self.times[phase] = self.times.get(phase, 0.0) + duration
+        self.calls[phase] = self.calls.get(phase, 0) + n_calls
+
+    def iterations_per_second(self):
+        """
+        Getter.
+        :return: the number of planning iterations performed per second.
+        """
+        planning_time = self.times.get("planning", 0.0)
+        return self.iterations / planning_time if planning_time > 0 else 0.0
+
+    def to_dict(self):
+        """
+        Getter.
+        :return: a dictionary containing all timers and counters.
+        """
+        return {
+            "times": dict(self.times),
+            "calls": dict(self.calls),
+            "n_nodes": self.n_nodes,
+            "max_depth": self.max_depth,
+            "iterations": self.iterations,
+            "iterations_per_second": self.iterations_per_second()
+        }
+
+    def __str__(self):
+        """
+        Create a human readable summary of the statistics.
+        :return: the summary.
+        """
+        lines = ["{:<12} {:>12} {:>10} {:>14}".format("Phase", "Time (sec)", "Calls", "Time/call (us)")]
+        for phase, duration in self.times.items():
+            n_calls = self.calls[phase]
+            lines.append("{:<12} {:>12.4f} {:>10} {:>14.2f}".format(
+                phase, duration, n_calls, 1e6 * duration / n_calls if n_calls != 0 else 0.0
+            ))
+        lines.append("Nodes: {}, max depth: {}, iterations: {}, iterations/sec: {:.2f}".format(
+            self.n_nodes, self.max_depth, self.iterations, self.iterations_per_second()
+        ))
+        return "\n".join(lines)
@@ -14,6 +14,10 @@ class TemporalSliceFrame(tk.Frame):
     temporal slice.
     """
 
+    # The time (in milliseconds) between a refresh request and the redraw, such that the requests made
+    # in the meantime are coalesced into a single redraw per display frame.
+    redraw_delay = 16
+
     def __init__(self, parent, gui):
         """
         Construct the frame that display the temporal slice information.
@@ -47,6 +51,11 @@ class TemporalSliceFrame(tk.Frame):
         # Set position of all widgets.
         self.set_widgets_position()
 
+        # The widgets that must be redrawn, and the identifier of the scheduled redraw.
+        self.is_root = self.gui.current_ts.parent is None
+        self.dirty = set()
+        self.redraw_id = None
+
     def set_widgets_position(self):
         """
         Set all the widgets position.
@@ -74,31 +83,52 @@ class TemporalSliceFrame(tk.Frame):
 
     def refresh(self):
         """
-        Refresh the content of the frame.
+        Mark the widgets depending on the current temporal slice as dirty, and schedule their redraw.
+        The transition model and the prior preferences are shared by all temporal slices, and are never redrawn.
         """
-        # Refresh the widget displaying the transition model.
-        self.transition_canvas.destroy()
-        self.transition_canvas = TransitionModelWidget(self, self.gui)
-
-        # Refresh the widget displaying theprior preferences.
-        self.prior_preferences_canvas.destroy()
-        self.prior_preferences_canvas = PriorPreferencesWidget(self, self.gui)
+        # The beliefs and the MCTS information change with the current temporal slice.
+        self.dirty.update(["mcts", "posterior", "efe_or_msg"])
 
-        # Create the widget displaying the variables posterior.
-        self.efe_or_msg_widget.destroy()
-        self.efe_or_msg_widget = ExpectedFreeEnergyWidget(self, self.gui) \
-            if self.gui.current_ts.parent is not None else MessageWidget(self, self.gui)
+        # The likelihood model and the type of the bottom right widget change when going from the root
+        # to a future temporal slice, and vice versa.
+        is_root = self.gui.current_ts.parent is None
+        if is_root != self.is_root:
+            self.is_root = is_root
+            self.dirty.update(["likelihood", "efe_or_msg_type"])
 
-        # Refresh the MCTS information.
-        self.mcts_widget.refresh()
+        # Schedule the redraw, unless it is already scheduled.
+        if self.redraw_id is None:
+            self.redraw_id = self.after(self.redraw_delay, self.redraw)
 
-        # Refresh the posterior widget.
-        self.posterior_widget.refresh()
+    def redraw(self):
+        """
+        Redraw the dirty widgets, by updating their canvas items in place when possible.
+        :return: nothing.
+        """
+        self.redraw_id = None
+        dirty, self.dirty = self.dirty, set()
+
+        # Recreate the widget displaying the likelihood model.
+        if "likelihood" in dirty:
+            self.likelihood_canvas.destroy()
+            self.likelihood_canvas = LikelihoodModelWidget(self, self.gui)
+            self.likelihood_canvas.grid(row=0, column=0)
+
+        # Recreate or refresh the widget displaying the expected free energy or the messages.
+        if "efe_or_msg_type" in dirty:
+            self.efe_or_msg_widget.destroy()
+            self.efe_or_msg_widget = ExpectedFreeEnergyWidget(self, self.gui) \
+                if self.gui.current_ts.parent is not None else MessageWidget(self, self.gui)
+            self.efe_or_msg_widget.grid(row=2, column=4)
+        elif "efe_or_msg" in dirty:
+            self.efe_or_msg_widget.refresh()
 
-        # Refresh the widget displaying the likelihood model.
-        self.likelihood_canvas.destroy()
-        self.likelihood_canvas = LikelihoodModelWidget(self, self.gui)
+        # Refresh the MCTS information.
+        if "mcts" in dirty:
+            self.mcts_widget.refresh()
 
-        # Set position of all widgets.
-        self.set_widgets_position()
+        # Refresh the posterior widget, keeping the selected variable if it exists in the new temporal slice.
+        if "posterior" in dirty:
+            names = self.posterior_widget.get_variables_names()
+            self.posterior_widget.refresh(self.posterior_widget.cbox.get() not in names)
 
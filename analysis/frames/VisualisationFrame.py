@@ -9,6 +9,9 @@ class VisualisationFrame(tk.Frame):
     and action selection scheme.
     """
 
+    # The size of the environment's frames displayed.
+    image_size = (175, 175)
+
     def __init__(self, parent, gui):
         """
         Construct the visulisation frame.
@@ -26,7 +29,7 @@ class VisualisationFrame(tk.Frame):
         self.node_selected_by_uct = None
 
         # Create the image widget containing the current image of the environment.
-        self.image = self.to_photo_image(gui.env.current_frame())
+        self.image = self.to_photo_image(gui.env.display_frame(self.image_size, Image.BICUBIC))
         self.image_label = tk.Label(self, image=self.image)
         self.image_label.grid(row=0, column=0, sticky=tk.NSEW)
 
@@ -107,14 +110,15 @@ class VisualisationFrame(tk.Frame):
     def to_photo_image(image):
         """
         Transform the input image into a PhotoImage.
-        :param image: a pytorch tensor.
+        :param image: a pillow image already resized by the frame cache, or an array.
         :return: the PhotoImage.
         """
-        size = 175
         if image is None:
             return VisualisationFrame.to_photo_image(np.zeros([64, 64, 3]))
-        image = np.squeeze(image).astype(np.uint8)
-        return ImageTk.PhotoImage(image=Image.fromarray(image).resize((size, size)))
+        if not isinstance(image, Image.Image):
+            image = np.squeeze(image).astype(np.uint8, copy=False)
+            image = Image.fromarray(image).resize(VisualisationFrame.image_size)
+        return ImageTk.PhotoImage(image=image)
 
     def highlight_ancestors_of(self, node, descendant, button, lines_id=None):
         """
@@ -198,7 +202,7 @@ class VisualisationFrame(tk.Frame):
         self.gui.agent.reset(obs)
 
         # Update current image.
-        self.image = self.to_photo_image(self.gui.env.current_frame())
+        self.image = self.to_photo_image(self.gui.env.display_frame(self.image_size, Image.BICUBIC))
         self.image_label.config(image=self.image)
 
         # Update current temporal slice.
@@ -254,7 +258,7 @@ class VisualisationFrame(tk.Frame):
         self.gui.agent.update(action, obs)
 
         # Update current image of the environment.
-        self.image = self.to_photo_image(self.gui.env.current_frame())
+        self.image = self.to_photo_image(self.gui.env.display_frame(self.image_size, Image.BICUBIC))
         self.image_label.config(image=self.image)
 
         # Update current temporal slice.
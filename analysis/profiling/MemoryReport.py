@@ -0,0 +1,151 @@
+import sys
+import time
+import resource
+import tracemalloc
+import numpy as np
+import torch
+
+
+class MemoryReport:
+    """
+    Class computing the memory used by the temporal slices of a planning tree, and the memory
+    allocated while planning.
+    """
+
+    # The categories of the memory breakdown of a temporal slice.
+    categories = ["states_posterior", "obs_posterior", "cloned_priors", "python_overhead"]
+
+    @staticmethod
+    def tensor_bytes(tensor, seen):
+        """
+        Compute the number of bytes of a tensor's storage, unless this storage has already been counted.
+        The storage of a NumPy array is the array owning its buffer, i.e., the last array of its chain of bases.
+        :param tensor: the tensor or array.
+        :param seen: the set of storages already counted, identified by the address of their buffer.
+        :return: the number of bytes.
+        """
+        if isinstance(tensor, torch.Tensor):
+            storage = tensor.untyped_storage()
+            address, n_bytes = storage.data_ptr(), storage.nbytes()
+        elif isinstance(tensor, np.ndarray):
+            while isinstance(tensor.base, np.ndarray):
+                tensor = tensor.base
+            address, n_bytes = tensor.__array_interface__["data"][0], tensor.nbytes
+        else:
+            return 0
+        if address in seen:
+            return 0
+        seen.add(address)
+        return n_bytes
+
+    @staticmethod
+    def slice_bytes(ts, seen=None):
+        """
+        Compute the memory owned by a temporal slice. The model's tensors (likelihoods, transitions,
+        preferences and factor graph) are shared by all temporal slices, and are therefore not counted.
+        :param ts: the temporal slice.
+        :param seen: the set of storages already counted, used to avoid counting shared tensors twice.
+        :return: a dictionary whose keys are the categories and values are numbers of bytes.
+        """
+        seen = set() if seen is None else seen
+        dictionaries = {
+            "states_posterior": ts.states_posterior,
+            "obs_posterior": ts.obs_posterior,
+            "cloned_priors": ts.initial_states_prior
+        }
+        breakdown = {category: 0 for category in MemoryReport.categories}
+        overhead = sys.getsizeof(ts) + sys.getsizeof(ts.__dict__) + sys.getsizeof(ts.children)
+        for category, dictionary in dictionaries.items():
+            overhead += sys.getsizeof(dictionary)
+            for tensor in dictionary.values():
+                breakdown[category] += MemoryReport.tensor_bytes(tensor, seen)
+                overhead += sys.getsizeof(tensor)
+        breakdown["python_overhead"] = overhead
+        return breakdown
+
+    @staticmethod
+    def tree_bytes(root):
+        """
+        Compute the memory owned by all the temporal slices of a tree.
+        :param root: the root of the tree.
+        :return: a dictionary whose keys are the categories, "total" and "n_nodes".
+        """
+        seen = set()
+        report = {category: 0 for category in MemoryReport.categories}
+        n_nodes = 0
+        nodes = [root]
+        while len(nodes) != 0:
+            node = nodes.pop()
+            n_nodes += 1
+            for category, n_bytes in MemoryReport.slice_bytes(node, seen).items():
+                report[category] += n_bytes
+            nodes.extend(node.children)
+        report["total"] = sum(report[category] for category in MemoryReport.categories)
+        report["n_nodes"] = n_nodes
+        report["bytes_per_node"] = report["total"] / n_nodes
+        return report
+
+    @staticmethod
+    def tree_growth(agent, obs, n_iterations, every=10):
+        """
+        Record the memory of the tree as planning progresses.
+        :param agent: the agent.
+        :param obs: the observation used to reset the agent.
+        :param n_iterations: the number of planning iterations.
+        :param every: the number of planning iterations between two measurements.
+        :return: a list of dictionaries containing the iteration and the memory of the tree.
+        """
+        agent.reset(obs)
+        growth = []
+        for i in range(1, n_iterations + 1):
+            node = agent.mcts.select_node(agent.ts)
+            e_nodes = agent.mcts.expansion(node)
+            agent.mcts.evaluation(e_nodes)
+            agent.mcts.propagation(e_nodes)
+            if i % every == 0 or i == n_iterations:
+                growth.append({"iteration": i, **MemoryReport.tree_bytes(agent.ts)})
+        return growth
+
+    @staticmethod
+    def step_peak(agent):
+        """
+        Perform planning and action selection, while recording the peak of memory allocated by Python.
+        The tensors' storages are allocated by torch and are not seen by tracemalloc, they are accounted
+        for by the tree's memory instead.
+        :param agent: the agent.
+        :return: the action selected, and a dictionary describing the memory used during planning.
+        """
+        was_tracing = tracemalloc.is_tracing()
+        if not was_tracing:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        current_start, _ = tracemalloc.get_traced_memory()
+        start = time.perf_counter()
+        action = agent.step()
+        duration = time.perf_counter() - start
+        current_end, peak = tracemalloc.get_traced_memory()
+        if not was_tracing:
+            tracemalloc.stop()
+        return action, {
+            "tracemalloc_peak": peak - current_start,
+            "tracemalloc_retained": current_end - current_start,
+            "max_rss": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024,
+            "step_time": duration,
+            **MemoryReport.tree_bytes(agent.ts)
+        }
+
+    @staticmethod
+    def format(report):
+        """
+        Create a human readable description of the memory of a tree.
+        :param report: the dictionary returned by tree_bytes.
+        :return: the description.
+        """
+        total = report["total"]
+        lines = ["Nodes: {}, total: {:.1f} KiB, per node: {:.0f} bytes".format(
+            report["n_nodes"], total / 1024, report["bytes_per_node"]
+        )]
+        for category in MemoryReport.categories:
+            percentage = 100 * report[category] / total if total > 0 else 0
+            lines.append("  {:<18} {:>12.1f} KiB {:>6.1f}%".format(category, report[category] / 1024, percentage))
+        return "\n".join(lines)
@@ -0,0 +1,313 @@
+import os
+import warnings
+import cProfile
+import pstats
+from torch.profiler import profile, record_function, ProfilerAction, ProfilerActivity
+from agent.inference.Operators import Operators
+from agent.inference.TemporalSlice import TemporalSlice
+from agent.graph.FactorNode import FactorNode
+
+
+class Profiler:
+    """
+    Class capturing a profile of the action-perception cycles using cProfile and/or torch.profiler.
+    Parsing the events recorded by torch.profiler is much slower than the cycles themselves, so only
+    one cycle out of torch_period is recorded. The events of each recorded cycle are aggregated when
+    the cycle ends, so that the memory used by the profiler does not grow with the number of profiled
+    episodes, and cProfile is paused meanwhile.
+    """
+
+    # The functions to which the tensor operations are attributed in the operator-level table.
+    scopes = [
+        (Operators, "expansion"),
+        (Operators, "multiplication"),
+        (Operators, "average"),
+        (FactorNode, "compute_message"),
+        (TemporalSlice, "forward_prediction"),
+        (TemporalSlice, "compute_risk_terms"),
+        (TemporalSlice, "compute_ambiguity_terms")
+    ]
+
+    def __init__(self, output_dir, mode="cprofile", n_top_ops=30, torch_period=10):
+        """
+        Construct the profiler.
+        :param output_dir: the directory in which the profiling results are written.
+        :param mode: the profiler(s) to use, i.e., "cprofile", "torch" or "both".
+        :param n_top_ops: the number of tensor operations displayed in the operator-level table.
+        :param torch_period: the number of action-perception cycles per cycle recorded by torch.profiler.
+        """
+        if mode not in ["cprofile", "torch", "both"]:
+            raise Exception("Profiling mode must be 'cprofile', 'torch' or 'both'.")
+        if torch_period < 1:
+            raise Exception("The period of torch.profiler must be at least one.")
+        self.output_dir = output_dir
+        self.mode = mode
+        self.n_top_ops = n_top_ops
+        self.torch_period = torch_period
+        self.n_torch_cycles = 0
+        self.c_profiler = None
+        self.t_profiler = None
+        self.originals = {}
+        self.torch_stacks = {}
+        self.torch_operators = {}
+
+    def __enter__(self):
+        """
+        Start profiling when entering a with statement.
+        :return: the profiler.
+        """
+        self.start()
+        return self
+
+    def __exit__(self, *_):
+        """
+        Stop profiling and save the results when exiting a with statement.
+        :return: nothing.
+        """
+        self.stop()
+        self.save()
+
+    def start(self):
+        """
+        Start profiling.
+        :return: nothing.
+        """
+        if self.mode in ["torch", "both"]:
+            # The recorded action-perception cycles are aggregated separately, so the
+            # warning about the profiler's schedule is irrelevant.
+            warnings.filterwarnings("ignore", message=".*Profiler clears events at the end of each cycle")
+            self.add_scopes()
+            self.t_profiler = profile(
+                activities=[ProfilerActivity.CPU],
+                schedule=self.torch_schedule,
+                on_trace_ready=self.aggregate_torch_events
+            )
+            self.t_profiler.__enter__()
+        if self.mode in ["cprofile", "both"]:
+            self.c_profiler = cProfile.Profile()
+            self.c_profiler.enable()
+
+    def torch_schedule(self, cycle):
+        """
+        Getter.
+        :param cycle: the index of an action-perception cycle.
+        :return: the action of torch.profiler during this cycle, i.e., the first cycle and then one cycle
+            out of torch_period are recorded and aggregated.
+        """
+        return ProfilerAction.RECORD_AND_SAVE if cycle % self.torch_period == 0 else ProfilerAction.NONE
+
+    def step(self):
+        """
+        Notify the profiler that an action-perception cycle is over.
+        :return: nothing.
+        """
+        if self.t_profiler is not None:
+            self.t_profiler.step()
+
+    def stop(self):
+        """
+        Stop profiling.
+        :return: nothing.
+        """
+        # Stop torch.profiler first, since aggregating its last cycle resumes cProfile.
+        if self.t_profiler is not None:
+            self.t_profiler.__exit__(None, None, None)
+            self.remove_scopes()
+        if self.c_profiler is not None:
+            self.c_profiler.disable()
+
+    def add_scopes(self):
+        """
+        Wrap the functions to which tensor operations are attributed in torch.profiler's record_function.
+        :return: nothing.
+        """
+        for cls, name in self.scopes:
+            descriptor = cls.__dict__[name]
+            self.originals[(cls, name)] = descriptor
+            is_static = isinstance(descriptor, staticmethod)
+            function = descriptor.__func__ if is_static else descriptor
+            function = self.annotate(function, "{}.{}".format(cls.__name__, name))
+            setattr(cls, name, staticmethod(function) if is_static else function)
+
+    def remove_scopes(self):
+        """
+        Restore the functions wrapped by add_scopes.
+        :return: nothing.
+        """
+        for (cls, name), descriptor in self.originals.items():
+            setattr(cls, name, descriptor)
+        self.originals = {}
+
+    @staticmethod
+    def annotate(function, label):
+        """
+        Create a function recording the input function's calls under a label.
+        :param function: the function to annotate.
+        :param label: the label under which the calls are recorded.
+        :return: the annotated function.
+        """
+        def annotated_function(*args, **kwargs):
+            with record_function(label):
+                return function(*args, **kwargs)
+        return annotated_function
+
+    def save(self):
+        """
+        Save the profiling results in the output directory.
+        :return: nothing.
+        """
+        os.makedirs(self.output_dir, exist_ok=True)
+        if self.c_profiler is not None:
+            self.save_cprofile_results()
+        if self.t_profiler is not None:
+            self.save_torch_results()
+
+    def save_cprofile_results(self):
+        """
+        Save the pstats file, a summary of the pstats file and the collapsed stacks of the cProfile run.
+        :return: nothing.
+        """
+        self.c_profiler.dump_stats(os.path.join(self.output_dir, "cprofile.pstats"))
+        with open(os.path.join(self.output_dir, "cprofile.txt"), "w") as file:
+            stats = pstats.Stats(self.c_profiler, stream=file)
+            stats.sort_stats("cumulative").print_stats(50)
+        self.write_collapsed_stacks(
+            os.path.join(self.output_dir, "cprofile.collapsed"), self.cprofile_stacks(stats)
+        )
+
+    @staticmethod
+    def cprofile_stacks(stats):
+        """
+        Reconstruct the call stacks from the call graph of pstats, i.e., the time of each function
+        is split between its callers according to the time spent by each caller in the function.
+        :param stats: the pstats object.
+        :return: a dictionary whose keys are the stacks and values are the self times in microseconds.
+        """
+        # Create the list of callees of each function.
+        callees = {}
+        for function, (_, _, _, _, callers) in stats.stats.items():
+            for caller, (_, _, _, cum_time) in callers.items():
+                callees.setdefault(caller, []).append((function, cum_time))
+
+        # Explore the call graph from each root.
+        stacks = {}
+
+        def explore(function, path, time):
+            _, _, self_time, cum_time, _ = stats.stats[function]
+            scale = time / cum_time if cum_time > 0 else 0
+            path = path + [Profiler.function_name(function)]
+            stack = ";".join(path)
+            stacks[stack] = stacks.get(stack, 0) + self_time * scale * 1e6
+            for callee, callee_time in callees.get(function, []):
+                if Profiler.function_name(callee) not in path:
+                    explore(callee, path, callee_time * scale)
+
+        for function, (_, _, _, cum_time, callers) in stats.stats.items():
+            if len(callers) == 0:
+                explore(function, [], cum_time)
+        return stacks
+
+    @staticmethod
+    def function_name(function):
+        """
+        Getter.
+        :param function: a pstats key, i.e., a tuple (file name, line number, function name).
+        :return: the name of the function to display in the collapsed stacks.
+        """
+        file_name, _, name = function
+        name = name if file_name == "~" else "{}:{}".format(os.path.basename(file_name), name)
+        return name.replace(";", ",")
+
+    def aggregate_torch_events(self, t_profiler):
+        """
+        Add the events recorded by torch.profiler to the collapsed stacks and the operator-level table.
+        :param t_profiler: the torch profiler whose events must be aggregated.
+        :return: nothing.
+        """
+        # Pause cProfile, which would otherwise profile the parsing of the events.
+        if self.c_profiler is not None:
+            self.c_profiler.disable()
+
+        # The stack and the scope of each event, indexed by the event's id, such that each chain of
+        # parents is only walked once.
+        stacks = {}
+        scopes = {}
+        for event in t_profiler.events():
+            # Add the self time of the event to its stack.
+            stack, scope = self.get_stack_and_scope(event, stacks, scopes)
+            self_cpu_time = event.self_cpu_time_total
+            self.torch_stacks[stack] = self.torch_stacks.get(stack, 0) + self_cpu_time
+
+            # Add the self time of the tensor operations to the operator-level table.
+            if event.is_user_annotation:
+                continue
+            key = (event.name, scope if scope != "" else "(other)")
+            n_calls, self_time = self.torch_operators.get(key, (0, 0.0))
+            self.torch_operators[key] = (n_calls + 1, self_time + self_cpu_time)
+        self.n_torch_cycles += 1
+
+        if self.c_profiler is not None:
+            self.c_profiler.enable()
+
+    @staticmethod
+    def get_stack_and_scope(event, stacks, scopes):
+        """
+        Getter.
+        :param event: an event recorded by torch.profiler.
+        :param stacks: the stacks of the events already visited, indexed by the events' ids.
+        :param scopes: the scopes of the events already visited, indexed by the events' ids.
+        :return: the stack of the event, i.e., the names of its parents and its own name separated by
+            semicolons, and the chain of annotated functions in which the event occurred.
+        """
+        key = id(event)
+        if key not in stacks:
+            parent = event.cpu_parent
+            if parent is None:
+                stacks[key], scopes[key] = event.name, ""
+            else:
+                stack, scope = Profiler.get_stack_and_scope(parent, stacks, scopes)
+                if parent.is_user_annotation and not parent.name.startswith("ProfilerStep"):
+                    scope = parent.name if scope == "" else scope + " > " + parent.name
+                stacks[key], scopes[key] = stack + ";" + event.name, scope
+        return stacks[key], scopes[key]
+
+    def save_torch_results(self):
+        """
+        Save the collapsed stacks and the operator-level table of the torch.profiler run.
+        :return: nothing.
+        """
+        self.write_collapsed_stacks(os.path.join(self.output_dir, "torch.collapsed"), self.torch_stacks)
+        self.write_operator_table(os.path.join(self.output_dir, "torch_ops.txt"), self.torch_operators)
+
+    def write_operator_table(self, file_name, operators):
+        """
+        Write the table of the tensor operations with the largest self time.
+        :param file_name: the file in which the table is written.
+        :param operators: a dictionary whose keys are (operator, scope) and values are (number of calls, self time).
+        :return: nothing.
+        """
+        total_time = sum(self_time for _, self_time in operators.values())
+        rows = sorted(operators.items(), key=lambda x: x[1][1], reverse=True)[:self.n_top_ops]
+        with open(file_name, "w") as file:
+            file.write("Action-perception cycles recorded: {} (one every {})\n".format(
+                self.n_torch_cycles, self.torch_period
+            ))
+            file.write("{:<30} {:>10} {:>16} {:>8}  {}\n".format("Operator", "Calls", "Self time (us)", "%", "Scope"))
+            for (operator, scope), (n_calls, self_time) in rows:
+                percentage = 100 * self_time / total_time if total_time > 0 else 0
+                file.write("{:<30} {:>10} {:>16.1f} {:>8.2f}  {}\n".format(
+                    operator, n_calls, self_time, percentage, scope
+                ))
+
+    @staticmethod
+    def write_collapsed_stacks(file_name, stacks):
+        """
+        Write the stacks in the collapsed format used by flamegraph tools.
+        :param file_name: the file in which the stacks are written.
+        :param stacks: a dictionary whose keys are the stacks and values are the self times in microseconds.
+        :return: nothing.
+        """
+        with open(file_name, "w") as file:
+            for stack, self_time in stacks.items():
+                if int(self_time) > 0:
+                    file.write("{} {}\n".format(stack, int(self_time)))
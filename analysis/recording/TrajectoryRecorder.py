@@ -0,0 +1,127 @@
+import os
+import glob
+import queue
+import itertools
+import threading
+import numpy as np
+
+
+class TrajectoryRecorder:
+    """
+    Class recording the trajectories of the environment and the agent, i.e., the states, actions, observations,
+    rewards, frame indices and optionally the planning statistics of each step. The records are queued by the
+    hooks of dSpritesEnv and BTAI_3MF, and a background thread writes them in chunks of compressed NumPy
+    archives. The queue is bounded, and records are dropped (and counted) rather than slowing down the agent.
+    """
+
+    def __init__(self, output_dir, chunk_size=1024, max_pending=8192, planning_stats=False):
+        """
+        Construct the recorder, and start its writer thread.
+        :param output_dir: the directory in which the chunks are written.
+        :param chunk_size: the number of records per chunk.
+        :param max_pending: the maximum number of records waiting to be written.
+        :param planning_stats: True if the statistics of the root's children should be recorded after planning.
+        """
+        self.output_dir = output_dir
+        self.chunk_size = chunk_size
+        self.planning_stats = planning_stats
+        self.queue = queue.Queue(maxsize=max_pending)
+        self.indices = itertools.count()
+        self.dropped = 0
+        self.n_chunks = 0
+        os.makedirs(output_dir, exist_ok=True)
+        self.writer = threading.Thread(target=self.write_records, daemon=True)
+        self.writer.start()
+
+    def __enter__(self):
+        """
+        Enter a with statement.
+        :return: the recorder.
+        """
+        return self
+
+    def __exit__(self, *_):
+        """
+        Write the remaining records when exiting a with statement.
+        :return: nothing.
+        """
+        self.close()
+
+    def record(self, stream, **values):
+        """
+        Queue a record without waiting, the conversion of its values being done by the writer thread.
+        :param stream: the name of the stream, e.g., "env" or "agent_step".
+        :param values: the values of the record, i.e., numbers, tensors, arrays or dictionaries of those.
+        :return: nothing.
+        """
+        try:
+            self.queue.put_nowait((next(self.indices), stream, values))
+        except queue.Full:
+            self.dropped += 1
+
+    def close(self):
+        """
+        Write the remaining records, and stop the writer thread.
+        :return: nothing.
+        """
+        if self.writer.is_alive():
+            self.queue.put(None)
+            self.writer.join()
+
+    def write_records(self):
+        """
+        Write the queued records chunk by chunk, until the recorder is closed.
+        This function runs in the writer thread.
+        :return: nothing.
+        """
+        records = []
+        while True:
+            record = self.queue.get()
+            if record is not None:
+                records.append(record)
+            if len(records) == self.chunk_size or (record is None and len(records) != 0):
+                self.write_chunk(records)
+                records = []
+            if record is None:
+                return
+
+    def write_chunk(self, records):
+        """
+        Write a chunk of records, whose values are stored column by column, i.e., one array per stream and field.
+        The chunk is written in a temporary file first, such that only complete chunks are found on disk.
+        :param records: the records.
+        :return: nothing.
+        """
+        columns = {}
+        for index, stream, values in records:
+            columns.setdefault(stream + ".index", []).append(index)
+            for name, value in values.items():
+                if isinstance(value, dict):
+                    for key, entry in value.items():
+                        columns.setdefault("{}.{}.{}".format(stream, name, key), []).append(np.asarray(entry))
+                else:
+                    columns.setdefault("{}.{}".format(stream, name), []).append(np.asarray(value))
+        arrays = {name: np.stack(column) for name, column in columns.items()}
+        arrays["recorder.dropped"] = np.array(self.dropped)
+
+        path = os.path.join(self.output_dir, "chunk_{:06d}.npz".format(self.n_chunks))
+        with open(path + ".tmp", "wb") as file:
+            np.savez_compressed(file, **arrays)
+        os.replace(path + ".tmp", path)
+        self.n_chunks += 1
+
+    @staticmethod
+    def load(output_dir):
+        """
+        Load the records of a directory.
+        :param output_dir: the directory in which the chunks were written.
+        :return: a dictionary whose keys are "<stream>.<field>" and whose values are the arrays of all the chunks,
+            the global order of the records across streams being given by the "<stream>.index" arrays.
+        """
+        columns = {}
+        for path in sorted(glob.glob(os.path.join(output_dir, "chunk_*.npz"))):
+            with np.load(path) as chunk:
+                for name in chunk.files:
+                    if name != "recorder.dropped":
+                        columns.setdefault(name, []).append(chunk[name])
+        return {name: np.concatenate(column) for name, column in columns.items()}
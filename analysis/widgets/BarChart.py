@@ -0,0 +1,69 @@
+import tkinter as tk
+
+
+class BarChart:
+    """
+    Class drawing a bar chart on a canvas. The rectangles and texts of the chart are created once and then
+    updated in place, i.e., moved and hidden, such that refreshing the chart does not recreate the canvas items.
+    """
+
+    def __init__(self, canvas, x_o, y_o, x_a1, y_a2, color):
+        """
+        Construct the bar chart.
+        :param canvas: the canvas on which the chart is drawn.
+        :param x_o: the x coordinate of the origin.
+        :param y_o: the y coordinate of the origin.
+        :param x_a1: the x coordinate of the end of the horizontal axis.
+        :param y_a2: the y coordinate of the end of the vertical axis.
+        :param color: the color of the bars.
+        """
+        self.canvas = canvas
+        self.x_o = x_o
+        self.y_o = y_o
+        self.x_a1 = x_a1
+        self.y_a2 = y_a2
+        self.color = color
+        self.bars = []
+        self.indices = []
+        self.values = None
+
+    def draw(self, values):
+        """
+        Draw the bar chart, nothing being done if the values did not change since the last call.
+        :param values: the values to display, i.e., a 1D-tensor or array.
+        :return: nothing.
+        """
+        # Check whether the values changed.
+        values = values.tolist()
+        if values == self.values:
+            return
+        self.values = values
+
+        # Get maximum value, width of each bar, and max vertical space.
+        n_values = len(values)
+        max_value = max(values)
+        total_space = self.x_a1 - self.x_o
+        available_space = total_space - 5 * (n_values + 1)
+        bar_width = int(available_space / n_values)
+        max_vspace = self.y_a2 - self.y_o + 15
+
+        # Create the missing bars and indices, which are reused by the next calls.
+        while len(self.bars) < n_values:
+            self.bars.append(self.canvas.create_rectangle(0, 0, 0, 0, fill=self.color))
+            self.indices.append(self.canvas.create_text(0, 0, text=""))
+
+        # Move the bars and indices, and hide the ones that are not used.
+        xshift = self.x_o + 5
+        for i, (bar, index) in enumerate(zip(self.bars, self.indices)):
+            if i >= n_values:
+                self.canvas.itemconfig(bar, state=tk.HIDDEN)
+                self.canvas.itemconfig(index, state=tk.HIDDEN)
+                continue
+            bar_height = int(values[i] / max_value * max_vspace)
+            self.canvas.coords(bar, xshift, self.y_o - 1, xshift + bar_width, self.y_o + bar_height)
+            self.canvas.itemconfig(bar, state=tk.NORMAL)
+            self.canvas.coords(index, xshift + int(bar_width / 2), self.y_o + 10)
+            self.canvas.itemconfig(
+                index, text=str(i), state=tk.NORMAL if n_values <= 10 or i % 5 == 0 else tk.HIDDEN
+            )
+            xshift += 5 + bar_width
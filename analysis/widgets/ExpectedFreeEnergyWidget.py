@@ -43,9 +43,21 @@ class ExpectedFreeEnergyWidget(tk.Frame):
         self.canvas.create_line(self.x_o, self.y_o, self.x_a1, self.y_a1)
         self.canvas.create_line(self.x_o, self.y_o, self.x_a2, self.y_a2, arrow=tk.LAST)
 
-        # The x and y coordinates of the exit cross.
+        # Create the exit cross, which is hidden until the risk or ambiguity terms are displayed.
         self.exit_cross_x = self.x_a1 - 5
         self.exit_cross_y = self.y_a2 - 20
+        self.exit_cross = [
+            self.canvas.create_line(
+                self.exit_cross_x - 5, self.exit_cross_y - 5,
+                self.exit_cross_x + 5, self.exit_cross_y + 5,
+                fill=self.gui.red, width=2, state=tk.HIDDEN
+            ),
+            self.canvas.create_line(
+                self.exit_cross_x - 5, self.exit_cross_y + 5,
+                self.exit_cross_x + 5, self.exit_cross_y - 5,
+                fill=self.gui.red, width=2, state=tk.HIDDEN
+            )
+        ]
 
         # Draw axis labels.
         self.y_label = self.canvas.create_text(self.x_a2, self.y_a2 - 20, text="EFE")
@@ -62,8 +74,9 @@ class ExpectedFreeEnergyWidget(tk.Frame):
         self.display = "EFE"
         self.is_lock = False
         self.data = {}
-        self.bar_tags = []
-        self.index_tags = []
+        self.bars = []
+        self.total_line = self.canvas.create_line(0, 0, 0, 0, width=2, dash=(4, 2))
+        self.total_text = self.canvas.create_text(0, 0, text="")
         self.display_efe()
 
     def display_efe(self):
@@ -71,14 +84,6 @@ class ExpectedFreeEnergyWidget(tk.Frame):
         Display the expected free energy graphically.
         :return: nothing.
         """
-        # Delete the previous bars from the graph.
-        for bar_tag in self.bar_tags:
-            self.canvas.delete(bar_tag)
-        self.bar_tags = []
-        for index_tag in self.index_tags:
-            self.canvas.delete(index_tag)
-        self.index_tags = []
-
         # Update the data that will be displyed.
         self.update_data_to_display()
 
@@ -97,68 +102,40 @@ class ExpectedFreeEnergyWidget(tk.Frame):
         bar_width = 30
         max_vspace = self.y_a2 - self.y_o + 10
 
-        # Display the bars representing posterior probabilities.
+        # Create the missing bars, which are reused by the next calls.
+        while len(self.bars) < len(self.data):
+            self.bars.append(self.canvas.create_rectangle(0, 0, 0, 0))
+
+        # Move the bars representing the terms, and hide the ones that are not used.
         xshift = self.x_o + 20
         yshift = self.y_o - 1
-        for i, (key, value) in enumerate(self.data.items()):
-            # Compute the color of the term being displayed.
-            color = self.colors[i % len(self.colors)]
-
-            # Display a bar for each term.
-            tags = "bar_{}".format(key)
-            self.bar_tags.append(tags)
-            bar_height = int(self.data[key] / ext_value * max_vspace)
-            self.canvas.create_rectangle(
-                xshift, yshift,
-                xshift + bar_width, yshift + bar_height,
-                fill=color, tags=tags
-            )
+        values = list(self.data.values())
+        for i, bar in enumerate(self.bars):
+            if i >= len(values):
+                self.canvas.itemconfig(bar, state=tk.HIDDEN)
+                continue
+            bar_height = int(values[i] / ext_value * max_vspace)
+            self.canvas.coords(bar, xshift, yshift, xshift + bar_width, yshift + bar_height)
+            self.canvas.itemconfig(bar, fill=self.colors[i % len(self.colors)], state=tk.NORMAL)
             yshift += bar_height
             xshift += bar_width
 
-        # Create the horizontal line corresponding to the total value displayed.
-        tags = "index_line"
-        self.index_tags.append(tags)
-        self.canvas.create_line(
-            self.x_o, yshift, xshift, yshift,
-            width=2, tags=tags, dash=(4, 2)
-        )
-
-        # Create text displaying the total value displayed.
-        tags = "index_text"
-        self.index_tags.append(tags)
-        value = round(sum(self.data.values()), 3)
-        self.canvas.create_text(self.x_o - 30, yshift, text=str(value), tags=tags)
+        # Move the horizontal line and the text corresponding to the total value displayed.
+        self.canvas.coords(self.total_line, self.x_o, yshift, xshift, yshift)
+        self.canvas.coords(self.total_text, self.x_o - 30, yshift)
+        self.canvas.itemconfig(self.total_text, text=str(round(sum(values), 3)))
 
         # Display the exit cross if within the risk or ambiguity window.
-        self.remove_exit_cross()
-        if self.display == "Risk" or self.display == "Ambiguity":
-            self.display_exit_cross()
+        state = tk.NORMAL if self.display == "Risk" or self.display == "Ambiguity" else tk.HIDDEN
+        for line in self.exit_cross:
+            self.canvas.itemconfig(line, state=state)
 
-    def remove_exit_cross(self):
+    def displayed_bars(self):
         """
-        Remove the exit cross from the canvas.
-        :return: nothing.
+        Getter.
+        :return: the bars representing the terms currently displayed.
         """
-        items = self.canvas.find_withtag("exit_cross")
-        for item in items:
-            self.canvas.delete(item)
-
-    def display_exit_cross(self):
-        """
-        Display the exit cross.
-        :return: nothing.
-        """
-        self.canvas.create_line(
-            self.exit_cross_x - 5, self.exit_cross_y - 5,
-            self.exit_cross_x + 5, self.exit_cross_y + 5,
-            fill=self.gui.red, tags="exit_cross", width=2
-        )
-        self.canvas.create_line(
-            self.exit_cross_x - 5, self.exit_cross_y + 5,
-            self.exit_cross_x + 5, self.exit_cross_y - 5,
-            fill=self.gui.red, tags="exit_cross", width=2
-        )
+        return self.bars[:len(self.data)]
 
     def update_data_to_display(self):
         """
@@ -204,11 +181,8 @@ class ExpectedFreeEnergyWidget(tk.Frame):
             self.is_lock = False
             return
 
-        for i, bar_tag in enumerate(self.bar_tags):
-            bar = self.canvas.find_withtag(bar_tag)
-            if len(bar) == 0:
-                continue
-            pos = self.canvas.bbox(bar[0])
+        for i, bar in enumerate(self.displayed_bars()):
+            pos = self.canvas.bbox(bar)
 
             # Check if the user asked details about risk or ambiguity.
             new_display = list(self.data.keys())[i]
@@ -235,11 +209,8 @@ class ExpectedFreeEnergyWidget(tk.Frame):
             return
 
         # Display the tooltip if the mouse is over a random variable.
-        for i, bar_tag in enumerate(self.bar_tags):
-            bar = self.canvas.find_withtag(bar_tag)
-            if len(bar) == 0:
-                continue
-            pos = self.canvas.bbox(bar[0])
+        for i, bar in enumerate(self.displayed_bars()):
+            pos = self.canvas.bbox(bar)
             if pos[0] < event.x < pos[2] and pos[1] < event.y < pos[3]:
                 # If tooltip already exists, delete it.
                 if len(self.canvas.find_withtag("tooltip")) != 0:
@@ -1,5 +1,7 @@
 import tkinter as tk
 import tkinter.ttk as ttk
+from agent.inference.Backend import Backend
+from analysis.widgets.BarChart import BarChart
 
 
 class MessageWidget(tk.Frame):
@@ -59,8 +61,7 @@ class MessageWidget(tk.Frame):
         self.canvas.create_window(self.x_a1 - 60, self.y_a1 + 33, window=self.cbox_to)
 
         # Display the probability distribution.
-        self.bar_tags = []
-        self.index_tags = []
+        self.chart = BarChart(self.canvas, self.x_o, self.y_o, self.x_a1, self.y_a2, self.gui.blue)
 
     def get_nodes_names(self):
         """
@@ -80,38 +81,14 @@ class MessageWidget(tk.Frame):
         if node_from == "" or node_to == "":
             return
         message = self.gui.current_ts.fg.nodes[node_to].in_messages[node_from]
-
-        # Delete the previous bars from the graph.
-        for bar_tag in self.bar_tags:
-            self.canvas.delete(bar_tag)
-        for index_tag in self.index_tags:
-            self.canvas.delete(index_tag)
-
-        # Get maximum posterior probability, width of each bar, and max vertical space.
-        n_values = message.size(0)
-        max_value = message.max()
-        total_space = self.x_a1 - self.x_o
-        available_space = total_space - 5 * (n_values + 1)
-        bar_width = int(available_space / n_values)
-        max_vspace = self.y_a2 - self.y_o + 15
-
-        # Display the bars representing posterior probabilities.
-        xshift = self.x_o + 5
-        for i in range(n_values):
-            tags = "bar_{}".format(i)
-            self.bar_tags.append(tags)
-            bar_height = int(message[i] / max_value * max_vspace)
-            self.canvas.create_rectangle(
-                xshift, self.y_a1 - 1, xshift + bar_width, self.y_a1 + bar_height,
-                fill=self.gui.blue, tags=tags
-            )
-            tags = "index_{}".format(i)
-            self.index_tags.append(tags)
-            if n_values <= 10 or i % 5 == 0:
-                self.canvas.create_text(
-                    xshift + int(bar_width / 2), self.y_a1 + 10, text=str(i), tags=tags
-                )
-            xshift += 5 + bar_width
+        if Backend.is_index(message):
+            # The evidence is an index, which is displayed as its one hot encoding.
+            obs_name = node_to if node_to[0:2] == "O_" else node_from
+            likelihood = self.gui.current_ts.obs_likelihood[obs_name]
+            message = Backend.one_hot(message, likelihood.shape[0], likelihood)
+
+        # Update the bars representing the message.
+        self.chart.draw(message)
 
     def get_neighbours(self, node_name):
         """
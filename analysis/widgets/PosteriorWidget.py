@@ -1,5 +1,6 @@
 import tkinter as tk
 import tkinter.ttk as ttk
+from analysis.widgets.BarChart import BarChart
 
 
 class PosteriorWidget(tk.Frame):
@@ -54,8 +55,7 @@ class PosteriorWidget(tk.Frame):
         self.canvas.create_window(self.x_a1 - 60, self.y_a1 + 33, window=self.cbox)
 
         # Display the probability distribution.
-        self.bar_tags = []
-        self.index_tags = []
+        self.chart = BarChart(self.canvas, self.x_o, self.y_o, self.x_a1, self.y_a2, self.gui.blue)
         self.display_posterior()
 
     def get_variables_names(self):
@@ -73,45 +73,13 @@ class PosteriorWidget(tk.Frame):
         Display the posterior beliefs graphically.
         :return: nothing.
         """
-        # Delete the previous bars from the graph.
-        for bar_tag in self.bar_tags:
-            self.canvas.delete(bar_tag)
-        self.bar_tags = []
-        for index_tag in self.index_tags:
-            self.canvas.delete(index_tag)
-        self.index_tags = []
-
-
         # Get posterior parameters.
         var_name = self.cbox.get()
         posterior = self.gui.current_ts.states_posterior[var_name] \
             if var_name[0:2] == "S_" else self.gui.current_ts.obs_posterior[var_name]
 
-        # Get maximum posterior probability, width of each bar, and max vertical space.
-        n_values = posterior.size(0)
-        max_value = posterior.max()
-        total_space = self.x_a1 - self.x_o
-        available_space = total_space - 5 * (n_values + 1)
-        bar_width = int(available_space / n_values)
-        max_vspace = self.y_a2 - self.y_o + 15
-
-        # Display the bars representing posterior probabilities.
-        xshift = self.x_o + 5
-        for i in range(n_values):
-            tags = "bar_{}".format(i)
-            self.bar_tags.append(tags)
-            bar_height = int(posterior[i] / max_value * max_vspace)
-            self.canvas.create_rectangle(
-                xshift, self.y_a1 - 1, xshift + bar_width, self.y_a1 + bar_height,
-                fill=self.gui.blue, tags=tags
-            )
-            tags = "index_{}".format(i)
-            self.index_tags.append(tags)
-            if n_values <= 10 or i % 5 == 0:
-                self.canvas.create_text(
-                    xshift + int(bar_width / 2), self.y_a1 + 10, text=str(i), tags=tags
-                )
-            xshift += 5 + bar_width
+        # Update the bars representing posterior probabilities.
+        self.chart.draw(posterior)
 
     def refresh_widget(self, _):
         """
@@ -0,0 +1,75 @@
+import sys
+import json
+import time
+import platform
+import argparse
+import torch
+import numpy as np
+from benchmarks.MicroBenchmarks import MicroBenchmarks
+from benchmarks.MacroBenchmarks import MacroBenchmarks
+
+
+def parse_arguments():
+    """
+    Parse the command line arguments.
+    :return: the parsed arguments.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark the BTAI_3MF agent in the dSprites environment.")
+    parser.add_argument("--tier", choices=["micro", "macro", "all"], default="all", help="the benchmarks to run")
+    parser.add_argument("--output", default=None, help="the JSON file in which results are written (default: stdout)")
+    parser.add_argument("--seed", type=int, default=0, help="the seed of the random number generators")
+    parser.add_argument("--repeats", type=int, default=7, help="the number of samples per micro-benchmark")
+    parser.add_argument("--number", type=int, default=100, help="the number of calls per micro-benchmark sample")
+    parser.add_argument("--granularity", type=int, default=4, help="the granularity used by the micro-benchmarks")
+    parser.add_argument("--repeat", type=int, default=8, help="the number of times an action is repeated")
+    parser.add_argument(
+        "--granularities", type=int, nargs="+", default=[4, 8], help="the granularities of the macro-benchmarks"
+    )
+    parser.add_argument(
+        "--planning-steps", type=int, nargs="+", default=[10, 50],
+        help="the numbers of planning iterations of the macro-benchmarks"
+    )
+    parser.add_argument("--episodes", type=int, default=5, help="the number of episodes per macro-benchmark")
+    return parser.parse_args()
+
+
+def main():
+    """
+    Run the micro and/or macro benchmarks, and write their results in JSON format.
+    :return: nothing.
+    """
+    args = parse_arguments()
+
+    # Run the requested benchmarks.
+    results = {}
+    if args.tier in ["micro", "all"]:
+        results.update(MicroBenchmarks(
+            args.granularity, args.repeat, seed=args.seed, repeats=args.repeats, number=args.number
+        ).run())
+    if args.tier in ["macro", "all"]:
+        results.update(MacroBenchmarks(
+            args.granularities, args.planning_steps, repeat=args.repeat, n_episodes=args.episodes, seed=args.seed
+        ).run())
+
+    # Write the results along with the information describing the run.
+    report = {
+        "metadata": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "torch": torch.__version__,
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "arguments": {name: value for name, value in vars(args).items() if name != "output"}
+        },
+        "benchmarks": results
+    }
+    if args.output is None:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    else:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+
+
+if __name__ == '__main__':
+    main()
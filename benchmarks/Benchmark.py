@@ -0,0 +1,53 @@
+import time
+import numpy as np
+
+
+class Benchmark:
+    """
+    Class providing the functions used to time the benchmarks and summarise their samples.
+    """
+
+    # The keys of a summary that are computed from the samples.
+    statistics = ["unit", "samples", "median", "iqr", "mean", "min"]
+
+    @staticmethod
+    def measure(function, repeats=7, number=100, setup=None, warmup=1):
+        """
+        Measure the execution time of a function.
+        :param function: the function to time.
+        :param repeats: the number of samples to collect.
+        :param number: the number of calls of the function per sample.
+        :param setup: an optional function called before each sample, which is not timed.
+        :param warmup: the number of samples collected and discarded before measuring.
+        :return: the summary of the samples, i.e., the time per call of each sample and their statistics.
+        """
+        samples = []
+        for i in range(warmup + repeats):
+            if setup is not None:
+                setup()
+            start = time.perf_counter()
+            for _ in range(number):
+                function()
+            duration = (time.perf_counter() - start) / number
+            if i >= warmup:
+                samples.append(duration)
+        return Benchmark.summarise(samples, number=number)
+
+    @staticmethod
+    def summarise(samples, **kwargs):
+        """
+        Compute the statistics of some samples.
+        :param samples: the samples, i.e., durations in seconds.
+        :param kwargs: additional information to store in the summary.
+        :return: the summary of the samples.
+        """
+        q1, median, q3 = np.percentile(samples, [25, 50, 75])
+        return {
+            "unit": "s",
+            "samples": list(samples),
+            "median": float(median),
+            "iqr": float(q3 - q1),
+            "mean": float(np.mean(samples)),
+            "min": float(np.min(samples)),
+            **kwargs
+        }
@@ -0,0 +1,64 @@
+from agent.BTAI_3MF import BTAI_3MF
+from benchmarks.Benchmark import Benchmark
+from experiments.dSpritesExperiment import dSpritesExperiment
+
+
+class MacroBenchmarks:
+    """
+    Class implementing the macro-benchmarks, i.e., the timing of full episodes across a grid
+    of granularities and numbers of planning iterations.
+    """
+
+    def __init__(self, granularities=(4, 8), planning_steps=(10, 50), repeat=8, n_episodes=5, seed=0, exp_const=2.4):
+        """
+        Construct the macro-benchmarks.
+        :param granularities: the granularities of the x and y positions to benchmark.
+        :param planning_steps: the numbers of planning iterations to benchmark.
+        :param repeat: the number of times an action must be repeated.
+        :param n_episodes: the number of episodes per configuration.
+        :param seed: the seed of the random number generators, which is reset for each configuration.
+        :param exp_const: the exploration constant of the Monte-Carlo tree search algorithm.
+        """
+        self.granularities = granularities
+        self.planning_steps = planning_steps
+        self.repeat = repeat
+        self.n_episodes = n_episodes
+        self.seed = seed
+        self.exp_const = exp_const
+
+    def run(self):
+        """
+        Run all the macro-benchmarks.
+        :return: a dictionary whose keys are the benchmarks' names and values are their results.
+        """
+        results = {}
+        for granularity in self.granularities:
+            env = dSpritesExperiment.create_env(granularity, self.repeat, headless=True)
+            for max_planning_steps in self.planning_steps:
+                # The temporal slice is rebuilt so that each configuration is independent of the previous ones.
+                ts = dSpritesExperiment.create_temporal_slice(env)
+                name = "macro/cycle[granularity={},planning_steps={}]".format(granularity, max_planning_steps)
+                results[name] = self.run_configuration(env, ts, max_planning_steps)
+        return results
+
+    def run_configuration(self, env, ts, max_planning_steps):
+        """
+        Run the episodes of a configuration.
+        :param env: the environment.
+        :param ts: the temporal slice.
+        :param max_planning_steps: the number of planning iterations.
+        :return: the summary of the execution time per action-perception cycle of each episode, along with
+            the task's success rate. The time per cycle is used because it is less noisy than the time per
+            episode, whose length varies from one episode to the next.
+        """
+        dSpritesExperiment.seed(self.seed)
+        agent = BTAI_3MF(ts, max_planning_steps=max_planning_steps, exp_const=self.exp_const)
+        episodes = [dSpritesExperiment.run_episode(env, agent) for _ in range(self.n_episodes)]
+        score = sum(episode["reward"] for episode in episodes)
+        return Benchmark.summarise(
+            [episode["execution_time"] / episode["n_steps"] for episode in episodes],
+            n_episodes=self.n_episodes,
+            success_rate=(score + self.n_episodes) / (2 * self.n_episodes),
+            mean_steps=sum(episode["n_steps"] for episode in episodes) / self.n_episodes,
+            mean_episode_time=sum(episode["execution_time"] for episode in episodes) / self.n_episodes
+        )
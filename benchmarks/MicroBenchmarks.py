@@ -0,0 +1,129 @@
+from agent.BTAI_3MF import BTAI_3MF
+from agent.inference.Operators import Operators
+from benchmarks.Benchmark import Benchmark
+from experiments.dSpritesExperiment import dSpritesExperiment
+
+
+class MicroBenchmarks:
+    """
+    Class implementing the micro-benchmarks, i.e., the timing of the building blocks of the
+    action-perception cycle on a fixed dSprites configuration.
+    """
+
+    def __init__(self, granularity=4, repeat=8, seed=0, repeats=7, number=100):
+        """
+        Construct the micro-benchmarks.
+        :param granularity: the granularity of the x and y positions.
+        :param repeat: the number of times an action must be repeated.
+        :param seed: the seed of the random number generators.
+        :param repeats: the number of samples to collect per benchmark.
+        :param number: the number of calls of the benchmarked function per sample.
+        """
+        self.granularity = granularity
+        self.repeat = repeat
+        self.seed = seed
+        self.repeats = repeats
+        self.number = number
+
+        # Create the environment and the agent, and perform a first I-step.
+        dSpritesExperiment.seed(seed)
+        self.env = dSpritesExperiment.create_env(granularity, repeat, headless=True)
+        self.ts = dSpritesExperiment.create_temporal_slice(self.env)
+        self.agent = BTAI_3MF(self.ts, max_planning_steps=1, exp_const=2.4)
+        self.obs = self.env.reset()
+        self.agent.reset(self.obs)
+        self.child = self.ts.p_step(0)
+        self.ts.children = []
+
+    def run(self):
+        """
+        Run all the micro-benchmarks.
+        :return: a dictionary whose keys are the benchmarks' names and values are their results.
+        """
+        benchmarks = {
+            "Operators.average": self.operators_average,
+            "FactorNode.compute_message": self.compute_message,
+            "TemporalSlice.i_step": self.i_step,
+            "TemporalSlice.p_step": self.p_step,
+            "TemporalSlice.efe": self.efe,
+            "MCTS.iteration": self.mcts_iteration,
+            "dSpritesEnv.execute": self.execute
+        }
+        results = {}
+        for name, benchmark in benchmarks.items():
+            results["micro/" + name] = benchmark()
+        return results
+
+    def measure(self, function, setup=None):
+        """
+        Measure the execution time of a function, using the settings of the micro-benchmarks.
+        :param function: the function to time.
+        :param setup: an optional function called before each sample, which is not timed.
+        :return: the summary of the samples.
+        """
+        return Benchmark.measure(function, repeats=self.repeats, number=self.number, setup=setup)
+
+    def operators_average(self):
+        """
+        Time the average of a transition mapping with respect to the posterior over its state.
+        :return: the summary of the samples.
+        """
+        params = self.ts.states_transition["S_pos_y"]
+        posterior = self.ts.states_posterior["S_pos_y"]
+        return self.measure(lambda: Operators.average(params, posterior, [1]))
+
+    def compute_message(self):
+        """
+        Time the computation of the message sent by a likelihood factor to its state.
+        :return: the summary of the samples.
+        """
+        factor = self.ts.fg["f_O_pos_x"]
+        return self.measure(lambda: factor.compute_message("S_pos_x"))
+
+    def i_step(self):
+        """
+        Time the I-step of the root temporal slice.
+        :return: the summary of the samples.
+        """
+        def i_step():
+            self.ts.fg.reset_messages()
+            self.ts.i_step(self.obs)
+        return self.measure(i_step)
+
+    def p_step(self):
+        """
+        Time the P-step of the root temporal slice.
+        :return: the summary of the samples.
+        """
+        def p_step():
+            self.ts.p_step(0)
+            self.ts.children.pop()
+        return self.measure(p_step)
+
+    def efe(self):
+        """
+        Time the computation of the expected free energy of a temporal slice.
+        :return: the summary of the samples.
+        """
+        return self.measure(self.child.efe)
+
+    def mcts_iteration(self):
+        """
+        Time one iteration of the Monte-Carlo tree search, starting from a fresh tree for each sample.
+        :return: the summary of the samples.
+        """
+        def iteration():
+            node = self.agent.mcts.select_node(self.ts)
+            e_nodes = self.agent.mcts.expansion(node)
+            self.agent.mcts.evaluation(e_nodes)
+            self.agent.mcts.propagation(e_nodes)
+        return self.measure(iteration, setup=lambda: self.agent.reset(self.obs))
+
+    def execute(self):
+        """
+        Time the execution of an action in the dSprites environment.
+        :return: the summary of the samples.
+        """
+        env = self.env.env
+        actions = iter(range(self.number * (self.repeats + 1)))
+        return self.measure(lambda: env.execute(next(actions) % env.n_actions), setup=env.reset)
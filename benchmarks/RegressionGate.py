@@ -0,0 +1,120 @@
+import math
+from benchmarks.Benchmark import Benchmark
+
+
+class RegressionGate:
+    """
+    Class comparing benchmark results against a baseline, using noise-aware thresholds.
+    """
+
+    def __init__(self, tolerance=0.1, noise_factor=2.0, max_noise=0.25, success_tolerance=0.05):
+        """
+        Construct the regression gate.
+        :param tolerance: the relative slowdown of the median tolerated, e.g., 0.1 for 10%.
+        :param noise_factor: the number of standard errors the difference of the medians can reach because of noise.
+        :param max_noise: the maximum relative slowdown that can be attributed to noise, e.g., 0.25 for 25%.
+        :param success_tolerance: the drop of success rate tolerated for the macro-benchmarks.
+        """
+        self.tolerance = tolerance
+        self.noise_factor = noise_factor
+        self.max_noise = max_noise
+        self.success_tolerance = success_tolerance
+
+    @staticmethod
+    def median_error(result):
+        """
+        Estimate the standard error of a median, i.e., the interquartile range divided by the square root
+        of the number of samples.
+        :param result: the result of a benchmark.
+        :return: the standard error.
+        """
+        return result["iqr"] / math.sqrt(max(len(result["samples"]), 1))
+
+    @staticmethod
+    def merge(reports):
+        """
+        Merge the results of repeated benchmark runs by pooling their samples.
+        :param reports: the reports produced by the benchmark runs.
+        :return: a dictionary whose keys are the benchmarks' names and values are their pooled results.
+        """
+        samples = {}
+        results = {}
+        for report in reports:
+            for name, result in report["benchmarks"].items():
+                samples.setdefault(name, []).extend(result["samples"])
+                results[name] = result
+        merged = {}
+        for name, result in results.items():
+            extra = {key: value for key, value in result.items() if key not in Benchmark.statistics}
+            merged[name] = Benchmark.summarise(samples[name], **extra)
+        return merged
+
+    def compare(self, baseline, current):
+        """
+        Compare the current results against the baseline results.
+        :param baseline: the baseline results, i.e., a dictionary whose keys are the benchmarks' names.
+        :param current: the current results, i.e., a dictionary whose keys are the benchmarks' names.
+        :return: a list of rows (name, baseline median, current median, relative delta, threshold, status).
+        """
+        rows = []
+        for name in sorted(set(baseline.keys()) | set(current.keys())):
+            if name not in current:
+                rows.append((name, baseline[name]["median"], None, None, None, "missing"))
+                continue
+            if name not in baseline:
+                rows.append((name, None, current[name]["median"], None, None, "new"))
+                continue
+
+            # Compare the medians, with a threshold accounting for the uncertainty of both medians,
+            # the part of the threshold attributed to noise being capped.
+            base, cur = baseline[name], current[name]
+            delta = cur["median"] - base["median"]
+            error = math.sqrt(self.median_error(base) ** 2 + self.median_error(cur) ** 2)
+            noise = min(self.noise_factor * error, self.max_noise * base["median"])
+            threshold = max(self.tolerance * base["median"], noise)
+            if delta > threshold:
+                status = "regression"
+            elif delta < - threshold:
+                status = "improvement"
+            else:
+                status = "ok"
+
+            # Check that the agent still solves the task as well as before.
+            if "success_rate" in base and "success_rate" in cur \
+                    and cur["success_rate"] < base["success_rate"] - self.success_tolerance:
+                status = "regression"
+
+            relative_delta = delta / base["median"] if base["median"] > 0 else 0.0
+            relative_threshold = threshold / base["median"] if base["median"] > 0 else 0.0
+            rows.append((name, base["median"], cur["median"], relative_delta, relative_threshold, status))
+        return rows
+
+    @staticmethod
+    def has_regressions(rows):
+        """
+        Check if a comparison contains regressions.
+        :param rows: the rows returned by compare.
+        :return: True if at least one benchmark regressed, False otherwise.
+        """
+        return any(row[5] == "regression" for row in rows)
+
+    @staticmethod
+    def format(rows):
+        """
+        Create a human readable table of the comparison.
+        :param rows: the rows returned by compare.
+        :return: the table.
+        """
+        def to_str(value, pattern):
+            return "-" if value is None else pattern.format(value)
+
+        width = max([len(row[0]) for row in rows] + [9])
+        lines = ["{:<{}} {:>14} {:>14} {:>9} {:>9}  {}".format(
+            "Benchmark", width, "Baseline (s)", "Current (s)", "Delta", "Noise", "Status"
+        )]
+        for name, base, cur, delta, threshold, status in rows:
+            lines.append("{:<{}} {:>14} {:>14} {:>9} {:>9}  {}".format(
+                name, width, to_str(base, "{:.4g}"), to_str(cur, "{:.4g}"),
+                to_str(delta, "{:+.1%}"), to_str(threshold, "{:.1%}"), status
+            ))
+        return "\n".join(lines)
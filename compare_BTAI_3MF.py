@@ -0,0 +1,79 @@
+import sys
+import json
+import argparse
+from benchmarks.RegressionGate import RegressionGate
+
+
+def parse_arguments():
+    """
+    Parse the command line arguments.
+    :return: the parsed arguments.
+    """
+    parser = argparse.ArgumentParser(
+        description="Compare benchmark results against a baseline, and exit with a non-zero status on regressions.",
+        epilog="To refresh the baseline after an intended performance change, run benchmark_BTAI_3MF.py several "
+               "times on the reference machine, e.g., with --output run1.json, run2.json and run3.json, and then "
+               "run: python compare_BTAI_3MF.py run1.json run2.json run3.json --write-baseline"
+    )
+    parser.add_argument(
+        "results", nargs="+",
+        help="the JSON files produced by benchmark_BTAI_3MF.py, the samples of repeated runs are pooled"
+    )
+    parser.add_argument(
+        "--baseline", default="./benchmarks/baseline.json", help="the JSON file containing the baseline results"
+    )
+    parser.add_argument("--tolerance", type=float, default=0.1, help="the relative slowdown tolerated")
+    parser.add_argument(
+        "--noise-factor", type=float, default=2.0,
+        help="the number of standard errors of the medians' difference attributed to noise"
+    )
+    parser.add_argument(
+        "--max-noise", type=float, default=0.25, help="the maximum relative slowdown attributed to noise"
+    )
+    parser.add_argument(
+        "--success-tolerance", type=float, default=0.05, help="the drop of success rate tolerated"
+    )
+    parser.add_argument(
+        "--write-baseline", action="store_true",
+        help="write the pooled results to the baseline file instead of comparing them against it"
+    )
+    return parser.parse_args()
+
+
+def load_reports(file_names):
+    """
+    Load the reports produced by the benchmark runs.
+    :param file_names: the JSON files to load.
+    :return: the reports.
+    """
+    reports = []
+    for file_name in file_names:
+        with open(file_name) as file:
+            reports.append(json.load(file))
+    return reports
+
+
+def main():
+    """
+    Compare benchmark results against a baseline.
+    :return: nothing.
+    """
+    args = parse_arguments()
+    reports = load_reports(args.results)
+    current = RegressionGate.merge(reports)
+    if args.write_baseline:
+        with open(args.baseline, "w") as file:
+            json.dump({"metadata": reports[0]["metadata"], "benchmarks": current}, file, indent=2)
+            file.write("\n")
+        return
+    baseline = RegressionGate.merge(load_reports([args.baseline]))
+    gate = RegressionGate(args.tolerance, args.noise_factor, args.max_noise, args.success_tolerance)
+    rows = gate.compare(baseline, current)
+    print(RegressionGate.format(rows))
+    if RegressionGate.has_regressions(rows):
+        print("Performance regressions detected.")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,33 @@
+import time
+import argparse
+from data.dSpritesDataset import DataSet
+
+
+def parse_arguments():
+    """
+    Parse the command line arguments.
+    :return: the parsed arguments.
+    """
+    parser = argparse.ArgumentParser(
+        description="Convert the dSprites archive into a memory mapped store, used automatically once created."
+    )
+    parser.add_argument("--archive", default="./data/dsprites.npz", help="the file in which the dataset is stored")
+    parser.add_argument(
+        "--store", default=None, help="the directory of the store (default: the archive's path with extension .mmap)"
+    )
+    return parser.parse_args()
+
+
+def main():
+    """
+    Convert the dSprites dataset.
+    :return: nothing.
+    """
+    args = parse_arguments()
+    start = time.perf_counter()
+    store = DataSet.convert(args.archive, args.store)
+    print("Created {} in {:.1f} seconds".format(store, time.perf_counter() - start))
+
+
+if __name__ == '__main__':
+    main()
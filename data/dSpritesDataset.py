@@ -1,3 +1,7 @@
+import os
+import json
+import shutil
+import zipfile
 import collections
 import numpy as np
 
@@ -11,20 +15,173 @@ class DataSet:
 
     instance = None
 
+    # The latent sizes of the dSprites dataset, used when only the metadata of the dataset is needed.
+    latents_sizes = np.array([1, 3, 6, 40, 32, 32])
+
+    # The files of a memory mapped store, and the number of images copied at once when creating it.
+    images_file = "images.npy"
+    metadata_file = "metadata.json"
+    chunk_size = 16384
+
     @staticmethod
     def get(images_archive):
         """
-        Getter.
-        :param images_archive: the file in which the dataset is stored.
+        Getter. The memory mapped store of the dataset is used if it exists, i.e., if images_archive is a
+        store or if the store of the archive has been created by DataSet.convert. A store is complete if it
+        contains its metadata, which are written last.
+        :param images_archive: the file in which the dataset is stored, or the directory of a memory mapped store.
         :return: an object containing the dSprite dataset.
         """
         if DataSet.instance is None:
+            store = images_archive if os.path.isdir(images_archive) else DataSet.store_path(images_archive)
+            if os.path.isfile(os.path.join(store, DataSet.metadata_file)):
+                DataSet.instance = DataSet.load_store(store)
+                return DataSet.instance
+            if os.path.isdir(images_archive):
+                raise Exception("The memory mapped store {} is incomplete, it must be converted again.".format(store))
             dataset = np.load(images_archive, allow_pickle=True, encoding='latin1')
             images = dataset['imgs'].reshape(-1, 64, 64, 1)
             metadata = dataset['metadata'][()]
             s_sizes = metadata['latents_sizes']  # [1 3 6 40 32 32]
             s_dim = s_sizes.size
-            s_bases = np.concatenate((metadata['latents_sizes'][::-1].cumprod()[::-1][1:], np.array([1, ])))
-            s_bases = np.squeeze(s_bases)  # self.s_bases = [737280 245760  40960 1024 32]
+            s_bases = DataSet.bases(s_sizes)  # self.s_bases = [737280 245760  40960 1024 32]
             DataSet.instance = dSpritesDataset(images, s_sizes, s_dim, s_bases)
         return DataSet.instance
+
+    @staticmethod
+    def get_metadata(images_archive):
+        """
+        Getter loading only the metadata of the dataset, i.e., without loading the images. The metadata come
+        from the dataset if it is already loaded, from the memory mapped store if it exists, and from the
+        bundled latent sizes otherwise.
+        :param images_archive: the file in which the dataset is stored, or the directory of a memory mapped store.
+        :return: the size of each latent dimension, the number of latent dimensions, and their bases.
+        """
+        if DataSet.instance is not None:
+            return DataSet.instance.s_sizes.copy(), DataSet.instance.s_dim, DataSet.instance.s_bases.copy()
+        store = images_archive if os.path.isdir(images_archive) else DataSet.store_path(images_archive)
+        if os.path.isfile(os.path.join(store, DataSet.metadata_file)):
+            s_sizes, s_bases = DataSet.read_metadata(store)
+        else:
+            s_sizes = DataSet.latents_sizes.copy()
+            s_bases = DataSet.bases(s_sizes)
+        return s_sizes, s_sizes.size, s_bases
+
+    @staticmethod
+    def bases(s_sizes):
+        """
+        Compute the bases used to convert the latent values into the index of an image.
+        :param s_sizes: the size of each latent dimension.
+        :return: the bases.
+        """
+        return np.concatenate((s_sizes[::-1].cumprod()[::-1][1:], np.array([1, ])))
+
+    @staticmethod
+    def store_path(images_archive):
+        """
+        Compute the directory of the memory mapped store of a dataset archive.
+        :param images_archive: the file in which the dataset is stored.
+        :return: the directory of the store.
+        """
+        return os.path.splitext(images_archive)[0] + ".mmap"
+
+    @staticmethod
+    def convert(images_archive, store=None):
+        """
+        Convert the compressed dataset archive into a memory mapped store, i.e., a directory containing the
+        uncompressed images in NumPy format and a JSON file containing the metadata. The images are copied
+        chunk by chunk, such that they are never entirely decompressed in memory. The store is created in a
+        temporary directory, which is renamed once the images and then the metadata have been written, such
+        that an interrupted conversion never leaves a partially filled store.
+        :param images_archive: the file in which the dataset is stored.
+        :param store: the directory of the store, by default the archive's path with the extension ".mmap".
+        :return: the directory of the store.
+        """
+        if store is None:
+            store = DataSet.store_path(images_archive)
+        temporary = "{}.{}.tmp".format(store.rstrip(os.sep), os.getpid())
+        shutil.rmtree(temporary, ignore_errors=True)
+        os.makedirs(temporary)
+        try:
+            DataSet.write_store(images_archive, temporary)
+        except BaseException:
+            shutil.rmtree(temporary, ignore_errors=True)
+            raise
+
+        # Replace the previous store, if any, by the new store.
+        if os.path.isdir(store):
+            shutil.rmtree(store)
+        os.replace(temporary, store)
+        return store
+
+    @staticmethod
+    def write_store(images_archive, store):
+        """
+        Write the images and then the metadata of a dataset archive in a memory mapped store.
+        :param images_archive: the file in which the dataset is stored.
+        :param store: the directory of the store, which must exist.
+        :return: nothing.
+        """
+        # Copy the images from the archive to the store.
+        with zipfile.ZipFile(images_archive) as archive, archive.open("imgs.npy") as source:
+            version = np.lib.format.read_magic(source)
+            if version == (1, 0):
+                shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(source)
+            else:
+                shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(source)
+            if fortran_order:
+                raise Exception("The images of {} are not stored in C order.".format(images_archive))
+            images = np.lib.format.open_memmap(
+                os.path.join(store, DataSet.images_file), mode="w+", dtype=dtype, shape=(shape[0], 64, 64, 1)
+            )
+            image_size = images[0].nbytes
+            for start in range(0, shape[0], DataSet.chunk_size):
+                end = min(start + DataSet.chunk_size, shape[0])
+                chunk = np.frombuffer(source.read((end - start) * image_size), dtype=dtype)
+                images[start:end] = chunk.reshape(-1, 64, 64, 1)
+            images.flush()
+            del images
+
+        # Write the metadata, whose presence indicates that the store is complete.
+        dataset = np.load(images_archive, allow_pickle=True, encoding='latin1')
+        s_sizes = dataset['metadata'][()]['latents_sizes']
+        s_bases = DataSet.bases(s_sizes)
+        with open(os.path.join(store, DataSet.metadata_file), "w") as file:
+            json.dump({"s_sizes": s_sizes.tolist(), "s_bases": s_bases.tolist()}, file)
+
+    @staticmethod
+    def load_store(store):
+        """
+        Load the dataset from a memory mapped store. The images are mapped read-only, such that the processes
+        using the dataset share their pages, and the images are read from disk only when they are accessed.
+        :param store: the directory of the store.
+        :return: an object containing the dSprite dataset.
+        """
+        s_sizes, s_bases = DataSet.read_metadata(store)
+        images = np.load(os.path.join(store, DataSet.images_file), mmap_mode="r")
+        return dSpritesDataset(images, s_sizes, s_sizes.size, s_bases)
+
+    @staticmethod
+    def read_metadata(store):
+        """
+        Read the metadata of a memory mapped store.
+        :param store: the directory of the store.
+        :return: the size of each latent dimension and their bases.
+        """
+        with open(os.path.join(store, DataSet.metadata_file)) as file:
+            metadata = json.load(file)
+        return np.array(metadata["s_sizes"]), np.array(metadata["s_bases"])
+
+    @staticmethod
+    def use_synthetic():
+        """
+        Replace the dSprites dataset by a synthetic stand-in, which has the same latent sizes and bases
+        but only contains blank images. This allows the environment to run without dsprites.npz.
+        :return: an object containing the synthetic dataset.
+        """
+        s_sizes = DataSet.latents_sizes.copy()
+        s_dim = s_sizes.size
+        s_bases = DataSet.bases(s_sizes)
+        images = np.broadcast_to(np.zeros([1, 64, 64, 1], dtype=np.uint8), (s_sizes.prod(), 64, 64, 1))
+        DataSet.instance = dSpritesDataset(images, s_sizes, s_dim, s_bases)
+        return DataSet.instance
@@ -1,6 +1,8 @@
 import random
 import torch
 from env.viewer.DefaultViewer import DefaultViewer
+from env.viewer.FrameCache import FrameCache
+from env.viewer.ProcessViewer import ProcessViewer
 from data.dSpritesDataset import DataSet
 import numpy as np
 
@@ -10,12 +12,17 @@ class dSpritesEnv:
     A class implementing the dSprites environment.
     """
 
-    def __init__(self, granularity=4, repeat=8, dataset_file="./data/dsprites.npz"):
+    def __init__(self, granularity=4, repeat=8, dataset_file="./data/dsprites.npz", headless=False,
+                 viewer_process=False):
         """
         Construct the dSprites environment.
         :param granularity: the granularity of the x and y positions.
         :param repeat: the number of times an action must be repeated.
         :param dataset_file: path to the file containing the dSprites dataset.
+        :param headless: True if only the metadata of the dataset should be loaded, the images being loaded
+            the first time a frame is requested, False otherwise.
+        :param viewer_process: True if the environment should be displayed by a separate process, which never
+            blocks the action-perception cycles, False otherwise.
         """
         self.n_actions = 4
         self.granularity = granularity
@@ -27,16 +34,25 @@ class dSpritesEnv:
         self.max_episode_length = 50
         self.need_reset = False
 
-        self.images, self.s_sizes, self.s_dim, self.s_bases = DataSet.get(dataset_file)
+        self.dataset_file = dataset_file
+        if headless:
+            self.images = None
+            self.s_sizes, self.s_dim, self.s_bases = DataSet.get_metadata(dataset_file)
+        else:
+            self.images, self.s_sizes, self.s_dim, self.s_bases = DataSet.get(dataset_file)
         self.s_dim = self.s_sizes.size
         self.state = torch.zeros(self.s_dim)
         self.s_bases_obs = torch.tensor([0, self.n_pos * (self.n_pos + 1), 0, 0, self.n_pos + 1, 1])
         self.s_bases_img = torch.tensor([737280, 245760, 40960, 1024, 32, 1])
 
         # Graphical interface
-        self.np_precision = np.float64
+        self.frame_cache = FrameCache()
+        self.viewer_process = viewer_process
         self.viewer = None
 
+        # The trajectory recorder notified of each reset and step, if any.
+        self.recorder = None
+
     def reset_hidden_state(self):
         """
         Reset the hidden state of the environment.
@@ -56,6 +72,8 @@ class dSpritesEnv:
         self.frame_id = 0
         self.need_reset = False
         self.reset_hidden_state()
+        if self.recorder is not None:
+            self.recorder.record("env_reset", state=self.state)
         return self.state.clone()
 
     @staticmethod
@@ -145,6 +163,10 @@ class dSpritesEnv:
         if self.frame_id >= self.max_episode_length:
             self.need_reset = True
             self.last_r = -1
+        if self.recorder is not None:
+            self.recorder.record(
+                "env", frame_id=self.frame_id, action=action, state=self.state, reward=self.last_r, done=self.need_reset
+            )
         return self.state.clone()
 
     def compute_square_reward(self):
@@ -176,19 +198,52 @@ class dSpritesEnv:
         :return: nothing.
         """
         if self.viewer is None:
-            self.viewer = DefaultViewer('dSprites', self.last_r, self.current_frame(), frame_id=self.frame_id)
-        else:
+            viewer = ProcessViewer if self.viewer_process else DefaultViewer
+            self.viewer = viewer('dSprites', self.last_r, self.current_frame(), frame_id=self.frame_id)
+        elif self.viewer_process:
+            # The frames are resized by the viewer's process.
             self.viewer.update(self.last_r, self.current_frame(), self.frame_id)
+        else:
+            frame = self.display_frame(self.viewer.image_size, self.viewer.resize_type)
+            self.viewer.update(self.last_r, frame, self.frame_id)
+
+    def close(self):
+        """
+        Close the viewer displaying the environment, if it runs in a separate process.
+        :return: nothing.
+        """
+        if self.viewer_process and self.viewer is not None:
+            self.viewer.close()
+            self.viewer = None
 
     def current_frame(self):
         """
         Return the current frame (i.e. the current observation).
-        :return: the current observation.
+        :return: the current observation as an RGB image of type uint8.
+        """
+        index = self.current_frame_index()
+        return None if index is None else FrameCache.rgb(self.images[index])
+
+    def display_frame(self, size, resize_type):
+        """
+        Return the current frame converted and resized for display, which is cached for later use.
+        :param size: the size of the frame.
+        :param resize_type: the type of resize to perform.
+        :return: the frame as a pillow image.
+        """
+        index = self.current_frame_index()
+        return None if index is None else self.frame_cache.get(self.images, index, size, resize_type)
+
+    def current_frame_index(self):
+        """
+        Return the index of the current frame in the dataset, and load the images if needed.
+        :return: the index, or None if the object crossed the bottom of the image.
         """
         if self.state[5] >= 32:
             return None
-        image = self.images[self.s_to_index(self.state)].astype(self.np_precision)
-        return np.repeat(image, 3, 2) * 255.0
+        if self.images is None:
+            self.images = DataSet.get(self.dataset_file).images
+        return int(self.s_to_index(self.state))
 
     def s_to_index(self, s):
         """
@@ -0,0 +1,156 @@
+import random
+import torch
+from torch.nn.functional import one_hot
+from data.dSpritesDataset import DataSet
+
+
+class dSpritesVectorEnv:
+    """
+    A class implementing several instances of the dSprites environment, whose states are stored in a
+    single integer tensor and are updated in one call. The dynamics, rewards and episode terminations
+    are the same as in dSpritesEnv.
+    """
+
+    def __init__(self, n_envs, granularity=4, repeat=8, auto_reset=False, dataset_file="./data/dsprites.npz"):
+        """
+        Construct the vectorised dSprites environment.
+        :param n_envs: the number of environments.
+        :param granularity: the granularity of the x and y positions.
+        :param repeat: the number of times an action must be repeated.
+        :param auto_reset: True if the environments whose episode is over must be reset automatically.
+        :param dataset_file: path to the file containing the dSprites dataset, whose images are never loaded.
+        """
+        self.n_envs = n_envs
+        self.n_actions = 4
+        self.granularity = granularity
+        self.repeat = repeat
+        self.auto_reset = auto_reset
+
+        self.n_pos = 32 / self.granularity
+        self.max_episode_length = 50
+
+        self.s_sizes, self.s_dim, self.s_bases = DataSet.get_metadata(dataset_file)
+        self.s_dim = self.s_sizes.size
+        self.states = torch.zeros([n_envs, self.s_dim], dtype=torch.int64)
+        self.last_r = torch.zeros(n_envs, dtype=torch.float64)
+        self.frame_ids = torch.zeros(n_envs, dtype=torch.int64)
+        self.need_reset = torch.zeros(n_envs, dtype=torch.bool)
+
+        # The observations' names and sizes, after accounting for the granularity.
+        self.obs_names = ["O_color", "O_shape", "O_scale", "O_orientation", "O_pos_x", "O_pos_y"]
+        self.obs_sizes = [int(size) for size in self.s_sizes]
+        self.obs_sizes[4] = int(self.s_sizes[4] // self.granularity)
+        self.obs_sizes[5] = int(self.s_sizes[5] // self.granularity) + 1
+
+    def reset(self, indices=None):
+        """
+        Reset some environments.
+        :param indices: the indices of the environments to reset, or None to reset all the environments.
+        :return: the states of all the environments.
+        """
+        if indices is None:
+            indices = range(self.n_envs)
+        for i in indices:
+            self.last_r[i] = 0.0
+            self.frame_ids[i] = 0
+            self.need_reset[i] = False
+            for j in range(0, self.s_dim):
+                self.states[i, j] = random.randint(0, self.s_sizes[j] - 1)
+        return self.states.clone()
+
+    @staticmethod
+    def simulate(actions, states, repeat):
+        """
+        Simulate the execution of actions from several states. The repeated moves of dSpritesEnv.simulate
+        are replaced by their closed form, i.e., a single move clamped to the borders of the image.
+        :param actions: the actions to be simulated, i.e., 0 (down), 1 (up), 2 (left) or 3 (right).
+        :param states: the states from which the actions are executed, one per row.
+        :param repeat: the number of times each action must be repeated.
+        :return: the new states after performing the actions.
+        """
+        actions = torch.as_tensor(actions)
+        res = states.clone()
+        x_pos, y_pos = states[:, 4], states[:, 5]
+
+        # Compute the destinations, a move never bringing the object back from outside the image.
+        y_dest = torch.where(actions == 0, torch.maximum(y_pos, torch.clamp(y_pos + repeat, max=32)), y_pos)
+        y_dest = torch.where(actions == 1, torch.minimum(y_dest, torch.clamp(y_pos - repeat, min=0)), y_dest)
+        x_dest = torch.where(actions == 2, torch.minimum(x_pos, torch.clamp(x_pos - repeat, min=0)), x_pos)
+        x_dest = torch.where(actions == 3, torch.maximum(x_dest, torch.clamp(x_pos + repeat, max=31)), x_dest)
+
+        # The objects that crossed the bottom of the image are in an absorbing state.
+        absorbing = y_pos >= 32
+        res[:, 4] = torch.where(absorbing, x_pos, x_dest)
+        res[:, 5] = torch.where(absorbing, y_pos, y_dest)
+        return res
+
+    def execute(self, actions):
+        """
+        Execute one action in each environment.
+        :param actions: the actions to be executed, one per environment.
+        :return: the states of the environments, the last rewards obtained, and whether the episodes are
+            over. If auto_reset is True, the environments whose episode is over are reset before returning,
+            and their states are the initial states of the new episodes.
+        """
+
+        # Increase the frame indices, and simulate the actions requested by the user.
+        self.frame_ids += 1
+        self.states = self.simulate(actions, self.states, self.repeat)
+
+        # Compute the rewards of the objects that crossed the bottom line.
+        crossed = self.states[:, 5] >= 32
+        x_pos = self.states[:, 4].to(torch.float64)
+        square_r = torch.where(x_pos > 15, (15.0 - x_pos) / 16.0, (16.0 - x_pos) / 16.0)
+        non_square_r = torch.where(x_pos > 15, (x_pos - 15.0) / 16.0, (x_pos - 16.0) / 16.0)
+        rewards = torch.where(self.states[:, 1] < 0.5, square_r, non_square_r)
+        self.last_r = torch.where(crossed, rewards, self.last_r)
+        self.need_reset |= crossed
+
+        # Make sure the environments are reset if the maximum number of steps in the episode has been reached.
+        timeout = self.frame_ids >= self.max_episode_length
+        self.last_r[timeout] = -1.0
+        self.need_reset |= timeout
+
+        states, rewards, dones = self.states.clone(), self.last_r.clone(), self.need_reset.clone()
+        if self.auto_reset and dones.any():
+            states = self.reset(dones.nonzero().squeeze(1).tolist())
+        return states, rewards, dones
+
+    def observations(self, states):
+        """
+        Perform the pre-processing of dSpritesPreProcessingWrapper on several states, the observed values
+        being encoded as one hot vectors instead of indices.
+        :param states: the states, one per row.
+        :return: a dictionary whose keys are the observations' names, and whose values are the one hot
+            encodings of the observations of all the states.
+        """
+        states = states.clone()
+        states[:, 4] //= self.granularity
+        states[:, 5] //= self.granularity
+        return {
+            self.obs_names[i]: one_hot(states[:, i].to(torch.int64), self.obs_sizes[i])
+            for i in range(1, self.s_dim)
+        }
+
+    def split(self, observations):
+        """
+        Split the observations of all the environments into one dictionary per environment.
+        :param observations: the observations returned by the observations function.
+        :return: the list of observations of each environment.
+        """
+        names = list(observations.keys())
+        return [dict(zip(names, obs)) for obs in zip(*(observations[name] for name in names))]
+
+    def get_reward(self):
+        """
+        Getter.
+        :return: the last reward obtained in each environment.
+        """
+        return self.last_r
+
+    def done(self):
+        """
+        Getter.
+        :return: a boolean tensor indicating which trials are over.
+        """
+        return self.need_reset
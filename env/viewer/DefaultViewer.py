@@ -83,8 +83,10 @@ class DefaultViewer:
     def to_photo_image(self, img):
         """
         Returns the input image as an PhotoImage, i.e. the format require for display.
+        :param img: the image, either an array or a pillow image already resized by the frame cache.
         :return: the formatted input image required by pillow and tkinter for render.
         """
-        img = Image.fromarray(img.astype(np.uint8))
-        img = img.resize(self.image_size, self.resize_type)
+        if not isinstance(img, Image.Image):
+            img = Image.fromarray(img.astype(np.uint8, copy=False))
+            img = img.resize(self.image_size, self.resize_type)
         return ImageTk.PhotoImage(img)
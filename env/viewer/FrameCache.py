@@ -0,0 +1,47 @@
+import collections
+import numpy as np
+from PIL import Image
+
+
+class FrameCache:
+    """
+    Class implementing a least recently used cache of the frames displayed by the viewers, i.e., the images
+    of the dataset converted to RGB and resized, whose keys are the images' indices and display settings.
+    """
+
+    def __init__(self, max_size=4096):
+        """
+        Construct the frame cache.
+        :param max_size: the maximum number of frames stored, the least recently used frame being evicted.
+        """
+        self.max_size = max_size
+        self.frames = collections.OrderedDict()
+
+    @staticmethod
+    def rgb(image):
+        """
+        Convert an image of the dataset, whose pixels are zero or one, into an RGB image.
+        :param image: the image of the dataset, whose shape is [64, 64, 1].
+        :return: the RGB image of type uint8, whose pixels are zero or 255.
+        """
+        return np.repeat(image, 3, 2) * np.uint8(255)
+
+    def get(self, images, index, size, resize_type):
+        """
+        Get a frame ready to be displayed, and mark it as the most recently used frame.
+        :param images: the images of the dataset.
+        :param index: the index of the image to display.
+        :param size: the size of the frame.
+        :param resize_type: the type of resize to perform.
+        :return: the frame as a pillow image.
+        """
+        key = (index, tuple(size), resize_type)
+        frame = self.frames.get(key)
+        if frame is not None:
+            self.frames.move_to_end(key)
+            return frame
+        frame = Image.fromarray(self.rgb(images[index])).resize(size, resize_type)
+        self.frames[key] = frame
+        if len(self.frames) > self.max_size:
+            self.frames.popitem(last=False)
+        return frame
@@ -0,0 +1,98 @@
+import numpy as np
+from multiprocessing.shared_memory import SharedMemory
+
+
+class FrameRing:
+    """
+    Class implementing a ring buffer of frames in shared memory, written by the process running the agent
+    and read by the process displaying the environment. The writer never waits for the reader: it overwrites
+    the oldest slot, and the reader only displays the latest frame, i.e., frames are dropped when the reader
+    falls behind. Each slot has a sequence number, which is odd while the slot is written, such that the
+    reader can detect and skip frames that were overwritten while being read.
+    """
+
+    def __init__(self, shape, n_slots=4, name=None):
+        """
+        Construct the ring buffer, or attach to an existing one.
+        :param shape: the shape of the frames, which are of type uint8.
+        :param n_slots: the number of slots in the ring buffer.
+        :param name: the name of the shared memory to attach to, or None to create a new ring buffer.
+        """
+        self.shape = tuple(shape)
+        self.n_slots = n_slots
+        frame_size = int(np.prod(self.shape))
+        size = 16 + 24 * n_slots + frame_size * n_slots
+        self.memory = SharedMemory(name=name, create=name is None, size=size)
+
+        # The control block contains the number of frames written and a flag set when the writer is closed.
+        buffer = self.memory.buf
+        self.control = np.ndarray([2], np.int64, buffer, 0)
+        self.sequences = np.ndarray([n_slots], np.int64, buffer, 16)
+        self.rewards = np.ndarray([n_slots], np.float64, buffer, 16 + 8 * n_slots)
+        self.frame_ids = np.ndarray([n_slots], np.int64, buffer, 16 + 16 * n_slots)
+        self.frames = np.ndarray([n_slots, *self.shape], np.uint8, buffer, 16 + 24 * n_slots)
+        if name is None:
+            self.control[:] = 0
+            self.sequences[:] = 0
+
+    def write(self, reward, frame, frame_id):
+        """
+        Write a frame in the next slot, without waiting for the reader.
+        :param reward: the reward to display.
+        :param frame: the frame to display.
+        :param frame_id: the index of the frame.
+        :return: nothing.
+        """
+        count = int(self.control[0])
+        slot = count % self.n_slots
+        self.sequences[slot] += 1
+        self.rewards[slot] = reward
+        self.frame_ids[slot] = frame_id
+        self.frames[slot] = frame
+        self.sequences[slot] += 1
+        self.control[0] = count + 1
+
+    def read_latest(self, count):
+        """
+        Read the latest frame written.
+        :param count: the number of frames written when the previous frame was read.
+        :return: a tuple containing the number of frames written, the reward, the frame and the index of the
+            frame, or None if no new frame is available or if the latest frame was overwritten while being read.
+        """
+        latest = int(self.control[0])
+        if latest == count:
+            return None
+        slot = (latest - 1) % self.n_slots
+        sequence = int(self.sequences[slot])
+        if sequence % 2 == 1:
+            return None
+        reward, frame, frame_id = float(self.rewards[slot]), self.frames[slot].copy(), int(self.frame_ids[slot])
+        if int(self.sequences[slot]) != sequence:
+            return None
+        return latest, reward, frame, frame_id
+
+    def close_writer(self):
+        """
+        Notify the reader that no more frames will be written.
+        :return: nothing.
+        """
+        self.control[1] = 1
+
+    def writer_closed(self):
+        """
+        Getter.
+        :return: True if the writer is closed, False otherwise.
+        """
+        return bool(self.control[1])
+
+    def release(self, unlink=False):
+        """
+        Release the shared memory of the current process.
+        :param unlink: True if the shared memory should be destroyed, which is done by the writer.
+        :return: nothing.
+        """
+        # The views on the shared memory must be deleted before it is closed.
+        self.control = self.sequences = self.rewards = self.frame_ids = self.frames = None
+        self.memory.close()
+        if unlink:
+            self.memory.unlink()
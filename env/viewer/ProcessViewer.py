@@ -0,0 +1,106 @@
+import time
+import atexit
+import multiprocessing
+from tkinter import TclError
+from PIL import Image
+from env.viewer.FrameRing import FrameRing
+
+
+class ProcessViewer:
+    """
+    Class implementing a viewer displaying an environment in a separate process. The frames are sent through
+    a ring buffer in shared memory, such that updating the viewer never blocks the action-perception cycles,
+    and the frames are dropped if the viewer falls behind.
+    """
+
+    def __init__(self, title, reward, img, image_size=(200, 200), resize_type=Image.LANCZOS, frame_id=-1,
+                 n_slots=4, refresh_delay=0.015):
+        """
+        Constructor.
+        :param title: the window's title.
+        :param reward: the current reward received by the agent.
+        :param img: the current observation received by the agent, i.e., an RGB image of type uint8.
+        :param image_size: the size of the image to display.
+        :param resize_type: the type of resize to perform.
+        :param frame_id: the index of the current frame.
+        :param n_slots: the number of frames in the ring buffer.
+        :param refresh_delay: the time (in seconds) between two refreshes of the window.
+        """
+        self.ring = FrameRing(img.shape, n_slots)
+        self.process = multiprocessing.get_context("spawn").Process(
+            target=ProcessViewer.display,
+            args=(self.ring.memory.name, img.shape, n_slots, title, image_size, resize_type, refresh_delay),
+            daemon=True
+        )
+        self.process.start()
+        self.update(reward, img, frame_id)
+
+        # Make sure the viewer is closed at the end of the run.
+        atexit.register(self.close)
+
+    def update(self, reward, img, frame_id=-1):
+        """
+        Update the viewer, without waiting for the frame to be displayed.
+        :param reward: the new reward to display.
+        :param img: the new observation to display.
+        :param frame_id: the index of the current frame.
+        :return: nothing.
+        """
+        if img is None or self.ring.frames is None:
+            return
+        self.ring.write(reward, img, frame_id)
+
+    def close(self, timeout=1.0):
+        """
+        Close the viewer, and release the shared memory.
+        :param timeout: the time (in seconds) waited for the display process to terminate.
+        :return: nothing.
+        """
+        if self.ring.frames is None:
+            return
+        self.ring.close_writer()
+        self.process.join(timeout)
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join()
+        self.ring.release(unlink=True)
+        atexit.unregister(self.close)
+
+    @staticmethod
+    def display(name, shape, n_slots, title, image_size, resize_type, refresh_delay):
+        """
+        Display the latest frame of the ring buffer until the writer is closed or the window is closed.
+        This function runs in the display process.
+        :param name: the name of the shared memory containing the ring buffer.
+        :param shape: the shape of the frames.
+        :param n_slots: the number of frames in the ring buffer.
+        :param title: the window's title.
+        :param image_size: the size of the image to display.
+        :param resize_type: the type of resize to perform.
+        :param refresh_delay: the time (in seconds) between two refreshes of the window.
+        :return: nothing.
+        """
+        from env.viewer.DefaultViewer import DefaultViewer
+
+        ring = FrameRing(shape, n_slots, name)
+        viewer = None
+        count = 0
+        try:
+            while not ring.writer_closed():
+                latest = ring.read_latest(count)
+                if latest is not None:
+                    count, reward, frame, frame_id = latest
+                    if viewer is None:
+                        viewer = DefaultViewer(title, reward, frame, image_size, resize_type, frame_id)
+                    else:
+                        viewer.update(reward, frame, frame_id)
+                elif viewer is not None:
+                    viewer.root.update()
+                time.sleep(refresh_delay)
+            if viewer is not None:
+                viewer.root.destroy()
+        except TclError:
+            # The window was closed by the user.
+            pass
+        finally:
+            ring.release()
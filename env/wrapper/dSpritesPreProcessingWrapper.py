@@ -1,5 +1,5 @@
 import torch
-from torch.nn.functional import one_hot
+from env.dSpritesVectorEnv import dSpritesVectorEnv
 
 
 class dSpritesPreProcessingWrapper:
@@ -57,14 +57,12 @@ class dSpritesPreProcessingWrapper:
         """
         Perform the pre-processing on the input observation.
         :param obs: the input observation.
-        :return: the observation after pre-processing.
+        :return: the observation after pre-processing, i.e., the index of each observed value.
         """
-        obs[4] /= self.env.granularity
-        obs[5] /= self.env.granularity
-        obs_dict = {}
-        for i in range(1, obs.size(0)):
-            obs_dict[self.obs_names[i]] = one_hot(obs[i].to(torch.int64), self.s_sizes[i])
-        return obs_dict
+        values = obs.tolist()
+        values[4] /= self.env.granularity
+        values[5] /= self.env.granularity
+        return {self.obs_names[i]: int(values[i]) for i in range(1, len(values))}
 
     def current_frame(self):
         """
@@ -73,6 +71,15 @@ class dSpritesPreProcessingWrapper:
         """
         return self.env.current_frame()
 
+    def display_frame(self, size, resize_type):
+        """
+        Return the current frame converted and resized for display.
+        :param size: the size of the frame.
+        :param resize_type: the type of resize to perform.
+        :return: the frame as a pillow image.
+        """
+        return self.env.display_frame(size, resize_type)
+
     def render(self):
         """
         Display the current state of the environment as an image.
@@ -80,6 +87,13 @@ class dSpritesPreProcessingWrapper:
         """
         self.env.render()
 
+    def close(self):
+        """
+        Close the viewer displaying the environment, if it runs in a separate process.
+        :return: nothing.
+        """
+        self.env.close()
+
     def a(self, noise=0.001):
         """
         Getter.
@@ -90,8 +104,7 @@ class dSpritesPreProcessingWrapper:
         for i in range(self.s_sizes.size):
             epsilon = noise / (self.s_sizes[i] - 1) if self.s_sizes[i] != 1 else 0
             likelihood = torch.full([self.s_sizes[i], self.s_sizes[i]], epsilon)
-            for j in range(self.s_sizes[i]):
-                likelihood[j][j] = 1 - noise if self.s_sizes[i] != 1 else 1
+            likelihood.fill_diagonal_(1 - noise if self.s_sizes[i] != 1 else 1)
             likelihoods[self.obs_names[i]] = likelihood
         return likelihoods
 
@@ -106,20 +119,19 @@ class dSpritesPreProcessingWrapper:
         # Generate transitions for which action has no effect.
         for i in range(1, 4):
             transition = torch.full([self.s_sizes[i], self.s_sizes[i]], noise / (self.s_sizes[i] - 1))
-            for j in range(self.s_sizes[i]):
-                transition[j][j] = 1 - noise
+            transition.fill_diagonal_(1 - noise)
             transitions[self.state_names[i]] = transition
 
-        # Generate transitions for which action has an effect.
+        # Generate transitions for which action has an effect, simulating all (state, action) pairs at once.
         for i in range(4, self.s_sizes.size):
             transition = torch.full([self.s_sizes[i], self.s_sizes[i], self.n_actions], noise / (self.s_sizes[i] - 1))
-            for j in range(self.s_sizes[i]):
-                cur_state = torch.zeros([self.s_sizes.size])
-                cur_state[i] = j * self.env.granularity
-                for k in range(self.n_actions):
-                    dest_state = self.env.simulate(k, cur_state)
-                    dest_id = int(dest_state[i].item() / self.env.granularity)
-                    transition[dest_id][j][k] = 1 - noise
+            state_ids = torch.arange(self.s_sizes[i]).repeat_interleave(self.n_actions)
+            actions = torch.arange(self.n_actions).repeat(self.s_sizes[i])
+            cur_states = torch.zeros([state_ids.size(0), self.s_sizes.size], dtype=torch.int64)
+            cur_states[:, i] = state_ids * self.env.granularity
+            dest_states = dSpritesVectorEnv.simulate(actions, cur_states, self.env.repeat)
+            dest_ids = torch.div(dest_states[:, i], self.env.granularity, rounding_mode="floor")
+            transition[dest_ids, state_ids, actions] = 1 - noise
             transitions[self.state_names[i]] = transition
         return transitions
 
@@ -135,17 +147,14 @@ class dSpritesPreProcessingWrapper:
             preferences[self.obs_names[i]] = torch.full([self.s_sizes[i]], 1 / self.s_sizes[i])
 
         # Create preferences for the shape and x position of the object.
+        # The square (shape 0) should reach the left border, and the other shapes the right border.
         preference = torch.zeros([self.s_sizes[4], self.s_sizes[5], self.s_sizes[1]])
-        for shape in range(0, 3):
-            start_pos = 1 if shape == 0 else 0  # If shape == square then 1 else 0
-            end_pos = self.env.n_pos if shape == 0 else self.env.n_pos - 1  # If shape == square then n_pos else n_pos-1
-            y_pos = int(32 / self.env.granularity)
-            for x_pos in range(start_pos, int(end_pos)):
-                preference[x_pos][y_pos][shape] = -5
-            if shape == 0:
-                preference[0][y_pos][shape] = 5
-            else:
-                preference[int(self.env.n_pos - 1)][y_pos][shape] = 5
+        n_pos = int(self.env.n_pos)
+        y_pos = int(32 / self.env.granularity)
+        preference[1:n_pos, y_pos, 0] = -5
+        preference[0, y_pos, 0] = 5
+        preference[0:n_pos - 1, y_pos, 1:3] = -5
+        preference[n_pos - 1, y_pos, 1:3] = 5
         shape = preference.shape
         preference = torch.softmax(preference.view(-1), dim=0).view(shape)
         preferences[self.obs_names[1] + "_pos_x_y"] = preference
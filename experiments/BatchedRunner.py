@@ -0,0 +1,112 @@
+import time
+import numpy as np
+from agent.BatchedBTAI_3MF import BatchedBTAI_3MF
+
+
+class BatchedRunner:
+    """
+    Class running several environments in lockstep, each of them being paired with an agent whose
+    inference and planning are batched with the other agents. When an episode ends, its slot is
+    refilled with a new episode until all the requested episodes have been started.
+    """
+
+    def __init__(self, envs, builder, max_planning_steps, exp_const, heuristic=None, prune=False):
+        """
+        Construct the batched runner.
+        :param envs: the environments, one per slot.
+        :param builder: the temporal slice builder used to build the temporal slice of each slot.
+        :param max_planning_steps: the maximum number of planning iterations.
+        :param exp_const: the exploration constant of the Monte-Carlo tree search algorithm.
+        :param heuristic: an optional function estimating the cost to go of the leaf nodes.
+        :param prune: True if the states and observations irrelevant to planning should be pruned, False otherwise.
+        """
+        self.envs = list(envs)
+        self.agent = BatchedBTAI_3MF(
+            [builder.build(prune=prune) for _ in self.envs], max_planning_steps, exp_const, heuristic
+        )
+
+    def run(self, n_episodes):
+        """
+        Run episodes until the requested number of episodes has been completed.
+        :param n_episodes: the number of episodes to run.
+        :return: a dictionary containing a list of episodes' results (reward, number of steps, planning
+            time and execution time), the latency of each batched action-perception cycle, and the duration
+            of the run.
+        """
+        run_start = time.perf_counter()
+        episodes = []
+        latencies = []
+        slots = [None] * len(self.envs)
+        n_started = 0
+
+        # Start an episode in each slot.
+        active = list(range(min(len(self.envs), n_episodes)))
+        n_started += self.start_episodes(active, slots)
+
+        # Implement the action-perception cycles of all the slots in lockstep.
+        while len(active) != 0:
+            start = time.perf_counter()
+            actions = self.agent.step(active)
+            planning_time = time.perf_counter() - start
+
+            # Execute the actions, and collect the slots whose episode is over.
+            running, running_actions, running_obs, finished = [], [], [], []
+            for i, action in zip(active, actions):
+                obs = self.envs[i].execute(action)
+                slots[i]["n_steps"] += 1
+                slots[i]["planning_time"] += planning_time
+                if self.envs[i].done():
+                    finished.append(i)
+                else:
+                    running.append(i)
+                    running_actions.append(action)
+                    running_obs.append(obs)
+            self.agent.update(running, running_actions, running_obs)
+            latencies.append(time.perf_counter() - start)
+
+            # Record the finished episodes, and refill their slots.
+            for i in finished:
+                slots[i]["execution_time"] = time.perf_counter() - slots[i].pop("start")
+                episodes.append({"reward": self.envs[i].get_reward(), **slots[i]})
+            refilled = finished[:n_episodes - n_started]
+            n_started += self.start_episodes(refilled, slots)
+            active = sorted(running + refilled)
+
+        return {"episodes": episodes, "latencies": latencies, "duration": time.perf_counter() - run_start}
+
+    def start_episodes(self, indices, slots):
+        """
+        Start a new episode in some slots.
+        :param indices: the indices of the slots.
+        :param slots: the information of the episode running in each slot.
+        :return: the number of episodes started.
+        """
+        obs = []
+        for i in indices:
+            slots[i] = {"n_steps": 0, "planning_time": 0.0, "start": time.perf_counter()}
+            obs.append(self.envs[i].reset())
+        self.agent.reset(indices, obs)
+        return len(indices)
+
+    @staticmethod
+    def summarise(report):
+        """
+        Aggregate the results of a run.
+        :param report: the dictionary returned by run.
+        :return: a dictionary containing the success rate, the mean number of steps, the throughput,
+            and the percentiles of the action-perception cycles' latency.
+        """
+        rewards = [episode["reward"] for episode in report["episodes"]]
+        execution_times = [episode["execution_time"] for episode in report["episodes"]]
+        p50, p90, p99 = np.percentile(report["latencies"], [50, 90, 99])
+        return {
+            "n_episodes": len(rewards),
+            "success_rate": (sum(rewards) + len(rewards)) / (2 * len(rewards)),
+            "mean_steps": float(np.mean([episode["n_steps"] for episode in report["episodes"]])),
+            "mean_execution_time": float(np.mean(execution_times)),
+            "std_execution_time": float(np.std(execution_times)),
+            "episodes_per_second": len(rewards) / report["duration"],
+            "latency_p50": float(p50),
+            "latency_p90": float(p90),
+            "latency_p99": float(p99)
+        }
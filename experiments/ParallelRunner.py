@@ -0,0 +1,121 @@
+import multiprocessing
+import torch
+from agent.BTAI_3MF import BTAI_3MF
+from experiments.dSpritesExperiment import dSpritesExperiment
+
+
+class ParallelRunner:
+    """
+    Class spreading the episodes of a dSprites experiment across a pool of processes. Each episode is
+    seeded with the base seed plus its index, such that its result does not depend on the process
+    running it, and matches the result of a serial run using the same seeds and agent configuration.
+    """
+
+    # The environment and the agent of the current process, created once by the pool initialiser.
+    env = None
+    agent = None
+
+    def __init__(self, n_workers, granularity=1, repeat=1, max_planning_steps=150, exp_const=2.4,
+                 heuristic=None, synthetic=False, backend="torch", prune=False, compile_mode=None,
+                 plan_cache_size=0):
+        """
+        Construct the parallel runner.
+        :param n_workers: the number of processes, the episodes are run in the current process if zero.
+        :param granularity: the granularity of the x and y positions.
+        :param repeat: the number of times an action must be repeated.
+        :param max_planning_steps: the maximum number of planning iterations.
+        :param exp_const: the exploration constant of the Monte-Carlo tree search algorithm.
+        :param heuristic: an optional function estimating the cost to go of the leaf nodes, which is
+            created by the current process and sent to the other processes.
+        :param synthetic: True if the synthetic stand-in of the dSprites dataset should be used.
+        :param backend: the backend used by the inference, i.e., "torch" or "numpy".
+        :param prune: True if the states and observations irrelevant to planning should be pruned, False otherwise.
+        :param compile_mode: the mode used to compile the fused inference kernels of the temporal slice,
+            or None to use the generic inference.
+        :param plan_cache_size: the number of plans cached by each agent, the plan cache is disabled if zero.
+        """
+        self.n_workers = n_workers
+        self.config = (
+            granularity, repeat, max_planning_steps, exp_const, heuristic, synthetic,
+            backend, prune, compile_mode, plan_cache_size
+        )
+
+    @staticmethod
+    def initialise_worker(granularity, repeat, max_planning_steps, exp_const, heuristic, synthetic,
+                          backend, prune, compile_mode, plan_cache_size):
+        """
+        Create the environment and the agent of the current process.
+        :param granularity: the granularity of the x and y positions.
+        :param repeat: the number of times an action must be repeated.
+        :param max_planning_steps: the maximum number of planning iterations.
+        :param exp_const: the exploration constant of the Monte-Carlo tree search algorithm.
+        :param heuristic: an optional function estimating the cost to go of the leaf nodes.
+        :param synthetic: True if the synthetic stand-in of the dSprites dataset should be used.
+        :param backend: the backend used by the inference, i.e., "torch" or "numpy".
+        :param prune: True if the states and observations irrelevant to planning should be pruned, False otherwise.
+        :param compile_mode: the mode used to compile the fused inference kernels, or None.
+        :param plan_cache_size: the number of plans cached by the agent, the plan cache is disabled if zero.
+        :return: nothing.
+        """
+        # Use one thread per process, the processes already use all the cores.
+        torch.set_num_threads(1)
+        env = dSpritesExperiment.create_env(granularity, repeat, synthetic=synthetic, headless=True)
+        ts = dSpritesExperiment.create_temporal_slice(env, prune=prune, backend=backend)
+        ParallelRunner.env = env
+        ParallelRunner.agent = BTAI_3MF(
+            ts, max_planning_steps=max_planning_steps, exp_const=exp_const, heuristic=heuristic,
+            plan_cache_size=plan_cache_size, compile_mode=compile_mode
+        )
+
+    @staticmethod
+    def run_trial(trial):
+        """
+        Run an episode in the current process.
+        :param trial: a tuple containing the index and the seed of the episode.
+        :return: the result of the episode, i.e., its index, seed, reward, number of steps, planning
+            time and execution time.
+        """
+        episode, seed = trial
+        dSpritesExperiment.seed(seed)
+        result = dSpritesExperiment.run_episode(ParallelRunner.env, ParallelRunner.agent)
+        return {"episode": episode, "seed": seed, **result}
+
+    def run(self, n_trials, base_seed=0, callback=None):
+        """
+        Run the episodes, and stream their results as they are completed.
+        :param n_trials: the number of episodes to run.
+        :param base_seed: the seed of the first episode.
+        :param callback: an optional function called with the result of each episode as soon as it is completed.
+        :return: the results of the episodes, sorted by episode index.
+        """
+        trials = [(i, base_seed + i) for i in range(n_trials)]
+        results = []
+
+        # Run the episodes in the current process.
+        if self.n_workers == 0:
+            ParallelRunner.initialise_worker(*self.config)
+            for trial in trials:
+                results.append(ParallelRunner.run_trial(trial))
+                if callback is not None:
+                    callback(results[-1])
+            return results
+
+        # Run the episodes across the pool of processes.
+        with multiprocessing.Pool(self.n_workers, ParallelRunner.initialise_worker, self.config) as pool:
+            for result in pool.imap_unordered(ParallelRunner.run_trial, trials):
+                results.append(result)
+                if callback is not None:
+                    callback(result)
+        return sorted(results, key=lambda x: x["episode"])
+
+    @staticmethod
+    def summarise(results):
+        """
+        Compute the percentage of task solved, and the mean and standard deviation of the execution time.
+        :param results: the results of the episodes.
+        :return: the percentage of task solved, the mean and the standard deviation of the execution time.
+        """
+        n_trials = len(results)
+        score = sum(result["reward"] for result in results)
+        ex_times_s = torch.tensor([result["execution_time"] for result in results])
+        return (score + n_trials) / (2 * n_trials), ex_times_s.mean().item(), ex_times_s.std(dim=0).item()
@@ -0,0 +1,132 @@
+import os
+import time
+import random
+import torch
+from agent.inference.TemporalSliceBuilder import TemporalSliceBuilder
+from agent.inference.Checkpoint import Checkpoint
+from env.dSpritesEnv import dSpritesEnv
+from env.wrapper.dSpritesPreProcessingWrapper import dSpritesPreProcessingWrapper
+from data.dSpritesDataset import DataSet
+
+
+class dSpritesExperiment:
+    """
+    Class gathering the functions required to create the environment and the temporal slice
+    of the dSprites experiments, and to run episodes in a headless fashion.
+    """
+
+    @staticmethod
+    def create_env(granularity=4, repeat=8, synthetic=False, headless=False):
+        """
+        Create the dSprites environment wrapped by the pre-processing wrapper.
+        :param granularity: the granularity of the x and y positions.
+        :param repeat: the number of times an action must be repeated.
+        :param synthetic: True if the synthetic stand-in of the dSprites dataset should be used, False otherwise.
+        :param headless: True if the images of the dataset should only be loaded when a frame is requested, which
+            never happens in headless runs, False otherwise.
+        :return: the environment.
+        """
+        if synthetic:
+            DataSet.use_synthetic()
+        env = dSpritesEnv(granularity=granularity, repeat=repeat, headless=headless)
+        return dSpritesPreProcessingWrapper(env)
+
+    @staticmethod
+    def create_builder(env, action_name="A_0", noise=0.001):
+        """
+        Create the builder of the temporal slice used by the agent in the dSprites environment.
+        The builder can be used to build several temporal slices sharing the same parameters.
+        :param env: the dSprites environment wrapped by the pre-processing wrapper.
+        :param action_name: the name of the action random variable.
+        :param noise: the amount of noise in the likelihood and transition mappings.
+        :return: the temporal slice builder.
+        """
+        # Define the parameters of the generative model.
+        a = env.a(noise=noise)
+        b = env.b(noise=noise)
+        c = env.c()
+        d = env.d(uniform=True)
+
+        # Define the temporal slice structure.
+        return TemporalSliceBuilder(action_name, env.n_actions) \
+            .add_state("S_pos_x", d["S_pos_x"]) \
+            .add_state("S_pos_y", d["S_pos_y"]) \
+            .add_state("S_shape", d["S_shape"]) \
+            .add_state("S_scale", d["S_scale"]) \
+            .add_state("S_orientation", d["S_orientation"]) \
+            .add_observation("O_pos_x", a["O_pos_x"], ["S_pos_x"]) \
+            .add_observation("O_pos_y", a["O_pos_y"], ["S_pos_y"]) \
+            .add_observation("O_shape", a["O_shape"], ["S_shape"]) \
+            .add_observation("O_scale", a["O_scale"], ["S_scale"]) \
+            .add_observation("O_orientation", a["O_orientation"], ["S_orientation"]) \
+            .add_transition("S_pos_x", b["S_pos_x"], ["S_pos_x", action_name]) \
+            .add_transition("S_pos_y", b["S_pos_y"], ["S_pos_y", action_name]) \
+            .add_transition("S_shape", b["S_shape"], ["S_shape"]) \
+            .add_transition("S_scale", b["S_scale"], ["S_scale"]) \
+            .add_transition("S_orientation", b["S_orientation"], ["S_orientation"]) \
+            .add_preference(["O_pos_x", "O_pos_y", "O_shape"], c["O_shape_pos_x_y"])
+
+    @staticmethod
+    def load_or_create_builder(env, path, action_name="A_0"):
+        """
+        Load the builder of the temporal slice from a checkpoint, or create it and save the checkpoint.
+        :param env: the dSprites environment wrapped by the pre-processing wrapper.
+        :param path: the path of the checkpoint.
+        :param action_name: the name of the action random variable.
+        :return: the temporal slice builder.
+        """
+        if os.path.exists(path):
+            return Checkpoint.load_builder(*Checkpoint.read(path))
+        builder = dSpritesExperiment.create_builder(env, action_name)
+        Checkpoint.save(path, builder.build())
+        return builder
+
+    @staticmethod
+    def create_temporal_slice(env, action_name="A_0", prune=False, backend="torch"):
+        """
+        Create the temporal slice used by the agent in the dSprites environment.
+        :param env: the dSprites environment wrapped by the pre-processing wrapper.
+        :param action_name: the name of the action random variable.
+        :param prune: True if the states and observations irrelevant to planning should be pruned, False otherwise.
+        :param backend: the backend used by the inference, i.e., "torch" or "numpy".
+        :return: the temporal slice.
+        """
+        return dSpritesExperiment.create_builder(env, action_name).build(backend, prune=prune)
+
+    @staticmethod
+    def seed(seed):
+        """
+        Seed the random number generators used by the environment and the agent.
+        :param seed: the seed.
+        :return: nothing.
+        """
+        random.seed(seed)
+        torch.manual_seed(seed)
+
+    @staticmethod
+    def run_episode(env, agent):
+        """
+        Run an episode without rendering.
+        :param env: the environment.
+        :param agent: the agent.
+        :return: a dictionary containing the reward, the number of steps, the planning time and the
+            execution time of the episode.
+        """
+        start = time.perf_counter()
+        planning_time = 0.0
+        n_steps = 0
+        obs = env.reset()
+        agent.reset(obs)
+        while not env.done():
+            planning_start = time.perf_counter()
+            action = agent.step()
+            planning_time += time.perf_counter() - planning_start
+            obs = env.execute(action)
+            agent.update(action, obs)
+            n_steps += 1
+        return {
+            "reward": env.get_reward(),
+            "n_steps": n_steps,
+            "planning_time": planning_time,
+            "execution_time": time.perf_counter() - start
+        }
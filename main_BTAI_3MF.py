@@ -1,95 +1,228 @@
 import time
+import random
+import argparse
 
-from agent.inference.TemporalSliceBuilder import TemporalSliceBuilder
 from env.dSpritesEnv import dSpritesEnv
 from env.wrapper.dSpritesPreProcessingWrapper import dSpritesPreProcessingWrapper
 from agent.BTAI_3MF import BTAI_3MF
+from agent.planning.EFEToGoHeuristic import EFEToGoHeuristic
+from analysis.profiling.Profiler import Profiler
+from analysis.recording.TrajectoryRecorder import TrajectoryRecorder
+from experiments.BatchedRunner import BatchedRunner
+from experiments.ParallelRunner import ParallelRunner
+from experiments.dSpritesExperiment import dSpritesExperiment
 import torch
 
 # ------------------------------------------------------------------------------ #
 # Results:                                                                       #
+# Execution times are measured by benchmark_BTAI_3MF.py (macro-benchmarks).      #
 # ------------------------------------------------------------------------------ #
 # dSpritesEnv(granularity=8, repeat=8) + max_planning_steps=50 + exp_const=2.4)  #
 # Percentage of task solved: 0.895625                                            #
-# Execution time(sec): 1.2799999713897705 + / - 12.800000190734863               #
 # ------------------------------------------------------------------------------ #
 # dSpritesEnv(granularity=4, repeat=8) + max_planning_steps=50 + exp_const=2.4)  #
 # Percentage of task solved: 0.9778125                                           #
-# Execution time (sec):  1.2799999713897705 +/- 12.800000190734863               #
 # ------------------------------------------------------------------------------ #
 # dSpritesEnv(granularity=2, repeat=8) + max_planning_steps=50 + exp_const=2.4)  #
 # Percentage of task solved: 0.9965625                                           #
-# Execution time(sec): 1.2799999713897705 + / - 12.800000190734863               #
 # ------------------------------------------------------------------------------ #
 # dSpritesEnv(granularity=1, repeat=8) + max_planning_steps=50 + exp_const=2.4)  #
 # Percentage of task solved: 0.72                                                #
-# Execution time(sec): 2.559999942779541 + / - 18.010276794433594                #
 #                                                                                #
 # dSpritesEnv(granularity=1, repeat=8) + max_planning_steps=100 + exp_const=2.4) #
 # Percentage of task solved: 0.77                                                #
-# Execution time(sec): 5.119999885559082 + / - 25.209136962890625                #
 #                                                                                #
 # dSpritesEnv(granularity=1, repeat=8) + max_planning_steps=150 + exp_const=2.4) #
 # Percentage of task solved: 1.0                                                 #
-# Execution time (sec): 2.559999942779541 +/- 18.010276794433594                 #
 # ------------------------------------------------------------------------------ #
 
 
-def main():
+def parse_arguments():
     """
-    A simple example of how to use the BTAI_3MF framework.
-    :return: nothing.
+    Parse the command line arguments.
+    :return: the parsed arguments.
     """
+    parser = argparse.ArgumentParser(description="Run the BTAI_3MF agent in the dSprites environment.")
+    parser.add_argument("--n-trials", type=int, default=100, help="the number of episodes to run")
+    parser.add_argument("--seed", type=int, default=None, help="the seed of the random number generators")
+    parser.add_argument(
+        "--heuristic", action="store_true",
+        help="evaluate the leaf nodes using the pre-computed expected free energy to go"
+    )
+    parser.add_argument(
+        "--profile", choices=["cprofile", "torch", "both"], default=None,
+        help="profile the episodes using cProfile and/or torch.profiler, rendering is disabled while profiling"
+    )
+    parser.add_argument("--profile-episodes", type=int, default=5, help="the number of episodes to profile")
+    parser.add_argument("--profile-dir", default="./profiles", help="the directory in which profiles are written")
+    parser.add_argument(
+        "--profile-torch-period", type=int, default=10,
+        help="the number of action-perception cycles per cycle recorded by torch.profiler"
+    )
+    parser.add_argument(
+        "--batch-size", type=int, default=1,
+        help="the number of environments run in lockstep with batched inference, rendering is disabled if above one"
+    )
+    parser.add_argument(
+        "--plan-cache", type=int, default=0,
+        help="the number of plans reused when the posterior beliefs of the root repeat, disabled if zero"
+    )
+    parser.add_argument(
+        "--backend", choices=["torch", "numpy"], default="torch",
+        help="the backend used by the inference of the temporal slice"
+    )
+    parser.add_argument(
+        "--compile", choices=["torch.compile", "torchscript", "eager"], default=None,
+        help="use fused inference kernels generated for the temporal slice structure, compiled with this mode"
+    )
+    parser.add_argument(
+        "--viewer-process", action="store_true",
+        help="display the environment in a separate process, frames being dropped instead of slowing down the agent"
+    )
+    parser.add_argument(
+        "--record", default=None, help="the directory in which the trajectories are recorded (default: no recording)"
+    )
+    parser.add_argument(
+        "--record-planning", action="store_true", help="record the statistics of the root's children after planning"
+    )
+    parser.add_argument(
+        "--prune-planning", action="store_true",
+        help="skip the states and observations that cannot change the ranking of the actions during planning"
+    )
+    parser.add_argument(
+        "--n-workers", type=int, default=None,
+        help="the number of processes running the episodes headless, episode i being seeded with seed + i"
+    )
+    args = parser.parse_args()
 
-    # Create the environment.
-    env = dSpritesEnv(granularity=1, repeat=1)
-    env = dSpritesPreProcessingWrapper(env)
+    # Reject the options that the processes running the episodes headless do not support.
+    if args.n_workers is not None:
+        for name, used in [
+            ("--profile", args.profile is not None), ("--record", args.record is not None),
+            ("--batch-size", args.batch_size > 1), ("--viewer-process", args.viewer_process)
+        ]:
+            if used:
+                parser.error("{} cannot be combined with --n-workers".format(name))
 
-    # Define the parameters of the generative model.
-    a = env.a()
-    b = env.b()
-    c = env.c()
-    d = env.d(uniform=True)
-
-    # Define the temporal slice structure.
-    ts = TemporalSliceBuilder("A_0", env.n_actions) \
-        .add_state("S_pos_x", d["S_pos_x"]) \
-        .add_state("S_pos_y", d["S_pos_y"]) \
-        .add_state("S_shape", d["S_shape"]) \
-        .add_state("S_scale", d["S_scale"]) \
-        .add_state("S_orientation", d["S_orientation"]) \
-        .add_observation("O_pos_x", a["O_pos_x"], ["S_pos_x"]) \
-        .add_observation("O_pos_y", a["O_pos_y"], ["S_pos_y"]) \
-        .add_observation("O_shape", a["O_shape"], ["S_shape"]) \
-        .add_observation("O_scale", a["O_scale"], ["S_scale"]) \
-        .add_observation("O_orientation", a["O_orientation"], ["S_orientation"]) \
-        .add_transition("S_pos_x", b["S_pos_x"], ["S_pos_x", "A_0"]) \
-        .add_transition("S_pos_y", b["S_pos_y"], ["S_pos_y", "A_0"]) \
-        .add_transition("S_shape", b["S_shape"], ["S_shape"]) \
-        .add_transition("S_scale", b["S_scale"], ["S_scale"]) \
-        .add_transition("S_orientation", b["S_orientation"], ["S_orientation"]) \
-        .add_preference(["O_pos_x", "O_pos_y", "O_shape"], c["O_shape_pos_x_y"]) \
-        .build()
-
-    # Create the agent.
-    agent = BTAI_3MF(ts, max_planning_steps=150, exp_const=2.4)
+    # Reject the options that the batched inference and planning do not support.
+    if args.batch_size > 1:
+        for name, used in [
+            ("--backend numpy", args.backend == "numpy"), ("--compile", args.compile is not None),
+            ("--plan-cache", args.plan_cache != 0), ("--profile", args.profile is not None),
+            ("--record", args.record is not None), ("--viewer-process", args.viewer_process)
+        ]:
+            if used:
+                parser.error("{} cannot be combined with --batch-size".format(name))
+    return args
 
-    # Implement the action-perception cycles.
-    n_trials = 100
+
+def run_episodes(env, agent, n_trials, render=True, profiler=None):
+    """
+    Implement the action-perception cycles.
+    :param env: the environment.
+    :param agent: the agent.
+    :param n_trials: the number of episodes to run.
+    :param render: True if the environment should be displayed, False otherwise.
+    :param profiler: the profiler to notify at the end of each action-perception cycle, if any.
+    :return: the sum of the rewards, and the execution time of each episode.
+    """
     score = 0
     ex_times_s = torch.zeros([n_trials])
     for i in range(n_trials):
         obs = env.reset()
-        env.render()
+        if render:
+            env.render()
         agent.reset(obs)
         ex_times_s[i] = time.time()
         while not env.done():
             action = agent.step()
             obs = env.execute(action)
-            env.render()
+            if render:
+                env.render()
             agent.update(action, obs)
+            if profiler is not None:
+                profiler.step()
         ex_times_s[i] = time.time() - ex_times_s[i]
         score += env.get_reward()
+    return score, ex_times_s
+
+
+def main():
+    """
+    A simple example of how to use the BTAI_3MF framework.
+    :return: nothing.
+    """
+    args = parse_arguments()
+
+    # Seed the random number generators, profiling runs are always seeded to be comparable.
+    seed = 0 if args.seed is None and args.profile is not None else args.seed
+    if seed is not None:
+        random.seed(seed)
+        torch.manual_seed(seed)
+
+    # Spread the episodes across a pool of processes, if requested, the heuristic being computed
+    # once by the current process and sent to the other processes.
+    if args.n_workers is not None:
+        env = dSpritesExperiment.create_env(granularity=1, repeat=1, headless=True)
+        runner = ParallelRunner(
+            args.n_workers, granularity=1, repeat=1, max_planning_steps=150, exp_const=2.4,
+            heuristic=EFEToGoHeuristic.load_or_compute(env) if args.heuristic else None,
+            backend=args.backend, prune=args.prune_planning, compile_mode=args.compile,
+            plan_cache_size=args.plan_cache
+        )
+        results = runner.run(args.n_trials, base_seed=0 if args.seed is None else args.seed)
+        solved, mean_time, std_time = ParallelRunner.summarise(results)
+        print("Percentage of task solved: {}".format(solved))
+        print("Execution time (sec): {} +/- {}".format(mean_time, std_time))
+        return
+
+    # Create the environment.
+    env = dSpritesEnv(granularity=1, repeat=1, viewer_process=args.viewer_process)
+    env = dSpritesPreProcessingWrapper(env)
+    heuristic = EFEToGoHeuristic.load_or_compute(env) if args.heuristic else None
+    n_trials = args.n_trials
+
+    # Run several environments in lockstep, if requested.
+    if args.batch_size > 1:
+        envs = [env] + [
+            dSpritesPreProcessingWrapper(dSpritesEnv(granularity=1, repeat=1, headless=True))
+            for _ in range(args.batch_size - 1)
+        ]
+        builder = dSpritesExperiment.create_builder(env)
+        runner = BatchedRunner(
+            envs, builder, max_planning_steps=150, exp_const=2.4, heuristic=heuristic, prune=args.prune_planning
+        )
+        summary = BatchedRunner.summarise(runner.run(n_trials))
+        print("Percentage of task solved: {}".format(summary["success_rate"]))
+        print("Execution time (sec): {} +/- {}".format(summary["mean_execution_time"], summary["std_execution_time"]))
+        print("Cycle latency (sec): p50 {} p90 {} p99 {}".format(
+            summary["latency_p50"], summary["latency_p90"], summary["latency_p99"]
+        ))
+        return
+
+    # Create the temporal slice and the agent.
+    ts = dSpritesExperiment.create_temporal_slice(env, prune=args.prune_planning, backend=args.backend)
+    recorder = None if args.record is None else TrajectoryRecorder(args.record, planning_stats=args.record_planning)
+    env.env.recorder = recorder
+    agent = BTAI_3MF(
+        ts, max_planning_steps=150, exp_const=2.4, heuristic=heuristic, plan_cache_size=args.plan_cache,
+        compile_mode=args.compile, recorder=recorder
+    )
+
+    # Profile some action-perception cycles.
+    if args.profile is not None:
+        with Profiler(args.profile_dir, args.profile, torch_period=args.profile_torch_period) as profiler:
+            run_episodes(env, agent, args.profile_episodes, render=False, profiler=profiler)
+        if recorder is not None:
+            recorder.close()
+        print("Profiling results written in: {}".format(args.profile_dir))
+        return
+
+    # Implement the action-perception cycles.
+    score, ex_times_s = run_episodes(env, agent, n_trials)
+    env.close()
+    if recorder is not None:
+        recorder.close()
 
     # Display the performance of the agent.
     print("Percentage of task solved: {}".format((score + n_trials) / (2 * n_trials)))
@@ -0,0 +1,73 @@
+import json
+import argparse
+from agent.BTAI_3MF import BTAI_3MF
+from analysis.profiling.MemoryReport import MemoryReport
+from experiments.dSpritesExperiment import dSpritesExperiment
+
+
+def parse_arguments():
+    """
+    Parse the command line arguments.
+    :return: the parsed arguments.
+    """
+    parser = argparse.ArgumentParser(description="Report the memory used by the planning tree of BTAI_3MF.")
+    parser.add_argument("--granularity", type=int, default=1, help="the granularity of the x and y positions")
+    parser.add_argument("--repeat", type=int, default=1, help="the number of times an action is repeated")
+    parser.add_argument("--planning-steps", type=int, default=150, help="the number of planning iterations")
+    parser.add_argument("--every", type=int, default=10, help="the number of iterations between two measurements")
+    parser.add_argument("--n-steps", type=int, default=5, help="the number of action-perception cycles to measure")
+    parser.add_argument("--seed", type=int, default=0, help="the seed of the random number generators")
+    parser.add_argument(
+        "--backend", choices=["torch", "numpy"], default="torch", help="the backend used by the inference"
+    )
+    parser.add_argument("--synthetic", action="store_true", help="use a synthetic stand-in of the dSprites dataset")
+    parser.add_argument("--output", default=None, help="the JSON file in which the report is written")
+    return parser.parse_args()
+
+
+def main():
+    """
+    Report the memory used per temporal slice, the growth of the tree with the number of planning
+    iterations, and the peak of memory allocated during each action-perception cycle.
+    :return: nothing.
+    """
+    args = parse_arguments()
+
+    # Create the environment and the agent.
+    dSpritesExperiment.seed(args.seed)
+    env = dSpritesExperiment.create_env(args.granularity, args.repeat, synthetic=args.synthetic)
+    ts = dSpritesExperiment.create_temporal_slice(env, backend=args.backend)
+    agent = BTAI_3MF(ts, max_planning_steps=args.planning_steps, exp_const=2.4)
+
+    # Measure the growth of the tree.
+    obs = env.reset()
+    growth = MemoryReport.tree_growth(agent, obs, args.planning_steps, every=args.every)
+    print("Tree growth:")
+    print("{:>10} {:>8} {:>14}".format("Iteration", "Nodes", "Total (KiB)"))
+    for row in growth:
+        print("{:>10} {:>8} {:>14.1f}".format(row["iteration"], row["n_nodes"], row["total"] / 1024))
+    print(MemoryReport.format(growth[-1]))
+
+    # Measure the memory allocated during each action-perception cycle.
+    steps = []
+    agent.reset(obs)
+    for _ in range(args.n_steps):
+        if env.done():
+            break
+        action, step_report = MemoryReport.step_peak(agent)
+        steps.append(step_report)
+        print("Step {}: tracemalloc peak {:.1f} KiB, tree {:.1f} KiB, max RSS {:.1f} MiB".format(
+            len(steps), step_report["tracemalloc_peak"] / 1024,
+            step_report["total"] / 1024, step_report["max_rss"] / 1024 ** 2
+        ))
+        obs = env.execute(action)
+        agent.update(action, obs)
+
+    # Write the report, if requested.
+    if args.output is not None:
+        with open(args.output, "w") as file:
+            json.dump({"arguments": vars(args), "growth": growth, "steps": steps}, file, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,50 @@
+import asyncio
+import argparse
+from agent.planning.EFEToGoHeuristic import EFEToGoHeuristic
+from experiments.dSpritesExperiment import dSpritesExperiment
+from service.AgentService import AgentService
+
+
+def parse_arguments():
+    """
+    Parse the command line arguments.
+    :return: the parsed arguments.
+    """
+    parser = argparse.ArgumentParser(description="Serve many BTAI_3MF sessions with batched inference and planning.")
+    parser.add_argument("--host", default="127.0.0.1", help="the host on which the service listens")
+    parser.add_argument("--port", type=int, default=8765, help="the port on which the service listens")
+    parser.add_argument("--unix-socket", default=None, help="the Unix socket on which the service listens")
+    parser.add_argument("--granularity", type=int, default=1, help="the granularity of the x and y positions")
+    parser.add_argument("--repeat", type=int, default=1, help="the number of times an action is repeated")
+    parser.add_argument("--planning-steps", type=int, default=150, help="the number of planning iterations")
+    parser.add_argument("--heuristic", action="store_true", help="evaluate the leaf nodes using the EFE to go")
+    parser.add_argument("--max-batch", type=int, default=64, help="the maximum number of requests per batch")
+    parser.add_argument("--max-delay", type=float, default=0.002, help="the time waited for a batch to fill")
+    parser.add_argument("--max-pending", type=int, default=1024, help="the maximum number of pending requests")
+    parser.add_argument(
+        "--checkpoint", default=None, help="the checkpoint from which the model is loaded, created if it does not exist"
+    )
+    parser.add_argument("--synthetic", action="store_true", help="use a synthetic stand-in of the dSprites dataset")
+    return parser.parse_args()
+
+
+def main():
+    """
+    Serve the BTAI_3MF sessions forever.
+    :return: nothing.
+    """
+    args = parse_arguments()
+    env = dSpritesExperiment.create_env(args.granularity, args.repeat, synthetic=args.synthetic, headless=True)
+    builder = dSpritesExperiment.create_builder(env) if args.checkpoint is None \
+        else dSpritesExperiment.load_or_create_builder(env, args.checkpoint)
+    service = AgentService(
+        builder, max_planning_steps=args.planning_steps, exp_const=2.4,
+        heuristic=EFEToGoHeuristic.load_or_compute(env) if args.heuristic else None,
+        max_batch=args.max_batch, max_delay=args.max_delay, max_pending=args.max_pending
+    )
+    print("Serving on {}".format(args.unix_socket or "{}:{}".format(args.host, args.port)))
+    asyncio.run(service.serve(args.host, args.port, args.unix_socket))
+
+
+if __name__ == '__main__':
+    main()
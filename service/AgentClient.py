@@ -0,0 +1,110 @@
+import json
+import asyncio
+import torch
+
+
+class AgentClient:
+    """
+    Class implementing a client of the agent service, each client sending one request at a time.
+    """
+
+    def __init__(self, reader, writer):
+        """
+        Construct the client from an open connection.
+        :param reader: the stream from which the responses are read.
+        :param writer: the stream to which the requests are written.
+        """
+        self.reader = reader
+        self.writer = writer
+
+    @staticmethod
+    async def connect(host="127.0.0.1", port=8765, path=None):
+        """
+        Connect to the agent service.
+        :param host: the host on which the service listens, if no Unix socket is used.
+        :param port: the port on which the service listens, if no Unix socket is used.
+        :param path: the path of the Unix socket on which the service listens, if any.
+        :return: the client.
+        """
+        if path is not None:
+            return AgentClient(*await asyncio.open_unix_connection(path))
+        return AgentClient(*await asyncio.open_connection(host, port))
+
+    async def request(self, **kwargs):
+        """
+        Send a request to the service, and wait for its response.
+        :param kwargs: the content of the request.
+        :return: the response.
+        """
+        self.writer.write((json.dumps(kwargs) + "\n").encode())
+        await self.writer.drain()
+        response = json.loads(await self.reader.readline())
+        if "error" in response:
+            raise Exception(response["error"])
+        return response
+
+    @staticmethod
+    def to_lists(obs):
+        """
+        Convert the observations to a JSON serializable format.
+        :param obs: a dictionary whose keys are observation names and values are tensors or indices.
+        :return: a dictionary whose keys are observation names and values are lists or indices.
+        """
+        return {name: value.tolist() if isinstance(value, torch.Tensor) else value for name, value in obs.items()}
+
+    async def create(self):
+        """
+        Create a session.
+        :return: the id of the session.
+        """
+        return (await self.request(op="create"))["session"]
+
+    async def reset(self, session, obs):
+        """
+        Reset the agent of a session.
+        :param session: the id of the session.
+        :param obs: the initial observation.
+        :return: nothing.
+        """
+        await self.request(op="reset", session=session, obs=self.to_lists(obs))
+
+    async def step(self, session):
+        """
+        Perform planning and action selection for the agent of a session.
+        :param session: the id of the session.
+        :return: the action to execute in the environment.
+        """
+        return (await self.request(op="step", session=session))["action"]
+
+    async def update(self, session, action, obs):
+        """
+        Update the agent of a session.
+        :param session: the id of the session.
+        :param action: the action that was executed in the environment.
+        :param obs: the observation that was made.
+        :return: nothing.
+        """
+        await self.request(op="update", session=session, action=action, obs=self.to_lists(obs))
+
+    async def close(self, session):
+        """
+        Close a session.
+        :param session: the id of the session.
+        :return: nothing.
+        """
+        await self.request(op="close", session=session)
+
+    async def stats(self):
+        """
+        Getter.
+        :return: the statistics of the service.
+        """
+        return await self.request(op="stats")
+
+    async def disconnect(self):
+        """
+        Close the connection to the service.
+        :return: nothing.
+        """
+        self.writer.close()
+        await self.writer.wait_closed()
@@ -0,0 +1,363 @@
+import json
+import time
+import asyncio
+import collections
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import torch
+from agent.BatchedBTAI_3MF import BatchedBTAI_3MF
+
+
+class AgentService:
+    """
+    Class implementing an asyncio service hosting many BTAI_3MF sessions. The clients send newline
+    delimited JSON requests, and the concurrent "reset", "step" and "update" requests are coalesced
+    into batched inference and planning calls.
+    """
+
+    # The operations whose requests are coalesced into batches.
+    batched_ops = ["reset", "step", "update"]
+
+    def __init__(self, builder, max_planning_steps, exp_const, heuristic=None,
+                 max_batch=64, max_delay=0.002, max_pending=1024, n_latencies=10000):
+        """
+        Construct the agent service.
+        :param builder: the temporal slice builder used to build the temporal slice of each session.
+        :param max_planning_steps: the maximum number of planning iterations.
+        :param exp_const: the exploration constant of the Monte-Carlo tree search algorithm.
+        :param heuristic: an optional function estimating the cost to go of the leaf nodes.
+        :param max_batch: the maximum number of requests processed in a batch.
+        :param max_delay: the time (in seconds) waited for more requests before processing a batch.
+        :param max_pending: the maximum number of pending requests, above which the clients must wait.
+        :param n_latencies: the number of latencies per operation kept to compute the percentiles.
+        """
+        self.builder = builder
+        self.agent = BatchedBTAI_3MF([builder.build()], max_planning_steps, exp_const, heuristic)
+        self.obs_sizes = {name: params.shape[0] for name, params in builder.obs_likelihood.items()}
+        self.obs_dtypes = {name: params.dtype for name, params in builder.obs_likelihood.items()}
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.max_pending = max_pending
+
+        # The sessions, i.e., a dictionary whose keys are the session ids and values are dictionaries
+        # containing the slot of the session in the batched agent and the state of the session.
+        self.sessions = {}
+        self.next_session = 0
+        self.free_slots = [0]
+
+        # The pending requests, the requests deferred to the next batch, and the thread computing the batches.
+        self.queue = None
+        self.deferred = []
+        self.executor = ThreadPoolExecutor(max_workers=1)
+
+        # The statistics of the service.
+        self.latencies = {op: collections.deque(maxlen=n_latencies) for op in self.batched_ops}
+        self.n_batches = 0
+        self.n_batched_requests = 0
+
+    async def serve(self, host="127.0.0.1", port=8765, path=None):
+        """
+        Serve the clients forever.
+        :param host: the host on which the service listens, if no Unix socket is used.
+        :param port: the port on which the service listens, if no Unix socket is used.
+        :param path: the path of the Unix socket on which the service listens, if any.
+        :return: nothing.
+        """
+        server = await self.start(host, port, path)
+        async with server:
+            await server.serve_forever()
+
+    async def start(self, host="127.0.0.1", port=8765, path=None):
+        """
+        Start the service.
+        :param host: the host on which the service listens, if no Unix socket is used.
+        :param port: the port on which the service listens, if no Unix socket is used.
+        :param path: the path of the Unix socket on which the service listens, if any.
+        :return: the asyncio server.
+        """
+        self.queue = asyncio.Queue(maxsize=self.max_pending)
+        asyncio.get_running_loop().create_task(self.process_batches())
+        if path is not None:
+            return await asyncio.start_unix_server(self.handle_connection, path=path)
+        return await asyncio.start_server(self.handle_connection, host=host, port=port)
+
+    async def handle_connection(self, reader, writer):
+        """
+        Answer the requests of a client, one request at a time. The sessions created by the client are
+        closed when it disconnects.
+        :param reader: the stream from which the requests are read.
+        :param writer: the stream to which the responses are written.
+        :return: nothing.
+        """
+        sessions = set()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    request = json.loads(line)
+                    response = await self.handle_request(request, sessions)
+                except asyncio.CancelledError:
+                    # The request was cancelled because its session was closed while it was pending, any other
+                    # cancellation, e.g., the cancellation of the connection, is propagated.
+                    if request.get("session") in self.sessions:
+                        raise
+                    response = {"error": "The session was closed before the request was processed."}
+                except Exception as error:
+                    response = {"error": str(error)}
+                writer.write((json.dumps(response) + "\n").encode())
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            for session in sessions:
+                self.close_session(session)
+            writer.close()
+
+    async def handle_request(self, request, sessions):
+        """
+        Answer a request.
+        :param request: the request, i.e., a dictionary whose key "op" is the operation requested.
+        :param sessions: the sessions created by the client sending the request.
+        :return: the response.
+        """
+        op = request.get("op")
+        if op == "create":
+            session = self.create_session()
+            sessions.add(session)
+            return {"session": session}
+        if op == "close":
+            self.close_session(self.get_session(request)["id"])
+            sessions.discard(request["session"])
+            return {}
+        if op == "stats":
+            return self.stats()
+        if op not in self.batched_ops:
+            raise Exception("Unknown operation: {}.".format(op))
+
+        # Check that the request is valid, and convert the observation to tensors.
+        session = self.get_session(request)
+        if op == "step" and session["state"] != "ready":
+            raise Exception("The session must be reset or updated before calling step.")
+        if op == "update" and session["state"] != "planned":
+            raise Exception("The session must call step before calling update.")
+        obs = self.to_tensors(request["obs"]) if op in ["reset", "update"] else None
+        action = int(request["action"]) if op == "update" else None
+        if action is not None and not 0 <= action < self.agent.inference.n_actions:
+            raise Exception("Invalid action: {}.".format(action))
+
+        # Wait for the request to be processed as part of a batch, this waits if too many requests are pending.
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put({
+            "op": op, "session": session, "obs": obs, "action": action,
+            "future": future, "start": time.perf_counter()
+        })
+        return await future
+
+    def create_session(self):
+        """
+        Create a new session, and allocate a slot of the batched agent to it.
+        :return: the id of the session.
+        """
+        if len(self.free_slots) != 0:
+            slot = self.free_slots.pop()
+        else:
+            slot = len(self.agent.slices)
+            self.agent.slices.append(self.builder.build())
+        session = self.next_session
+        self.next_session += 1
+        self.sessions[session] = {"id": session, "slot": slot, "state": "created"}
+        return session
+
+    def close_session(self, session):
+        """
+        Close a session, and free its slot.
+        :param session: the id of the session.
+        :return: nothing.
+        """
+        session = self.sessions.pop(session, None)
+        if session is not None:
+            self.free_slots.append(session["slot"])
+
+    def get_session(self, request):
+        """
+        Getter.
+        :param request: the request.
+        :return: the session of the request.
+        """
+        if request.get("session") not in self.sessions:
+            raise Exception("Unknown session: {}.".format(request.get("session")))
+        return self.sessions[request["session"]]
+
+    def to_tensors(self, obs):
+        """
+        Check the observations of a request, and convert them to tensors, the indices being kept as they are.
+        The observations are checked before being batched, such that an invalid request only fails on its own.
+        :param obs: a dictionary whose keys are observation names and values are either an index
+            or a list encoding the evidence, all the observations being required.
+        :return: a dictionary whose keys are observation names and values are indices or tensors.
+        """
+        if not isinstance(obs, dict):
+            raise Exception("The observations must be a dictionary.")
+        for name in obs.keys():
+            if name not in self.obs_sizes:
+                raise Exception("Unknown observation: {}.".format(name))
+        tensors = {}
+        for name, size in self.obs_sizes.items():
+            if name not in obs:
+                raise Exception("Missing observation: {}.".format(name))
+            value = obs[name]
+            if isinstance(value, int) and not isinstance(value, bool):
+                if not 0 <= value < size:
+                    raise ValueError("Invalid index for {}: {}.".format(name, value))
+                tensors[name] = value
+                continue
+            try:
+                tensor = torch.tensor(value, dtype=self.obs_dtypes[name])
+            except (TypeError, ValueError, RuntimeError):
+                raise Exception("Invalid evidence for {}: expected an index or a list of numbers.".format(name))
+            if tuple(tensor.shape) != (size,):
+                raise Exception("Invalid evidence for {}: expected {} values.".format(name, size))
+            if not bool(torch.isfinite(tensor).all()) or bool((tensor < 0).any()):
+                raise Exception("Invalid evidence for {}: the values must be finite and non-negative.".format(name))
+            tensors[name] = tensor
+        return tensors
+
+    async def process_batches(self):
+        """
+        Collect the pending requests into batches, and process them in the computation thread.
+        :return: nothing.
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            # Collect the requests until the batch is full or the delay has elapsed.
+            batch = self.deferred if len(self.deferred) != 0 else [await self.queue.get()]
+            deadline = loop.time() + self.max_delay
+            while len(batch) < self.max_batch:
+                if not self.queue.empty():
+                    batch.append(self.queue.get_nowait())
+                    continue
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            # Drop the requests of closed sessions, and defer the requests of sessions that already have
+            # a request in the batch.
+            requests, self.deferred, sessions = [], [], set()
+            for request in batch:
+                if request["session"]["id"] not in self.sessions:
+                    request["future"].cancel()
+                elif request["session"]["id"] in sessions:
+                    self.deferred.append(request)
+                else:
+                    sessions.add(request["session"]["id"])
+                    requests.append(request)
+
+            # Process the batch, or the requests one by one if the batch fails, and answer the requests.
+            # The slots of the failed requests are rolled back, so their sessions keep their state.
+            try:
+                responses = await loop.run_in_executor(self.executor, self.process_batch, requests)
+            except Exception:
+                responses = await loop.run_in_executor(self.executor, self.process_requests, requests)
+            self.n_batches += 1
+            self.n_batched_requests += len(requests)
+            for request, response in zip(requests, responses):
+                if "error" not in response:
+                    request["session"]["state"] = "planned" if request["op"] == "step" else "ready"
+                self.latencies[request["op"]].append(time.perf_counter() - request["start"])
+                if not request["future"].done():
+                    request["future"].set_result(response)
+
+    def process_requests(self, requests):
+        """
+        Process the requests of a batch one by one, such that an error is only sent to the session that caused it.
+        :param requests: the requests, each session having at most one request in the batch.
+        :return: the response of each request.
+        """
+        responses = []
+        for request in requests:
+            try:
+                responses.append(self.process_batch([request])[0])
+            except Exception as error:
+                responses.append({"error": "{}: {}".format(type(error).__name__, error)})
+        return responses
+
+    def process_batch(self, requests):
+        """
+        Perform the batched inference and planning required by a batch of requests. If the batch fails, the
+        slots of its requests are rolled back, such that the requests can be processed again.
+        :param requests: the requests, each session having at most one request in the batch.
+        :return: the response of each request.
+        """
+        def select(op):
+            return [request for request in requests if request["op"] == op]
+
+        def slots(op_requests):
+            return [request["session"]["slot"] for request in op_requests]
+
+        snapshots = [self.snapshot(slot) for slot in slots(requests)]
+        try:
+            resets, updates, steps = select("reset"), select("update"), select("step")
+            self.agent.reset(slots(resets), [request["obs"] for request in resets])
+            self.agent.update(
+                slots(updates), [request["action"] for request in updates], [request["obs"] for request in updates]
+            )
+            actions = dict(zip(slots(steps), self.agent.step(slots(steps)))) if len(steps) != 0 else {}
+        except Exception:
+            for snapshot in snapshots:
+                self.restore(snapshot)
+            raise
+        return [
+            {"action": actions[request["session"]["slot"]]} if request["op"] == "step" else {}
+            for request in requests
+        ]
+
+    def snapshot(self, slot):
+        """
+        Save the state of a slot modified by the requests, i.e., its root, the planning statistics and children
+        of the root, and the posterior beliefs of the root and its children, which are replaced but never
+        modified in place by the inference.
+        :param slot: the slot.
+        :return: the snapshot of the slot.
+        """
+        root = self.agent.slices[slot]
+        children = [(child, dict(child.states_posterior)) for child in root.children]
+        return slot, root, root.cost, root.visits, dict(root.states_posterior), children
+
+    def restore(self, snapshot):
+        """
+        Restore the state of a slot.
+        :param snapshot: the snapshot of the slot.
+        :return: nothing.
+        """
+        slot, root, cost, visits, states_posterior, children = snapshot
+        root.cost, root.visits, root.states_posterior = cost, visits, states_posterior
+        root.children = [child for child, _ in children]
+        for child, states_posterior in children:
+            child.states_posterior = states_posterior
+        self.agent.slices[slot] = root
+
+    def stats(self):
+        """
+        Getter.
+        :return: the statistics of the service, i.e., the number of sessions, the number of pending
+            requests, the mean batch size, and the latency percentiles of each operation.
+        """
+        latencies = {}
+        for op, samples in self.latencies.items():
+            if len(samples) == 0:
+                continue
+            p50, p90, p99 = np.percentile(samples, [50, 90, 99])
+            latencies[op] = {"count": len(samples), "p50": float(p50), "p90": float(p90), "p99": float(p99)}
+        return {
+            "n_sessions": len(self.sessions),
+            "pending": self.queue.qsize() + len(self.deferred),
+            "n_batches": self.n_batches,
+            "mean_batch_size": self.n_batched_requests / self.n_batches if self.n_batches != 0 else 0.0,
+            "latencies": latencies
+        }
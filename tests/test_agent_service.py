@@ -0,0 +1,61 @@
+import unittest
+from unittest import mock
+import torch
+from service.AgentService import AgentService
+from tests.test_evidence import create_builder
+
+
+class TestAgentService(unittest.TestCase):
+    """
+    Test the processing of the batched requests of the agent service.
+    """
+
+    def create_service(self):
+        """
+        Create a service with two sessions that planned their first action.
+        :return: the service, and the requests updating the sessions.
+        """
+        torch.manual_seed(0)
+        service = AgentService(create_builder(), max_planning_steps=10, exp_const=2.4)
+        sessions = [service.sessions[service.create_session()] for _ in range(2)]
+        service.process_batch([{"op": "reset", "session": session, "obs": {"O_x": 0}} for session in sessions])
+        actions = service.process_batch([{"op": "step", "session": session} for session in sessions])
+        return service, [
+            {"op": "update", "session": session, "action": response["action"], "obs": {"O_x": 1}}
+            for session, response in zip(sessions, actions)
+        ]
+
+    def test_failed_batch_is_retried_request_by_request(self):
+        # Update the sessions with a batch that succeeds.
+        service, requests = self.create_service()
+        self.assertEqual(service.process_batch(requests), [{}, {}])
+        expected = [service.agent.slices[request["session"]["slot"]].states_posterior for request in requests]
+
+        # Update the sessions with a batch whose I-step fails once all the slots have been modified.
+        service, requests = self.create_service()
+        i_step = service.agent.inference.i_step
+
+        def failing_i_step(slices, obs):
+            if len(slices) > 1:
+                raise StopIteration()
+            i_step(slices, obs)
+
+        with mock.patch.object(service.agent.inference, "i_step", side_effect=failing_i_step):
+            with self.assertRaises(StopIteration):
+                service.process_batch(requests)
+            self.assertEqual(service.process_requests(requests), [{}, {}])
+        for request, posterior in zip(requests, expected):
+            states_posterior = service.agent.slices[request["session"]["slot"]].states_posterior
+            self.assertTrue(torch.allclose(states_posterior["S_x"], posterior["S_x"]))
+
+    def test_error_reports_exception_type(self):
+        service, requests = self.create_service()
+        with mock.patch.object(service.agent.inference, "i_step", side_effect=StopIteration()):
+            responses = service.process_requests(requests[:1])
+        self.assertEqual(responses, [{"error": "StopIteration: "}])
+        responses = service.process_requests(requests[:1])
+        self.assertEqual(responses, [{}])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,38 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+import numpy as np
+from data.dSpritesDataset import DataSet
+
+
+class TestDataSet(unittest.TestCase):
+    """
+    Test the conversion of the dataset archive into a memory mapped store.
+    """
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.archive = os.path.join(self.directory.name, "dsprites.npz")
+        self.images = np.random.default_rng(0).integers(0, 2, [6, 64, 64], dtype=np.uint8)
+        metadata = np.array({"latents_sizes": np.array([1, 2, 3])}, dtype=object)
+        np.savez(self.archive, imgs=self.images, metadata=metadata)
+
+    def test_convert(self):
+        store = DataSet.convert(self.archive)
+        dataset = DataSet.load_store(store)
+        self.assertTrue(np.array_equal(dataset.images, self.images.reshape(-1, 64, 64, 1)))
+        self.assertEqual(dataset.s_sizes.tolist(), [1, 2, 3])
+        self.assertEqual(sorted(os.listdir(self.directory.name)), ["dsprites.mmap", "dsprites.npz"])
+
+    def test_interrupted_conversion_leaves_no_store(self):
+        with mock.patch.object(DataSet, "chunk_size", 2), \
+                mock.patch("numpy.frombuffer", side_effect=[np.zeros(2 * 64 * 64, np.uint8), KeyboardInterrupt]):
+            with self.assertRaises(KeyboardInterrupt):
+                DataSet.convert(self.archive)
+        self.assertEqual(os.listdir(self.directory.name), ["dsprites.npz"])
+
+
+if __name__ == "__main__":
+    unittest.main()
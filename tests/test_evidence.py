@@ -0,0 +1,45 @@
+import unittest
+import torch
+from agent.inference.TemporalSliceBuilder import TemporalSliceBuilder
+from agent.inference.BatchedInference import BatchedInference
+from agent.inference.CompiledInference import CompiledInference
+
+
+def create_builder():
+    """
+    Create the builder of a small temporal slice, with one state, one observation and two actions.
+    :return: the temporal slice builder.
+    """
+    likelihood = torch.full([3, 3], 0.05).fill_diagonal_(0.9)
+    transition = torch.stack([torch.eye(3), torch.eye(3).roll(1, 0)], dim=2)
+    return TemporalSliceBuilder("A_0", 2) \
+        .add_state("S_x", torch.full([3], 1 / 3)) \
+        .add_observation("O_x", likelihood, ["S_x"]) \
+        .add_transition("S_x", transition, ["S_x", "A_0"]) \
+        .add_preference(["O_x"], torch.tensor([0.1, 0.1, 0.8]))
+
+
+class TestEvidence(unittest.TestCase):
+    """
+    Test the evidence given as the index of the observed value.
+    """
+
+    def test_index_matches_one_hot(self):
+        ts_index, ts_one_hot = create_builder().build(), create_builder().build()
+        ts_index.i_step({"O_x": 2})
+        ts_one_hot.i_step({"O_x": torch.tensor([0.0, 0.0, 1.0])})
+        self.assertTrue(torch.allclose(ts_index.states_posterior["S_x"], ts_one_hot.states_posterior["S_x"]))
+
+    def test_invalid_index_raises(self):
+        for index in [-1, 3]:
+            ts = create_builder().build()
+            with self.assertRaises(ValueError):
+                ts.i_step({"O_x": index})
+            with self.assertRaises(ValueError):
+                BatchedInference(ts).i_step([ts], [{"O_x": index}])
+            with self.assertRaises(ValueError):
+                CompiledInference(ts, "eager").i_step(ts, {"O_x": index})
+
+
+if __name__ == "__main__":
+    unittest.main()
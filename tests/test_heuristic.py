@@ -0,0 +1,58 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+import torch
+from agent.planning.EFEToGoHeuristic import EFEToGoHeuristic
+
+
+class Environment:
+    """
+    Class exposing the granularity and the number of repeats of a dSprites environment.
+    """
+
+    def __init__(self, granularity=8, repeat=8):
+        self.granularity = granularity
+        self.repeat = repeat
+
+
+class Wrapper:
+    """
+    Class standing for the pre-processing wrapper, whose table is never computed by the tests below.
+    """
+
+    def __init__(self):
+        self.env = Environment()
+
+
+class TestEFEToGoHeuristic(unittest.TestCase):
+    """
+    Test the cache of the expected free energy to go.
+    """
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.table = torch.arange(6, dtype=torch.float32).view(1, 2, 3)
+        patch = mock.patch.object(EFEToGoHeuristic, "compute_table", return_value=self.table)
+        patch.start()
+        self.addCleanup(patch.stop)
+        self.addCleanup(self.directory.cleanup)
+
+    def test_table_is_stored_without_temporary_file(self):
+        heuristic = EFEToGoHeuristic.load_or_compute(Wrapper(), cache_dir=self.directory.name)
+        self.assertTrue(torch.equal(heuristic.table, self.table))
+        self.assertEqual(len(os.listdir(self.directory.name)), 1)
+        self.assertFalse(os.listdir(self.directory.name)[0].endswith(".tmp"))
+
+    def test_truncated_table_is_recomputed(self):
+        EFEToGoHeuristic.load_or_compute(Wrapper(), cache_dir=self.directory.name)
+        file_name = os.path.join(self.directory.name, os.listdir(self.directory.name)[0])
+        with open(file_name, "r+b") as file:
+            file.truncate(10)
+        heuristic = EFEToGoHeuristic.load_or_compute(Wrapper(), cache_dir=self.directory.name)
+        self.assertTrue(torch.equal(heuristic.table, self.table))
+        self.assertTrue(torch.equal(torch.load(file_name), self.table))
+
+
+if __name__ == "__main__":
+    unittest.main()
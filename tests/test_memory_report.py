@@ -0,0 +1,34 @@
+import unittest
+import numpy as np
+from agent.BTAI_3MF import BTAI_3MF
+from analysis.profiling.MemoryReport import MemoryReport
+from tests.test_evidence import create_builder
+
+
+class TestMemoryReport(unittest.TestCase):
+    """
+    Test the memory report of the planning trees.
+    """
+
+    def test_numpy_arrays_are_counted_once(self):
+        array = np.zeros([4, 8], dtype=np.float32)
+        seen = set()
+        self.assertEqual(MemoryReport.tensor_bytes(array[1], seen), array.nbytes)
+        self.assertEqual(MemoryReport.tensor_bytes(array[2], seen), 0)
+        self.assertEqual(MemoryReport.tensor_bytes(array, seen), 0)
+
+    def test_numpy_backend_matches_torch_backend(self):
+        reports = {}
+        for backend in ["torch", "numpy"]:
+            agent = BTAI_3MF(create_builder().build(backend), max_planning_steps=20, exp_const=2.4)
+            agent.reset({"O_x": 0})
+            agent.step()
+            reports[backend] = MemoryReport.tree_bytes(agent.ts)
+        self.assertEqual(reports["numpy"]["n_nodes"], reports["torch"]["n_nodes"])
+        for category in ["states_posterior", "obs_posterior", "cloned_priors"]:
+            self.assertGreater(reports["numpy"][category], 0)
+            self.assertEqual(reports["numpy"][category], reports["torch"][category])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+import unittest
+import torch
+from agent.inference.BatchedInference import BatchedInference
+from agent.inference.CompiledInference import CompiledInference
+from tests.test_evidence import create_builder
+
+
+def create_pruned_slice(prune):
+    """
+    Create a small temporal slice with a state and an observation that are irrelevant to planning.
+    :param prune: True if the irrelevant state and observation should be pruned from planning, False otherwise.
+    :return: the temporal slice.
+    """
+    likelihood = torch.full([2, 2], 0.1).fill_diagonal_(0.9)
+    transition = torch.full([2, 2], 0.2).fill_diagonal_(0.8)
+    ts = create_builder() \
+        .add_state("S_y", torch.tensor([0.7, 0.3])) \
+        .add_observation("O_y", likelihood, ["S_y"]) \
+        .add_transition("S_y", transition, ["S_y"]) \
+        .build(prune=prune)
+    ts.i_step({"O_x": 0, "O_y": 1})
+    return ts
+
+
+class TestPruning(unittest.TestCase):
+    """
+    Test that the compiled and batched inference skip the states and observations pruned from planning.
+    """
+
+    def assert_pruned(self, children, pruned_children):
+        for child, pruned_child in zip(children, pruned_children):
+            self.assertEqual(set(pruned_child.states_posterior.keys()), {"S_x"})
+            self.assertEqual(set(pruned_child.obs_posterior.keys()), {"O_x"})
+            self.assertTrue(torch.allclose(child.states_posterior["S_x"], pruned_child.states_posterior["S_x"]))
+
+        # The pruned terms of the expected free energy are the same for all the children.
+        deltas = [child.cost - pruned_child.cost for child, pruned_child in zip(children, pruned_children)]
+        self.assertAlmostEqual(deltas[0], deltas[1], places=5)
+
+    def test_compiled_inference(self):
+        ts, pruned_ts = create_pruned_slice(False), create_pruned_slice(True)
+        children = CompiledInference(ts, "eager").p_step(ts)
+        pruned_children = CompiledInference(pruned_ts, "eager").p_step(pruned_ts)
+        self.assert_pruned(children, pruned_children)
+
+    def test_batched_inference(self):
+        results = []
+        for ts in [create_pruned_slice(False), create_pruned_slice(True)]:
+            inference = BatchedInference(ts)
+            children, states_posterior, obs_posterior = inference.p_step([ts])
+            for child, cost in zip(children[0], inference.efe(states_posterior, obs_posterior)[0].tolist()):
+                child.cost = cost
+            results.append(children[0])
+        self.assert_pruned(*results)
+
+    def test_complete_posteriors(self):
+        ts = create_pruned_slice(True)
+        child = CompiledInference(ts, "eager").p_step(ts)[1]
+        child.complete_posteriors()
+        self.assertEqual(set(child.states_posterior.keys()), {"S_x", "S_y"})
+        self.assertEqual(set(child.obs_posterior.keys()), {"O_x", "O_y"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,52 @@
+import unittest
+import numpy as np
+from benchmarks.Benchmark import Benchmark
+from benchmarks.RegressionGate import RegressionGate
+
+
+def create_result(median, spread, n_samples=21, seed=0):
+    """
+    Create the result of a noisy benchmark.
+    :param median: the typical duration of a sample.
+    :param spread: the relative amplitude of the noise.
+    :param n_samples: the number of samples.
+    :param seed: the seed of the random number generator.
+    :return: the result.
+    """
+    rng = np.random.default_rng(seed)
+    return Benchmark.summarise(median * (1 + spread * rng.uniform(-1, 1, n_samples)))
+
+
+class TestRegressionGate(unittest.TestCase):
+    """
+    Test the comparison of benchmark results against a baseline.
+    """
+
+    def status(self, baseline, current):
+        rows = RegressionGate().compare({"benchmark": baseline}, {"benchmark": current})
+        return rows[0][5]
+
+    def test_same_distribution_is_ok(self):
+        for spread in [0.05, 0.5, 1.0]:
+            self.assertEqual(self.status(create_result(1.0, spread), create_result(1.0, spread, seed=1)), "ok")
+
+    def test_twice_slower_is_a_regression(self):
+        for spread in [0.05, 0.5, 1.0]:
+            self.assertEqual(self.status(create_result(1.0, spread), create_result(2.0, spread, seed=1)), "regression")
+
+    def test_twice_faster_is_an_improvement(self):
+        self.assertEqual(self.status(create_result(2.0, 0.5), create_result(1.0, 0.5, seed=1)), "improvement")
+
+    def test_noise_allowance_is_capped(self):
+        rows = RegressionGate(max_noise=0.25).compare({"benchmark": create_result(1.0, 1.0, n_samples=3)},
+                                                      {"benchmark": create_result(1.0, 1.0, n_samples=3, seed=1)})
+        self.assertLessEqual(rows[0][4], 0.25)
+
+    def test_success_rate_drop_is_a_regression(self):
+        baseline = dict(create_result(1.0, 0.05), success_rate=1.0)
+        current = dict(create_result(1.0, 0.05, seed=1), success_rate=0.5)
+        self.assertEqual(self.status(baseline, current), "regression")
+
+
+if __name__ == "__main__":
+    unittest.main()